@@ -0,0 +1,198 @@
+"""Un actor por sala: todo lo que modifica una sala pasa por su buzón.
+
+Los handlers (ask) y las transiciones programadas (tell) de una misma sala se
+ejecutan de uno en uno y en orden de llegada; salas distintas siguen
+ejecutándose en paralelo, sin lock global. No hay hilo por actor: el mensaje
+lo ejecuta el hilo que tiene el turno de la sala.
+
+  - ask: el handler espera su turno y se ejecuta en su propio hilo (con su
+    contexto de petición); devuelve el resultado.
+  - tell: el planificador deja el mensaje y sigue; si la sala está ocupada,
+    lo ejecuta quien tenga el turno al terminar lo suyo, antes de cederlo.
+
+El turno es reentrante: el hilo que lo tiene puede volver a pedirlo (p. ej.
+una desconexión provocada desde dentro de un handler de la misma sala).
+"""
+import collections
+import threading
+
+from logs import get_logger
+
+log = get_logger('actors')
+
+
+class ActorRetired(Exception):
+    """El actor se descartó (prune) entre obtenerlo y mandarle el mensaje"""
+
+
+class Message:
+    """Mensaje del buzón; en los ask, turn despierta al hilo que espera"""
+    __slots__ = ('func', 'args', 'turn', 'thread')
+
+    def __init__(self, func, args, turn=None, thread=None):
+        self.func = func
+        self.args = args
+        self.turn = turn
+        self.thread = thread
+
+
+class RoomActor:
+    """Buzón de una sala"""
+    __slots__ = ('key', '_mailbox', '_lock', '_owner', '_depth', 'processed', 'retired')
+
+    def __init__(self, key):
+        self.key = key
+        self._mailbox = collections.deque()
+        self._lock = threading.Lock()  # protege el buzón y el turno, no la ejecución
+        self._owner = None  # hilo con el turno
+        self._depth = 0
+        self.processed = 0
+        self.retired = False  # descartado por el registro: ya no acepta mensajes
+
+    def ask(self, func, *args):
+        """Ejecuta func(*args) en este hilo cuando le toque y devuelve su resultado"""
+        me = threading.get_ident()
+        with self._lock:
+            if self.retired:
+                raise ActorRetired(self.key)
+            if self._owner == me:
+                waiting = None
+            elif self._owner is None and not self._mailbox:
+                self._owner = me
+                waiting = None
+            else:
+                waiting = Message(func, args, threading.Event(), me)
+                self._mailbox.append(waiting)
+        if waiting is not None:
+            waiting.turn.wait()  # quien suelta el turno nos lo pasa
+        self._depth += 1
+        try:
+            self.processed += 1
+            return func(*args)
+        finally:
+            self._depth -= 1
+            if self._depth == 0:
+                self._release()
+
+    def tell(self, func, *args):
+        """Deja func(*args) en el buzón sin esperar"""
+        me = threading.get_ident()
+        with self._lock:
+            if self.retired:
+                raise ActorRetired(self.key)
+            if self._owner is not None or self._mailbox:
+                if self._owner != me:
+                    self._mailbox.append(Message(func, args))
+                    return
+            else:
+                self._owner = me
+        self._depth += 1
+        try:
+            self._run(func, args)
+        finally:
+            self._depth -= 1
+            if self._depth == 0:
+                self._release()
+
+    def pending(self):
+        return len(self._mailbox)
+
+    def idle(self):
+        return self._owner is None and not self._mailbox
+
+    def retire(self):
+        """Retira el actor si está ocioso (sin turno ni mensajes); True si quedó retirado"""
+        with self._lock:
+            if self._owner is None and not self._mailbox:
+                self.retired = True
+            return self.retired
+
+    def _run(self, func, args):
+        self.processed += 1
+        try:
+            func(*args)
+        except Exception:
+            log.exception("Mensaje de la sala %s falló", self.key, extra={'room_code': self.key})
+
+    def _release(self):
+        """Ejecuta los tell pendientes y cede el turno al siguiente ask (o lo suelta)"""
+        while True:
+            with self._lock:
+                if not self._mailbox:
+                    self._owner = None
+                    return
+                message = self._mailbox.popleft()
+                if message.turn is not None:
+                    # El turno pasa directamente al hilo del ask
+                    self._owner = message.thread
+                    message.turn.set()
+                    return
+            self._depth += 1
+            try:
+                self._run(message.func, message.args)
+            finally:
+                self._depth -= 1
+
+
+class ActorRegistry:
+    """Actores por código de sala, creados al primer mensaje.
+
+    prune retira los actores ociosos bajo el mismo lock con el que se crean;
+    un hilo que obtuvo un actor justo antes de que se retirara recibe
+    ActorRetired al mandarle el mensaje y lo reintenta con el actor nuevo,
+    así que nunca hay dos actores ejecutando mensajes de la misma sala.
+    """
+
+    def __init__(self):
+        self.enabled = True  # False: los mensajes se ejecutan directamente (para comparar)
+        self._actors = {}  # código: RoomActor
+        self._lock = threading.Lock()
+
+    def actor(self, key):
+        actor = self._actors.get(key)
+        if actor is None:
+            with self._lock:
+                actor = self._actors.get(key)
+                if actor is None:
+                    actor = self._actors[key] = RoomActor(key)
+        return actor
+
+    def ask(self, key, func, *args):
+        if key is None or not self.enabled:
+            return func(*args)
+        while True:
+            try:
+                return self.actor(key).ask(func, *args)
+            except ActorRetired:
+                continue
+
+    def tell(self, key, func, *args):
+        if key is None or not self.enabled:
+            return func(*args)
+        while True:
+            try:
+                return self.actor(key).tell(func, *args)
+            except ActorRetired:
+                continue
+
+    def prune(self, keep):
+        """Descarta los actores ociosos cuyo código ya no cumple keep(código)"""
+        removed = 0
+        with self._lock:
+            for key, actor in list(self._actors.items()):
+                # Con turno o mensajes en el buzón se queda hasta la próxima pasada
+                if not keep(key) and actor.retire():
+                    del self._actors[key]
+                    removed += 1
+        return removed
+
+    def __len__(self):
+        return len(self._actors)
+
+    def backlog(self):
+        """Mensajes esperando en todos los buzones"""
+        return sum(actor.pending() for actor in list(self._actors.values()))
+
+    def processed(self):
+        """Mensajes ejecutados por todos los actores vivos"""
+        return sum(actor.processed for actor in list(self._actors.values()))
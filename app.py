@@ -1,35 +1,462 @@
-from flask import Flask, render_template, request
+# El modo asíncrono (WEREWOLF_ASYNC_MODE) parchea la librería estándar: antes que nada
+import async_mode
+ASYNC_MODE = async_mode.setup()
+
+from flask import Flask, Response, render_template, request, jsonify
 from flask_socketio import SocketIO, emit, join_room, leave_room
+import atexit
+import collections
+import functools
+import hmac
+import os
 import random
 import string
-from game_logic import GameLogic, execute_werewolf_action, ROLE_NAMES, TestGameLogic
+import time
+from actors import ActorRegistry
+from cluster import load_cluster_config, run_cluster
+from game_logic import GameLogic, execute_night_action, execute_werewolf_action, ROLE_NAMES, TestGameLogic
+from lobby import LobbyIndex
+import logs
+from metrics import Metrics
+from models import Player, PlayerSession, Role, Room
+from outbox import Outbox
+from pages import PageCache
+from persistence import RoomJournal, decode_room, encode_room
+from profiler import PROFILE_MODES, SamplingProfiler
+from ratelimit import RateLimiter, SendQueueLimit, parse_limits
+from recorder import Recorder
+from room_codes import RoomCodeAllocator, RoomCodesExhausted
+from room_store import RoomStore, RoomStoreFull
+from scheduler import PhaseScheduler
+from spectators import SpectatorFeed
+import wire
+
+# Logs estructurados con escritura en segundo plano (WEREWOLF_LOG_LEVEL=DEBUG para depurar)
+logs.configure()
+log = logs.get_logger('app')
 
 # Crear la aplicación Flask
 app = Flask(__name__)
 app.config['SECRET_KEY'] = 'tu_clave_secreta_aqui'
 
-# Inicializar SocketIO
-socketio = SocketIO(app, cors_allowed_origins="*")
+# Modo multi-proceso: este worker solo es dueño de parte de los códigos de sala
+cluster_config = load_cluster_config()
+
+def is_local_room(room):
+    """Salas de Socket.IO cuyos sockets están todos en este worker (la sala, sus espectadores y el listado)"""
+    return room == LOBBY_ROOM or room.split(':', 1)[0] in rooms
+
+# Inicializar SocketIO (en modo multi-proceso, los emits entre workers van por el bus)
+socketio_options = {'cors_allowed_origins': '*', 'async_mode': ASYNC_MODE}
+if cluster_config is not None:
+    socketio_options['client_manager'] = cluster_config.client_manager(is_local_room=is_local_room)
+socketio = SocketIO(app, **socketio_options)
+
+# Métricas de handlers y emits, expuestas en /metrics
+metrics = Metrics()
+metrics.count_emits(socketio)
+
+# Profiler por muestreo, apagado hasta que un admin lo enciende en /debug/profiler
+# (rutas protegidas con WEREWOLF_ADMIN_TOKEN; sin token configurado no existen)
+profiler = SamplingProfiler()
+ADMIN_TOKEN = os.environ.get('WEREWOLF_ADMIN_TOKEN', '')
+
+# Los emits de cada handler o transición salen agrupados por destinatario al terminar
+outbox = Outbox(metrics)
+outbox.install(socketio)
+# Formato binario compacto para los clientes que lo negocian al conectar
+outbox.encode = wire.encode
+# Modo multi-proceso: el outbox solo agrupa destinos de este worker. Los clientes
+# entran siempre en el worker dueño de la sala (room_redirect en join_room y
+# spectate), así que en la práctica todo destino de un handler es local; un emit a
+# sockets de otro worker sale directo por el bus, sin agrupar.
+if cluster_config is not None:
+    outbox.is_local = socketio.server.manager.is_local
+
+# Límite de ritmo por evento (fichas por segundo, ráfaga) para cada socket; cada IP
+# tiene RATE_LIMIT_IP_FACTOR veces ese límite. WEREWOLF_RATE_LIMITS los sustituye
+# ('create_room=0.2:3,night_action=off'). Los eventos sin entrada no se limitan.
+RATE_LIMITS = {
+    'connect': (0.5, 5.0),
+    'create_room': (0.2, 3.0),
+    'create_test_room': (0.2, 3.0),
+    'join_room': (1.0, 5.0),
+    'start_game': (0.5, 3.0),
+    'night_action': (5.0, 10.0),
+    'request_room_snapshot': (1.0, 5.0),
+    'list_rooms': (2.0, 10.0),
+    'spectate': (1.0, 5.0)
+}
+RATE_LIMITS.update(parse_limits(os.environ.get('WEREWOLF_RATE_LIMITS', '')))
+RATE_LIMIT_IP_FACTOR = 10
+rate_limiter = RateLimiter(RATE_LIMITS, ip_factor=RATE_LIMIT_IP_FACTOR)
+
+# Paquetes pendientes de enviar a partir de los cuales un cliente se considera lento
+# y se desconecta; si estaba en una partida conserva su asiento y vuelve a él
+# entrando en la sala con el mismo nombre (handle_disconnect y handle_join_room)
+MAX_PENDING_PACKETS = int(os.environ.get('WEREWOLF_MAX_PENDING_PACKETS', '256'))
+send_limit = SendQueueLimit(socketio.server, MAX_PENDING_PACKETS)
+
+def admit_recipients(sids):
+    """Filtro del outbox: desconecta a los destinatarios con la cola de salida llena"""
+    slow = send_limit.over_limit(sids)
+    if not slow:
+        return sids
+    for sid in slow:
+        metrics.inc('outbox_slow_disconnects_total', 'Clientes desconectados por cola de salida llena')
+        log.warning('Cliente lento desconectado (%d paquetes pendientes)', send_limit.pending(sid),
+                    extra={'socket_id': sid})
+        socketio.server.disconnect(sid)
+    return [sid for sid in sids if sid not in slow]
+
+outbox.admit = admit_recipients
+
+# Segundos sin actividad tras los que se cierra una sala, según su game_state
+ROOM_TTLS = {
+    'waiting': 1800.0,
+    'preparation': 600.0,
+    'night': 600.0,
+    'discussion': 900.0
+}
+ROOM_SWEEP_INTERVAL = 30.0
+
+# Almacenar información de salas y jugadores. Con WEREWOLF_MAX_ROOMS salas, crear
+# una nueva desaloja la menos activa (si lleva al menos un minuto inactiva).
+rooms = RoomStore(ROOM_TTLS, default_ttl=1800.0,
+                  max_rooms=int(os.environ.get('WEREWOLF_MAX_ROOMS', '20000')))  # room_code: Room
+players = {}  # socket_id: PlayerSession
+
+# Máximo de jugadores por sala (One Night Werewolf)
+MAX_PLAYERS = 10
+
+# Salas abiertas para el listado público. Los clientes suscritos (sala de Socket.IO
+# LOBBY_ROOM) reciben los cambios agrupados cada LOBBY_UPDATE_WINDOW segundos en un
+# lobby_delta. En modo multi-proceso cada worker lista solo sus propias salas.
+lobby = LobbyIndex(MAX_PLAYERS)
+LOBBY_ROOM = '__lobby__'
+LOBBY_UPDATE_WINDOW = 0.25
+
+# Espectadores: no juegan ni cuentan como jugadores y están en un grupo de Socket.IO
+# aparte (spectator_room). Reciben los eventos públicos de la sala y, tras cada
+# acción, lo secreto de la noche, todo con SPECTATOR_DELAY segundos de retraso y
+# agrupado como mucho una vez cada SPECTATOR_INTERVAL. Un espectador con
+# SPECTATOR_MAX_PENDING paquetes sin enviar se desconecta en vez de acumularle más.
+SPECTATOR_DELAY = float(os.environ.get('WEREWOLF_SPECTATOR_DELAY', '10'))
+SPECTATOR_INTERVAL = 0.5
+SPECTATOR_MAX_PENDING = int(os.environ.get('WEREWOLF_SPECTATOR_MAX_PENDING', '16'))
+MAX_SPECTATORS = int(os.environ.get('WEREWOLF_MAX_SPECTATORS', '5000'))
+spectator_feed = SpectatorFeed(SPECTATOR_DELAY)
+spectator_send_limit = SendQueueLimit(socketio.server, SPECTATOR_MAX_PENDING)
+spectators = {}  # socket_id: room_code
+spectator_counts = collections.Counter()  # room_code: espectadores
+
+# Diario de salas en disco (WEREWOLF_STATE_DIR); None si la persistencia está desactivada
+journal = None
+
+def room_activity(room_code):
+    """Registra actividad en la sala (TTL/LRU) y la marca para el diario"""
+    rooms.touch(room_code)
+    if journal is not None:
+        journal.touch(room_code)
+
+# Grabación del tráfico (WEREWOLF_RECORD); None si no se graba
+recorder = None
+
+# Semillas impuestas para las próximas partidas de una sala (las pone el reproductor)
+game_seeds = {}  # room_code: [semilla, ...]
+
+def game_rng(room_code):
+    """Generador con semilla para una partida nueva; la semilla queda en la grabación"""
+    seeds = game_seeds.get(room_code)
+    seed = seeds.pop(0) if seeds else random.getrandbits(64)
+    if recorder is not None:
+        recorder.seed(room_code, seed)
+    return random.Random(seed)
+
+# Un actor por sala: handlers y transiciones programadas de la misma sala se
+# ejecutan de uno en uno (salas distintas siguen en paralelo)
+actors = ActorRegistry()
+
+def run_scheduled(callback):
+    """Envoltorio de las transiciones programadas: buzón de la sala, emits agrupados y actividad en la sala"""
+    batched = outbox.batched(callback)
 
-# Almacenar información de salas y jugadores
-rooms = {}  # room_code: {'players': [player_data], 'game_state': 'waiting', 'game': GameLogic}
-players = {}  # socket_id: {'username': str, 'room_code': str}
+    def scheduled(*args):
+        if recorder is not None:
+            recorder.tick(callback.__name__, args)
+        try:
+            if profiler.running:
+                with profiler.tag(callback.__name__, args[0] if args else None):
+                    return batched(*args)
+            return batched(*args)
+        finally:
+            if args:
+                room_activity(args[0])
 
-def generate_room_code():
-    """Genera un código de sala de 4 letras"""
-    return ''.join(random.choices(string.ascii_uppercase, k=4))
+    def wrapper(*args):
+        # Las transiciones de sala reciben el código como primer argumento; el
+        # planificador no espera: si la sala está ocupada, la ejecuta quien tenga el turno
+        if args:
+            actors.tell(args[0], scheduled, *args)
+        else:
+            scheduled()
+    return wrapper
+
+# Planificador único para todas las transiciones de fase programadas
+# (su bucle corre como tarea de fondo de Socket.IO: un hilo o una corrutina según el modo)
+scheduler = PhaseScheduler(around=run_scheduled, spawn=socketio.start_background_task)
+
+# Retrasos (segundos) de la narración nocturna
+PHASE_DELAYS = {
+    'role_assignment': 5.0,
+    'werewolf_info': 1.0,
+    'werewolves_advance': 4.0,
+    'lone_wolf_advance': 3.0,
+    'phase_completed': 2.0
+}
+
+# Plazo (segundos) de cada fase nocturna; al vencer se resuelve aunque falten jugadores
+PHASE_BUDGETS = {
+    Role.WEREWOLF: 20.0,
+    Role.SEER: 20.0,
+    Role.ROBBER: 15.0,
+    Role.TROUBLEMAKER: 20.0,
+    Role.DRUNK: 10.0,
+    Role.INSOMNIAC: 10.0
+}
+
+# Fases simuladas para los roles del centro: duran una fracción aleatoria del plazo,
+# como si alguien estuviera actuando. Sin ellas (WEREWOLF_FAKE_PHASES=0) la noche es
+# más corta, pero las fases que faltan delatan las cartas del centro
+FAKE_NIGHT_PHASES = os.environ.get('WEREWOLF_FAKE_PHASES', '1') == '1'
+FAKE_PHASE_SPAN = (0.3, 0.7)
+
+# Ventana (segundos) en la que se agrupan los cambios de jugadores de una sala en un solo room_delta
+ROOM_UPDATE_WINDOW = 0.05
+
+def owns_room(room_code):
+    """Indica si la sala pertenece a este worker (siempre True con un solo proceso)"""
+    return cluster_config is None or cluster_config.owns(room_code)
+
+# Códigos de sala (4 letras) y de salas de testing (TEST + 3 dígitos), sin reintentos.
+# Un código liberado no se reutiliza hasta pasado el enfriamiento.
+ROOM_CODE_COOLDOWN = 60.0
+room_codes = RoomCodeAllocator(owns=owns_room, cooldown=ROOM_CODE_COOLDOWN)
+test_room_codes = RoomCodeAllocator(alphabet=string.digits, length=3, prefix='TEST',
+                                    owns=owns_room, cooldown=ROOM_CODE_COOLDOWN)
+
+# Páginas renderizadas una sola vez y assets con huella, servidos desde memoria
+page_cache = PageCache(os.path.join(app.root_path, 'static'))
+STATIC_ASSETS = ('index.css', 'index.js', 'debug.css', 'debug.js')
+PAGE_TEMPLATES = ('index.html', 'debug.html')
+PAGE_SOURCES = ([os.path.join(app.root_path, app.template_folder, name) for name in PAGE_TEMPLATES] +
+                [os.path.join(page_cache.static_dir, name) for name in STATIC_ASSETS])
+pages_version = None  # mtimes de PAGE_SOURCES con los que se renderizó page_cache
+
+def page_sources_version():
+    return tuple(os.stat(path).st_mtime_ns for path in PAGE_SOURCES)
+
+def build_pages():
+    """Renderiza las páginas y carga los assets en page_cache"""
+    global pages_version
+    pages_version = page_sources_version()
+    for name in STATIC_ASSETS:
+        page_cache.add_asset(name)
+    with app.app_context():
+        page_cache.add_page('index', render_template('index.html', wire_tables=wire.client_tables(),
+                                                     asset_url=page_cache.asset_url))
+        page_cache.add_page('debug', render_template('debug.html', asset_url=page_cache.asset_url))
+
+def refresh_pages():
+    """En desarrollo: vuelve a renderizar solo si cambió alguna plantilla o asset"""
+    if page_sources_version() != pages_version:
+        build_pages()
+
+build_pages()
 
 @app.route('/')
 def index():
     """Página principal"""
-    return render_template('index.html')
+    if app.debug:
+        refresh_pages()  # en desarrollo, los cambios en plantillas y assets se ven sin reiniciar
+    return page_cache.page('index')
 
 @app.route('/debug')
 def debug():
     """Página de debug"""
-    return render_template('debug.html')
+    if app.debug:
+        refresh_pages()
+    return page_cache.page('debug')
+
+@app.route('/assets/<name>')
+def asset(name):
+    """Assets estáticos con huella en el nombre (cache de un año)"""
+    return page_cache.asset(name)
+
+@app.route('/debug/scheduler')
+def debug_scheduler():
+    """Profundidad de la cola y retraso del planificador de fases"""
+    return jsonify(scheduler.stats())
+
+def admin_only(view):
+    """Ruta solo para admins: token en la cabecera X-Admin-Token; 404 si no hay WEREWOLF_ADMIN_TOKEN"""
+    @functools.wraps(view)
+    def wrapper(*args, **kwargs):
+        if not ADMIN_TOKEN:
+            return jsonify({'error': 'No encontrado'}), 404
+        if not hmac.compare_digest(request.headers.get('X-Admin-Token', ''), ADMIN_TOKEN):
+            return jsonify({'error': 'Token de admin inválido'}), 403
+        return view(*args, **kwargs)
+    return wrapper
+
+@app.route('/debug/profiler')
+@admin_only
+def debug_profiler():
+    """Estado del profiler y funciones más calientes (?top=20&by=self|total&event=&room=)"""
+    by = request.args.get('by', 'self')
+    top = profiler.top(request.args.get('top', 20, type=int), by='total' if by == 'total' else 'self',
+                       event=request.args.get('event') or None, room_code=request.args.get('room') or None)
+    return jsonify({**profiler.status(), 'top': top})
+
+@app.route('/debug/profiler/start', methods=['POST'])
+@admin_only
+def debug_profiler_start():
+    """Empieza un perfil nuevo (interval y duration en segundos, mode cpu|wall)"""
+    options = request.get_json(silent=True) or {}
+    mode = options.get('mode', 'cpu')
+    try:
+        interval = float(options.get('interval', 0.005))
+        duration = float(options['duration']) if options.get('duration') else None
+    except (TypeError, ValueError):
+        return jsonify({'error': 'interval y duration deben ser números'}), 400
+    if mode not in PROFILE_MODES:
+        return jsonify({'error': f"mode debe ser uno de {', '.join(PROFILE_MODES)}"}), 400
+    if not profiler.start(interval, duration, mode):
+        return jsonify({'error': 'El profiler ya está en marcha'}), 409
+    log.warning('Profiler iniciado (%s, cada %.1f ms)', profiler.mode, profiler.interval * 1000)
+    return jsonify(profiler.status())
+
+@app.route('/debug/profiler/stop', methods=['POST'])
+@admin_only
+def debug_profiler_stop():
+    """Para el profiler; el perfil se puede seguir consultando"""
+    if profiler.stop():
+        log.warning('Profiler parado (%d muestras)', profiler.status()['samples'])
+    return jsonify(profiler.status())
+
+@app.route('/debug/profiler/collapsed')
+@admin_only
+def debug_profiler_collapsed():
+    """Pilas colapsadas para flamegraph.pl/speedscope (?group=thread,event,room&event=&room=)"""
+    group = tuple(filter(None, request.args.get('group', 'event').split(',')))
+    body = profiler.collapsed(group, event=request.args.get('event') or None,
+                              room_code=request.args.get('room') or None)
+    filename = time.strftime('werewolf-%Y%m%d-%H%M%S.folded')
+    return Response(body, mimetype='text/plain',
+                    headers={'Content-Disposition': f'attachment; filename={filename}'})
+
+@app.route('/metrics')
+def metrics_endpoint():
+    """Métricas en formato de texto de Prometheus"""
+    return Response(metrics.render(), mimetype='text/plain; version=0.0.4')
+
+def rate_limited(event, handler):
+    """Rechaza el evento antes de ejecutar nada si el socket o su IP superan su límite"""
+    @functools.wraps(handler)
+    def wrapper(*args, **kwargs):
+        # En connect solo cuenta la IP: el socket es nuevo y, si se rechaza, no habrá disconnect
+        sid = None if event == 'connect' else request.sid
+        scope = rate_limiter.check(event, sid, request.remote_addr)
+        if scope is None:
+            return handler(*args, **kwargs)
+        metrics.inc('ratelimit_rejected_total', 'Eventos rechazados por límite de ritmo', event=event, scope=scope)
+        if event == 'connect':
+            return False  # conexión rechazada
+        if rate_limiter.should_notify(request.sid):
+            emit('error', {'msg': 'Demasiadas peticiones, espera un momento'})
+    return wrapper
+
+# Eventos que modifican la sala pedida en data['room_code'], no la del remitente
+TARGET_ROOM_EVENTS = ('join_room', 'spectate')
 
-@socketio.on('create_test_room')
+def handler_room(event, args):
+    """Sala a cuyo buzón va un evento: la pedida al unirse o mirar, o la del jugador o espectador"""
+    if event in TARGET_ROOM_EVENTS:
+        data = args[0] if args else None
+        if isinstance(data, dict) and isinstance(data.get('room_code'), str):
+            return data['room_code'].strip().upper()
+        return None
+    session = players.get(request.sid)
+    if session is not None:
+        return session.room_code
+    return spectators.get(request.sid)  # None en connect, create_room...: aún sin sala
+
+def in_room_actor(event, handler):
+    """Ejecuta el handler con el turno de su sala"""
+    @functools.wraps(handler)
+    def wrapper(*args, **kwargs):
+        return actors.ask(handler_room(event, args), functools.partial(handler, *args, **kwargs))
+    return wrapper
+
+def profiled(event, handler):
+    """Etiqueta las muestras del profiler con el evento y la sala mientras corre el handler"""
+    @functools.wraps(handler)
+    def wrapper(*args, **kwargs):
+        if not profiler.running:
+            return handler(*args, **kwargs)
+        with profiler.tag(event, handler_room(event, args)):
+            return handler(*args, **kwargs)
+    return wrapper
+
+def recorded(event, handler):
+    """Apunta el evento en la grabación (si está activa) tal como llegó"""
+    @functools.wraps(handler)
+    def wrapper(*args, **kwargs):
+        if recorder is not None:
+            recorder.event(request.sid, event, handler_room(event, args), args)
+        return handler(*args, **kwargs)
+    return wrapper
+
+def socket_handler(event):
+    """Registra un handler de Socket.IO con grabación, límite de ritmo, instrumentación de tiempo y errores, buzón de sala, etiqueta de profiler y emits agrupados"""
+    def decorator(handler):
+        @functools.wraps(handler)
+        def persisted(*args, **kwargs):
+            session = players.get(request.sid)
+            try:
+                return handler(*args, **kwargs)
+            finally:
+                # La sala del jugador (antes o después del handler) pasa al diario
+                session = players.get(request.sid) or session
+                if session is not None:
+                    room_activity(session.room_code)
+        return socketio.on(event)(recorded(event, rate_limited(
+            event, metrics.instrument(event, in_room_actor(event, profiled(event, outbox.batched(persisted)))))))
+    return decorator
+
+def rooms_by_state():
+    """Número de salas por game_state"""
+    counts = {}
+    for room in list(rooms.values()):
+        key = (('state', room.game_state),)
+        counts[key] = counts.get(key, 0) + 1
+    return counts
+
+metrics.gauge('rooms_active', 'Salas activas', lambda: len(rooms))
+metrics.gauge('rooms', 'Salas por estado de juego', rooms_by_state)
+metrics.gauge('connected_sockets', 'Sockets conectados', lambda: len(socketio.server.eio.sockets))
+metrics.gauge('players_in_rooms', 'Jugadores registrados en alguna sala', lambda: len(players))
+metrics.gauge('scheduled_transitions_pending', 'Transiciones de fase programadas', lambda: scheduler.pending())
+metrics.gauge('ratelimit_tracked_ips', 'IPs con buckets de límite de ritmo', rate_limiter.tracked_ips)
+metrics.gauge('scheduler_lag_seconds', 'Retraso de la última transición ejecutada', lambda: scheduler.last_lag)
+metrics.gauge('room_actors', 'Salas con buzón', lambda: len(actors))
+metrics.gauge('room_actor_backlog', 'Mensajes esperando en los buzones de sala', actors.backlog)
+metrics.gauge('lobby_rooms', 'Salas abiertas en el listado público', lambda: len(lobby))
+metrics.gauge('spectators', 'Espectadores conectados', lambda: len(spectators))
+metrics.gauge('spectator_events_pending', 'Eventos retenidos para los espectadores', spectator_feed.pending)
+metrics.gauge('profiler_running', 'Profiler por muestreo en marcha', lambda: int(profiler.running))
+
+@socket_handler('create_test_room')
 def handle_create_test_room(data):
     """Crear salas de testing con configuraciones predefinidas"""
     test_type = data.get('test_type', 'lone_wolf')
@@ -58,7 +485,14 @@ def handle_create_test_room(data):
         return
     
     config = test_configs[test_type]
-    room_code = f"TEST{random.randint(100, 999)}"
+    if not make_room_for_new():
+        emit('error', {'msg': 'El servidor está lleno, inténtalo más tarde'})
+        return
+    try:
+        room_code = test_room_codes.allocate()
+    except RoomCodesExhausted:
+        emit('error', {'msg': 'No hay salas de testing disponibles'})
+        return
     
     # Crear jugadores ficticios
     test_players = []
@@ -66,31 +500,33 @@ def handle_create_test_room(data):
         # Usar socket_id del usuario real para el primer jugador
         socket_id = request.sid if i == 0 else f"fake_socket_{i}_{random.randint(1000, 9999)}"
         
-        test_players.append({
-            'socket_id': socket_id,
-            'username': player_name,
-            'is_host': i == 0,
-            'original_role': config['roles'][i],
-            'current_role': config['roles'][i],
-            'has_acted': False
-        })
+        role = Role(config['roles'][i])
+        test_players.append(Player(
+            socket_id=socket_id,
+            username=player_name,
+            is_host=i == 0,
+            original_role=role,
+            current_role=role
+        ))
     
-    # Registrar solo al jugador real
-    players[request.sid] = {
-        'username': config['players'][0],
-        'room_code': room_code
-    }
+    # Registrar solo al jugador real (si estaba mirando una sala, deja de hacerlo)
+    stop_spectating(request.sid)
+    players[request.sid] = PlayerSession(username=config['players'][0], room_code=room_code)
+    if recorder is not None:
+        recorder.room(request.sid, room_code)
     
     # Crear sala de testing
-    rooms[room_code] = {
-        'players': test_players,
-        'game_state': 'waiting',
-        'host_id': request.sid,
-        'is_test_room': True
-    }
+    rooms[room_code] = Room(
+        code=room_code,
+        host_id=request.sid,
+        players=test_players,
+        is_test_room=True
+    )
     
-    print(f"DEBUG: Sala de testing creada: {room_code} - {config['description']}")
-    print(f"DEBUG: Roles asignados: {[f'{p['username']}={p['original_role']}' for p in test_players]}")
+    log.debug("Sala de testing creada: %s - %s", room_code, config['description'], extra={'room_code': room_code})
+    if log.isEnabledFor(logs.logging.DEBUG):
+        log.debug("Roles asignados: %s", [f'{p.username}={p.original_role}' for p in test_players],
+                  extra={'room_code': room_code})
     
     emit('test_room_created', {
         'room_code': room_code,
@@ -99,48 +535,297 @@ def handle_create_test_room(data):
         'is_host': True
     })
     
-    emit('room_updated', {
-        'players': test_players,
-        'room_code': room_code
-    })
+    emit('room_updated', rooms[room_code].snapshot())
 
-@socketio.on('connect')
-def handle_connect():
+@socket_handler('connect')
+def handle_connect(auth=None):
     """Cuando un usuario se conecta"""
-    print(f'Usuario conectado: {request.sid}')
+    log.info('Usuario conectado', extra={'socket_id': request.sid})
+    if isinstance(auth, dict) and auth.get('wire') == wire.VERSION:
+        outbox.binary_sids.add(request.sid)
     emit('status', {'msg': 'Conectado al servidor!'})
 
-@socketio.on('disconnect')
-def handle_disconnect():
+@socket_handler('disconnect')
+def handle_disconnect(reason=None):
     """Cuando un usuario se desconecta"""
-    print(f'Usuario desconectado: {request.sid}')
+    log.info('Usuario desconectado', extra={'socket_id': request.sid})
+    outbox.binary_sids.discard(request.sid)
+    rate_limiter.forget(request.sid)
+    
+    # Los espectadores no están en la sala: basta con olvidarlos
+    stop_spectating(request.sid)
     
     # Si el jugador estaba en una sala, removerlo
     if request.sid in players:
         player_data = players[request.sid]
-        room_code = player_data['room_code']
+        room_code = player_data.room_code
         
-        # Remover jugador de la sala
+        # Remover jugador de la sala; en partida conserva su asiento (y su carta)
+        # hasta que vuelva con el mismo nombre (ver handle_join_room)
         if room_code in rooms:
-            rooms[room_code]['players'] = [
-                p for p in rooms[room_code]['players'] 
-                if p['socket_id'] != request.sid
-            ]
+            room = rooms[room_code]
+            seated = room.game is not None and not room.is_test_room
+            if not seated:
+                room.players = [p for p in room.players if p.socket_id != request.sid]
+            connected = [p for p in room.players if p.socket_id != request.sid and p.socket_id in players]
             
-            # Si la sala quedó vacía, eliminarla
-            if not rooms[room_code]['players']:
-                del rooms[room_code]
+            # Si la sala quedó vacía (o solo con jugadores ficticios de testing, o
+            # en partida sin nadie conectado), eliminarla
+            if not room.players or room.is_test_room or (seated and not connected):
+                remove_room(room_code)
             else:
                 # Notificar a otros jugadores de la sala
-                socketio.emit('room_updated', {
-                    'players': rooms[room_code]['players'],
-                    'room_code': room_code
-                }, room=room_code)
+                if not seated:
+                    queue_room_delta(room, 'player_removed', username=player_data.username)
+                
+                # Si se fue el host, pasa a ser host el siguiente jugador conectado
+                if room.host_id == request.sid:
+                    for player in room.players:
+                        player.is_host = False
+                    new_host = (connected or room.players)[0]
+                    new_host.is_host = True
+                    room.host_id = new_host.socket_id
+                    queue_room_delta(room, 'host_changed', username=new_host.username)
+                update_lobby(room_code)
         
         # Remover jugador del registro
         del players[request.sid]
 
-@socketio.on('create_room')
+def remove_room(room_code, reason='empty'):
+    """Elimina una sala, cancela sus transiciones pendientes y libera su código"""
+    to_spectators(room_code, 'room_closed', {'room_code': room_code, 'reason': reason})
+    room = rooms.pop(room_code, None)
+    scheduler.cancel_key(room_code)
+    update_lobby(room_code)
+    if room is not None:
+        (test_room_codes if room.is_test_room else room_codes).release(room_code)
+    if journal is not None:
+        journal.touch(room_code)
+
+def evict_room(room_code, reason):
+    """Cierra una sala inactiva: avisa a sus jugadores, los saca y la elimina"""
+    room = rooms.get(room_code)
+    if room is None:
+        return
+    socketio.emit('room_closed', {'room_code': room_code, 'reason': reason}, room=room_code)
+    for player in room.players:
+        session = players.get(player.socket_id)
+        if session is not None and session.room_code == room_code:
+            del players[player.socket_id]
+            socketio.server.leave_room(player.socket_id, room_code, namespace='/')
+    metrics.inc('rooms_evicted_total', 'Salas cerradas por inactividad (ttl) o por el límite de salas (cap)',
+                reason=reason, state=room.game_state)
+    log.info('Sala %s cerrada (%s, estado %s)', room_code, reason, room.game_state, extra={'room_code': room_code})
+    remove_room(room_code, reason)
+
+def evict_if_idle(room_code):
+    """Desaloja la sala por el límite de salas si, con su turno, sigue inactiva"""
+    idle = rooms.idle_for(room_code)
+    if idle is not None and idle >= rooms.min_idle:
+        evict_room(room_code, 'cap')
+
+def evict_if_expired(room_code):
+    """Cierra la sala si, con su turno, sigue caducada (un handler en curso pudo renovarla)"""
+    if rooms.is_expired(room_code):
+        evict_room(room_code, 'ttl')
+
+def sweep_rooms():
+    """Tarea periódica: cierra las salas que superaron el TTL de su estado"""
+    try:
+        for room_code in rooms.expired():
+            actors.tell(room_code, evict_if_expired, room_code)
+        actors.prune(lambda room_code: room_code in rooms)
+    finally:
+        # Aunque el barrido falle, el siguiente queda programado
+        scheduler.call_later('__sweep__', ROOM_SWEEP_INTERVAL, sweep_rooms)
+
+def make_room_for_new():
+    """Desaloja salas LRU si se alcanzó el máximo; False si no hay hueco"""
+    ensure_sweeping()
+    try:
+        victims = rooms.victims_for_new_room()
+    except RoomStoreFull:
+        metrics.inc('rooms_rejected_total', 'Salas no creadas por estar el servidor lleno')
+        return False
+    # Cada sala se cierra con su propio turno, no con el del handler que crea la nueva
+    for room_code in victims:
+        actors.tell(room_code, evict_if_idle, room_code)
+    return True
+
+def ensure_sweeping():
+    """Programa el barrido periódico con la primera sala"""
+    global sweeping
+    if not sweeping:
+        sweeping = True
+        scheduler.call_later('__sweep__', ROOM_SWEEP_INTERVAL, sweep_rooms)
+
+sweeping = False
+
+def queue_room_delta(room, op, **fields):
+    """Registra un cambio de jugadores; los cambios de la ventana se envían juntos"""
+    if room.record_change(op, **fields):
+        scheduler.call_later(room.code, ROOM_UPDATE_WINDOW, flush_room_deltas, room.code)
+
+def spectator_room(room_code):
+    """Grupo de Socket.IO de los espectadores de una sala"""
+    return f'{room_code}:spectators'
+
+def broadcast(event, data, room_code):
+    """Evento público de la sala: a sus jugadores ahora y a sus espectadores con retraso"""
+    socketio.emit(event, data, room=room_code)
+    to_spectators(room_code, event, data)
+
+def to_spectators(room_code, event, data):
+    """Retiene un evento para los espectadores de la sala (si los tiene) hasta que sea visible"""
+    if spectator_counts.get(room_code) and spectator_feed.publish(room_code, event, data):
+        scheduler.call_later(SPECTATOR_TICK, max(spectator_feed.delay, SPECTATOR_INTERVAL), flush_spectators)
+
+SPECTATOR_TICK = '__spectators__'
+
+def flush_spectators():
+    """Tick de espectadores: a cada sala, lo que ya es visible en una sola escritura"""
+    for room_code, events in spectator_feed.due():
+        send_to_spectators(room_code, events)
+    delay = spectator_feed.rearm()
+    if delay is not None:
+        scheduler.call_later(SPECTATOR_TICK, max(delay, SPECTATOR_INTERVAL), flush_spectators)
+
+def send_to_spectators(room_code, events):
+    """Codifica los eventos una vez y los envía a todos los espectadores; los lentos se desconectan"""
+    group = spectator_room(room_code)
+    sids = [sid for sid, _ in socketio.server.manager.get_participants('/', group)]
+    slow = set(spectator_send_limit.over_limit(sids))
+    for sid in slow:
+        metrics.inc('spectators_dropped_total', 'Espectadores desconectados por cola de salida llena')
+        socketio.server.disconnect(sid)
+    sids = [sid for sid in sids if sid not in slow]
+    if sids:
+        event, data = events[0] if len(events) == 1 else ('batch', {'events': events})
+        binary = [sid for sid in sids if sid in outbox.binary_sids]
+        # Todo el grupo con el mismo formato: un emit a la sala, sin listas de sids
+        if len(binary) < len(sids):
+            text = [sid for sid in sids if sid not in outbox.binary_sids] if binary else group
+            outbox.send(event, data, namespace='/', to=text)
+        if binary:
+            outbox.send('wire', wire.encode(event, data), namespace='/',
+                        to=binary if len(binary) < len(sids) else group)
+        metrics.inc('spectator_messages_total', 'Eventos enviados a espectadores (una vez por sala)', len(events))
+        metrics.inc('spectator_deliveries_total', 'Escrituras a espectadores', len(sids))
+    if room_code not in rooms and not spectator_feed.waiting(room_code):
+        actors.tell(room_code, close_spectators, room_code)
+
+def stop_spectating(sid):
+    """Deja de tratar al socket como espectador (se desconecta o pasa a jugar)"""
+    room_code = spectators.pop(sid, None)
+    if room_code is None:
+        return
+    spectator_counts[room_code] -= 1
+    if spectator_counts[room_code] <= 0:
+        del spectator_counts[room_code]
+    socketio.server.leave_room(sid, spectator_room(room_code), namespace='/')
+
+def close_spectators(room_code):
+    """La sala ya no existe y sus espectadores lo vieron: se deshace su grupo"""
+    if room_code in rooms or spectator_feed.waiting(room_code):
+        return
+    group = spectator_room(room_code)
+    for sid, _ in socketio.server.manager.get_participants('/', group):
+        spectators.pop(sid, None)
+    socketio.server.close_room(group, namespace='/')
+    spectator_counts.pop(room_code, None)
+
+def update_lobby(room_code):
+    """Refleja la sala (o su eliminación) en el listado público; los cambios de la ventana se envían juntos"""
+    room = rooms.get(room_code)
+    if lobby.update(room) if room is not None else lobby.discard(room_code):
+        scheduler.call_later(LOBBY_ROOM, LOBBY_UPDATE_WINDOW, flush_lobby)
+
+def flush_lobby():
+    """Envía a los suscriptores del lobby los cambios acumulados en un único lobby_delta"""
+    changes = lobby.take_changes()
+    if changes:
+        socketio.emit('lobby_delta', {'version': changes[-1]['v'], 'changes': changes}, room=LOBBY_ROOM)
+
+def flush_room_deltas(room_code):
+    """Envía los deltas acumulados de una sala en un único room_delta"""
+    room = rooms.get(room_code)
+    if room is None:
+        return
+    changes = room.take_deltas()
+    if changes:
+        broadcast('room_delta', {
+            'room_code': room_code,
+            'version': room.version,
+            'changes': changes
+        }, room_code)
+
+@socket_handler('request_room_snapshot')
+def handle_request_room_snapshot(data=None):
+    """Estado completo de la sala para un cliente que perdió deltas"""
+    session = players.get(request.sid)
+    if session is None or session.room_code not in rooms:
+        emit('error', {'msg': 'No estás en una sala'})
+        return
+    emit('room_updated', rooms[session.room_code].snapshot())
+
+@socket_handler('list_rooms')
+def handle_list_rooms(data=None):
+    """Página de salas abiertas (offset, limit, min_free); con subscribe, después llegan los lobby_delta"""
+    data = data if isinstance(data, dict) else {}
+    if data.get('subscribe'):
+        # Antes de leer la página: ningún cambio posterior a su versión se pierde
+        join_room(LOBBY_ROOM)
+    try:
+        page = lobby.page(data.get('offset', 0), data.get('limit', 20), data.get('min_free', 1))
+    except (TypeError, ValueError):
+        emit('error', {'msg': 'Petición de listado inválida'})
+        return
+    emit('room_list', page)
+
+@socket_handler('unsubscribe_lobby')
+def handle_unsubscribe_lobby():
+    """Deja de recibir los cambios del listado de salas"""
+    leave_room(LOBBY_ROOM)
+
+@socket_handler('spectate')
+def handle_spectate(data):
+    """Ver una sala como espectador: sin jugar y con retraso"""
+    room_code = data['room_code'].strip().upper()
+    
+    # La sala vive en otro worker: el cliente debe reconectarse allí
+    if room_code and not owns_room(room_code):
+        owner = cluster_config.owner(room_code)
+        emit('room_redirect', {
+            'room_code': room_code,
+            'url': cluster_config.worker_url(owner),
+            'spectate': True
+        })
+        return
+    
+    if request.sid in players or request.sid in spectators:
+        emit('error', {'msg': 'Ya estás en una sala'})
+        return
+    
+    room = rooms.get(room_code)
+    if room is None or room.is_test_room:
+        emit('error', {'msg': 'Sala no encontrada'})
+        return
+    
+    if spectator_counts[room_code] >= MAX_SPECTATORS:
+        emit('error', {'msg': 'No caben más espectadores en esta sala'})
+        return
+    
+    spectators[request.sid] = room_code
+    spectator_counts[room_code] += 1
+    join_room(spectator_room(room_code))
+    leave_room(LOBBY_ROOM)
+    
+    log.info('Espectador en la sala %s', room_code, extra={'room_code': room_code, 'socket_id': request.sid})
+    
+    # Quiénes juegan es público; lo que pase a partir de ahora llega con retraso
+    emit('spectating', {**room.snapshot(), 'game_state': room.game_state, 'delay': SPECTATOR_DELAY})
+
+@socket_handler('create_room')
 def handle_create_room(data):
     """Crear una nueva sala"""
     username = data['username'].strip()
@@ -149,48 +834,50 @@ def handle_create_room(data):
         emit('error', {'msg': 'Nombre inválido'})
         return
     
-    # Generar código único
-    room_code = generate_room_code()
-    while room_code in rooms:
-        room_code = generate_room_code()
+    if not make_room_for_new():
+        emit('error', {'msg': 'El servidor está lleno, inténtalo más tarde'})
+        return
     
-    # Crear datos del jugador
-    player_data = {
-        'socket_id': request.sid,
-        'username': username,
-        'is_host': True
-    }
+    # Código libre que pertenezca a este worker
+    try:
+        room_code = room_codes.allocate()
+    except RoomCodesExhausted:
+        emit('error', {'msg': 'No hay salas disponibles, inténtalo más tarde'})
+        return
     
-    # Crear sala
-    rooms[room_code] = {
-        'players': [player_data],
-        'game_state': 'waiting',
-        'host_id': request.sid
-    }
+    # Un espectador que pasa a jugar deja de recibir lo que ven los espectadores
+    stop_spectating(request.sid)
+    
+    # Crear sala con el jugador como host
+    host = Player(socket_id=request.sid, username=username, is_host=True)
+    rooms[room_code] = Room(
+        code=room_code,
+        host_id=request.sid,
+        players=[host]
+    )
     
     # Registrar jugador
-    players[request.sid] = {
-        'username': username,
-        'room_code': room_code
-    }
+    players[request.sid] = PlayerSession(username=username, room_code=room_code)
+    if recorder is not None:
+        recorder.room(request.sid, room_code)
     
-    # Unir al jugador a la sala de Socket.IO
+    # Unir al jugador a la sala de Socket.IO (y dejar de seguir el listado)
     join_room(room_code)
+    leave_room(LOBBY_ROOM)
+    update_lobby(room_code)
     
-    print(f'{username} creó la sala {room_code}')
+    log.info('%s creó la sala %s', username, room_code, extra={'room_code': room_code, 'socket_id': request.sid})
     
     emit('room_created', {
         'room_code': room_code,
         'username': username,
-        'is_host': True
+        'is_host': True,
+        'rejoin_token': host.rejoin_token
     })
     
-    emit('room_updated', {
-        'players': rooms[room_code]['players'],
-        'room_code': room_code
-    })
+    emit('room_updated', rooms[room_code].snapshot())
 
-@socketio.on('join_room')
+@socket_handler('join_room')
 def handle_join_room(data):
     """Unirse a una sala existente"""
     username = data['username'].strip()
@@ -200,164 +887,207 @@ def handle_join_room(data):
         emit('error', {'msg': 'Nombre inválido'})
         return
     
+    # La sala vive en otro worker: el cliente debe reconectarse allí
+    if room_code and not owns_room(room_code):
+        owner = cluster_config.owner(room_code)
+        emit('room_redirect', {
+            'room_code': room_code,
+            'url': cluster_config.worker_url(owner)
+        })
+        return
+    
     if not room_code or room_code not in rooms:
         emit('error', {'msg': 'Sala no encontrada'})
         return
     
+    # Un jugador sin socket (se desconectó en plena partida, o la sala se recuperó
+    # tras un reinicio) vuelve a su asiento con un socket nuevo; el nombre no basta,
+    # hace falta el token que recibió al sentarse
+    room = rooms[room_code]
+    token = data.get('rejoin_token')
+    stale = next((p for p in room.players
+                  if p.username.lower() == username.lower() and p.socket_id not in players), None)
+    if (stale is not None and not room.is_test_room and isinstance(token, str)
+            and hmac.compare_digest(token.encode(), stale.rejoin_token.encode())):
+        stop_spectating(request.sid)
+        resume_player(room, stale)
+        return
+    
     # Verificar que el nombre no esté en uso en esta sala
-    existing_names = [p['username'].lower() for p in rooms[room_code]['players']]
+    existing_names = [p.username.lower() for p in rooms[room_code].players]
     if username.lower() in existing_names:
         emit('error', {'msg': 'Ese nombre ya está en uso en esta sala'})
         return
     
     # Verificar límite de jugadores (máximo 10 para One Night Werewolf)
-    if len(rooms[room_code]['players']) >= 10:
+    if len(rooms[room_code].players) >= MAX_PLAYERS:
         emit('error', {'msg': 'La sala está llena'})
         return
     
-    # Crear datos del jugador
-    player_data = {
-        'socket_id': request.sid,
-        'username': username,
-        'is_host': False
-    }
+    # Un espectador que pasa a jugar deja de recibir lo que ven los espectadores
+    # (las cartas de todos, las acciones de la noche y cada evento por duplicado)
+    stop_spectating(request.sid)
     
     # Agregar jugador a la sala
-    rooms[room_code]['players'].append(player_data)
+    player = Player(socket_id=request.sid, username=username)
+    rooms[room_code].players.append(player)
     
     # Registrar jugador
-    players[request.sid] = {
-        'username': username,
-        'room_code': room_code
-    }
+    players[request.sid] = PlayerSession(username=username, room_code=room_code)
     
-    # Unir al jugador a la sala de Socket.IO
+    # Unir al jugador a la sala de Socket.IO (y dejar de seguir el listado)
     join_room(room_code)
+    leave_room(LOBBY_ROOM)
+    update_lobby(room_code)
     
-    print(f'{username} se unió a la sala {room_code}')
+    log.info('%s se unió a la sala %s', username, room_code, extra={'room_code': room_code, 'socket_id': request.sid})
     
     emit('room_joined', {
         'room_code': room_code,
         'username': username,
-        'is_host': False
+        'is_host': False,
+        'rejoin_token': player.rejoin_token
     })
     
-    # Notificar a todos en la sala
-    socketio.emit('room_updated', {
-        'players': rooms[room_code]['players'],
-        'room_code': room_code
-    }, room=room_code)
+    # El nuevo jugador recibe el estado completo; el resto, solo el delta
+    queue_room_delta(rooms[room_code], 'player_added', player=player.public_dict())
+    emit('room_updated', rooms[room_code].snapshot())
 
-@socketio.on('start_game')
+def resume_player(room, player):
+    """Asigna el socket actual a un jugador que perdió el suyo (desconexión en partida o reinicio)"""
+    old_sid = player.socket_id
+    if room.game is not None:
+        room.game.rebind_socket(player, request.sid)
+    else:
+        player.socket_id = request.sid
+    if room.host_id == old_sid:
+        room.host_id = request.sid
+    
+    players[request.sid] = PlayerSession(username=player.username, room_code=room.code)
+    join_room(room.code)
+    leave_room(LOBBY_ROOM)
+    log.info('%s volvió a la sala %s', player.username, room.code, extra={'room_code': room.code, 'socket_id': request.sid})
+    
+    emit('room_joined', {
+        'room_code': room.code,
+        'username': player.username,
+        'is_host': player.is_host,
+        'rejoin_token': player.rejoin_token
+    })
+    emit('room_updated', room.snapshot())
+    if room.roles_assigned and player.original_role is not None:
+        role_name = ROLE_NAMES.get(player.original_role, player.original_role)
+        emit('your_role', {
+            'role': player.original_role,
+            'role_name': role_name,
+            'description': wire.text('your_role', role=role_name)
+        })
+
+@socket_handler('start_game')
 def handle_start_game():
     """Iniciar el juego (solo el host puede hacerlo)"""
     if request.sid not in players:
         emit('error', {'msg': 'No estás en una sala'})
         return
     
-    room_code = players[request.sid]['room_code']
+    room_code = players[request.sid].room_code
     
     # Verificar que sea el host
-    if rooms[room_code]['host_id'] != request.sid:
+    if rooms[room_code].host_id != request.sid:
         emit('error', {'msg': 'Solo el host puede iniciar el juego'})
         return
     
     # Verificar mínimo de jugadores (3 para testing, ideal 5+)
-    if len(rooms[room_code]['players']) < 3:
+    if len(rooms[room_code].players) < 3:
         emit('error', {'msg': 'Necesitas al menos 3 jugadores para empezar'})
         return
     
     # Crear instancia del juego
-    game = GameLogic(rooms[room_code]['players'].copy(), room_code)
-    game_setup = game.setup_game()
+    game = GameLogic(rooms[room_code].players.copy(), room_code)
+    game_setup = game.setup_game(fake_phases=FAKE_NIGHT_PHASES, rng=game_rng(room_code))
     
     # Guardar el juego en la sala
-    rooms[room_code]['game'] = game
-    rooms[room_code]['game_state'] = 'preparation'  # Cambiar a preparación
+    rooms[room_code].game = game
+    rooms[room_code].game_state = 'preparation'  # Cambiar a preparación
+    update_lobby(room_code)  # ya no se puede entrar
     
     # Notificar a todos que el juego comenzó (sin roles aún)
-    socketio.emit('game_started', {
+    broadcast('game_started', {
         'msg': '🌙 ¡El juego comenzó! Es de noche...',
         'phase_order': game_setup['phase_order']
-    }, room=room_code)
+    }, room_code)
     
     # Fase inicial: "Cerrad los ojos todos" (SIN enviar roles aún)
-    socketio.emit('narrator_message', {
+    broadcast('narrator_message', {
         'message': '🌙 Cerrad los ojos todos...',
         'phase': 'eyes_closed'
-    }, room=room_code)
+    }, room_code)
     
     # Después de 5 segundos: asignar roles y comenzar fases nocturnas
-    # Usar SocketIO background task en lugar de threading.Timer
-    socketio.start_background_task(delayed_role_assignment, room_code)
+    scheduler.call_later(room_code, PHASE_DELAYS['role_assignment'], delayed_role_assignment, room_code)
     
-    print(f'Juego iniciado en sala {room_code} con {len(game.players)} jugadores')
+    log.info('Juego iniciado en sala %s con %d jugadores', room_code, len(game.players), extra={'room_code': room_code})
 
 def delayed_role_assignment(room_code):
-    """Tarea en background para asignar roles después del delay"""
-    import time
-    time.sleep(5.0)  # Esperar 5 segundos
-    
+    """Tarea programada para asignar roles después de la preparación"""
     # Verificar que la sala aún existe y no está ya procesando
-    if room_code not in rooms or 'game' not in rooms[room_code]:
-        print(f"DEBUG: Sala {room_code} no existe en delayed_role_assignment")
+    if room_code not in rooms or rooms[room_code].game is None:
+        log.debug("Sala %s no existe en delayed_role_assignment", room_code, extra={'room_code': room_code})
         return
         
     # Evitar ejecución doble
-    if rooms[room_code].get('roles_assigned', False):
-        print(f"DEBUG: Roles ya asignados en sala {room_code}, evitando duplicado")
+    if rooms[room_code].roles_assigned:
+        log.debug("Roles ya asignados en sala %s, evitando duplicado", room_code, extra={'room_code': room_code})
         return
         
-    rooms[room_code]['roles_assigned'] = True
+    rooms[room_code].roles_assigned = True
     start_role_assignment_and_night(room_code)
 
 def start_role_assignment_and_night(room_code: str):
     """Asigna roles después de la preparación y comienza la noche"""
-    if room_code not in rooms or 'game' not in rooms[room_code]:
-        print(f"DEBUG: Sala {room_code} no encontrada en start_role_assignment_and_night")
+    if room_code not in rooms or rooms[room_code].game is None:
+        log.debug("Sala %s no encontrada en start_role_assignment_and_night", room_code, extra={'room_code': room_code})
         return
         
-    game = rooms[room_code]['game']
-    print(f"DEBUG: Iniciando asignación de roles en sala {room_code}")
+    game = rooms[room_code].game
+    log.debug("Iniciando asignación de roles en sala %s", room_code, extra={'room_code': room_code})
     
     # AHORA sí enviar roles secretos a cada jugador
     for player in game.players:
-        role_name = ROLE_NAMES.get(player['original_role'], player['original_role'])
-        print(f"DEBUG: Enviando rol {player['original_role']} ({role_name}) a {player['username']} (socket: {player['socket_id']})")
+        role_name = ROLE_NAMES.get(player.original_role, player.original_role)
+        log.debug("Enviando rol %s (%s) a %s", player.original_role, role_name, player.username,
+                  extra={'room_code': room_code, 'socket_id': player.socket_id})
         
         # Verificar si el socket_id existe en la lista de jugadores conectados
-        socket_exists = False
-        for socket_id, player_data in players.items():
-            if socket_id == player['socket_id']:
-                socket_exists = True
-                break
-        
-        if socket_exists:
+        if player.socket_id in players:
             socketio.emit('your_role', {
-                'role': player['original_role'],
+                'role': player.original_role,
                 'role_name': role_name,
-                'description': f'Tu rol secreto es: {role_name}'
-            }, to=player['socket_id'])  # Cambiar 'room' por 'to'
-            print(f"DEBUG: ✅ Rol enviado a {player['username']}")
+                'description': wire.text('your_role', role=role_name)
+            }, to=player.socket_id)  # Cambiar 'room' por 'to'
         else:
-            print(f"DEBUG: ❌ Socket {player['socket_id']} no existe para {player['username']}")
+            log.debug("Socket %s no existe para %s", player.socket_id, player.username,
+                      extra={'room_code': room_code, 'socket_id': player.socket_id})
     
-    rooms[room_code]['game_state'] = 'night'
-    print(f"DEBUG: Estado cambiado a 'night' para sala {room_code}")
+    # Los espectadores ven todas las cartas (con retraso)
+    to_spectators(room_code, 'spectator_roles', {
+        'roles': [{'username': p.username, 'role': p.original_role} for p in game.players],
+        'center': list(game.center_cards)
+    })
     
-    # Comenzar la primera fase nocturna
-    if game.phase_order:
-        print(f"DEBUG: Iniciando fases nocturnas. Orden: {game.phase_order}")
-        start_next_night_phase(room_code)
-    else:
-        print(f"DEBUG: No hay fases nocturnas programadas")
+    rooms[room_code].game_state = 'night'
+    log.debug("Estado cambiado a 'night' para sala %s", room_code, extra={'room_code': room_code})
+    
+    # Comenzar la primera fase nocturna (o amanecer directamente si no hay ninguna)
+    log.debug("Iniciando fases nocturnas. Orden: %s", game.phase_order, extra={'room_code': room_code})
+    start_next_night_phase(room_code)
 
 def start_next_night_phase(room_code: str):
     """Inicia la siguiente fase nocturna"""
-    if room_code not in rooms or 'game' not in rooms[room_code]:
+    if room_code not in rooms or rooms[room_code].game is None:
         return
         
-    game = rooms[room_code]['game']
+    game = rooms[room_code].game
     
     if not game.phase_order:
         # No hay más fases, terminar la noche
@@ -368,122 +1098,137 @@ def start_next_night_phase(room_code: str):
     current_phase = game.phase_order.pop(0)
     phase_info = game.start_night_phase(current_phase)
     
-    print(f'Iniciando fase: {current_phase} en sala {room_code}')
+    log.debug('Iniciando fase: %s en sala %s', current_phase, room_code, extra={'room_code': room_code})
     
     # Notificar a todos sobre la fase actual
-    socketio.emit('night_phase_started', {
+    broadcast('night_phase_started', {
         'phase': phase_info['phase'],
         'role_name': phase_info['role_name'],
-        'description': phase_info['description']
-    }, room=room_code)
+        'description': wire.text('phase_turn', role=phase_info['role_name'])
+    }, room_code)
+    
+    # Fase simulada (rol en el centro): nadie actúa, pero dura como una real
+    if phase_info['simulated']:
+        duration = PHASE_BUDGETS[current_phase] * game.rng.uniform(*FAKE_PHASE_SPAN)
+        scheduler.call_later(room_code, duration, complete_phase, room_code, game.phase_seq)
+        return
+    
+    # Plazo de la fase: al vencer se resuelve con quien haya actuado
+    scheduler.call_later(room_code, PHASE_BUDGETS[current_phase], phase_timeout, room_code, game.phase_seq)
     
     # SPECIAL CASE: Lobos se ven automáticamente
-    if current_phase == 'werewolf':
-        print(f"DEBUG: Procesando fase de lobos en sala {room_code}")
-        
-        # Pequeño delay para asegurar que los clientes estén listos
-        import threading
-        
-        def send_werewolf_info():
-            # Enviar información automática a cada lobo
-            for player_info in phase_info['players_can_act']:
-                print(f"DEBUG: Procesando lobo: {player_info['username']}")
-                result = execute_werewolf_action(game, player_info['socket_id'], {})
-                print(f"DEBUG: Resultado para {player_info['username']}: {result}")
-                
-                # Si es lobo solitario, permitir elegir carta del centro
-                if result['is_lone_wolf']:
-                    socketio.emit('your_turn', {
-                        'phase': current_phase,
-                        'role_name': phase_info['role_name'],
-                        'can_act': True,
-                        'action_type': 'choose_center_card',
-                        'werewolf_info': {
-                            'other_werewolves': result['other_werewolves'],
-                            'is_lone_wolf': True,
-                            'message': 'Eres el único lobo. Puedes elegir UNA carta del centro para ver.'
-                        }
-                    }, to=player_info['socket_id'])  # Cambiar 'room' por 'to'
-                    print(f"DEBUG: {player_info['username']} es lobo solitario")
-                else:
-                    # Para múltiples lobos, enviar la información directamente
-                    other_wolves_names = [w['username'] for w in result['other_werewolves']]
-                    message = f"El otro lobo es: {', '.join(other_wolves_names)}" if len(other_wolves_names) == 1 else f"Los otros lobos son: {', '.join(other_wolves_names)}"
-                    
-                    socketio.emit('werewolf_multiple_info', {
-                        'other_werewolves': result['other_werewolves'],
-                        'is_lone_wolf': False,
-                        'message': message
-                    }, to=player_info['socket_id'])  # Cambiar 'room' por 'to'
-                    
-                    print(f"DEBUG: {player_info['username']} tiene otros lobos: {other_wolves_names}")
-            
-            # Si no hay lobos solitarios, verificar si la fase está completa
-            werewolves = game.get_players_with_role('werewolf')
-            if len(werewolves) > 1:
-                print(f"DEBUG: Múltiples lobos ({len(werewolves)}), avanzando automáticamente")
-                # Todos los lobos ya "actuaron" automáticamente, continuar
-                timer2 = threading.Timer(4.0, lambda: start_next_night_phase(room_code))
-                timer2.start()
-        
-        # Enviar la info después de 1 segundo
-        timer = threading.Timer(1.0, send_werewolf_info)
-        timer.start()
+    if current_phase == Role.WEREWOLF:
+        # Enviar la info después de 1 segundo, para asegurar que los clientes estén listos
+        scheduler.call_later(room_code, PHASE_DELAYS['werewolf_info'], send_werewolf_info, room_code)
     else:
         # Para otros roles, notificar normalmente
         for player_info in phase_info['players_can_act']:
+            player = game.get_player_by_socket_id(player_info['socket_id'])
             socketio.emit('your_turn', {
                 'phase': current_phase,
                 'role_name': phase_info['role_name'],
-                'can_act': True
+                'can_act': True,
+                **game.turn_info(player)
             }, to=player_info['socket_id'])  # Cambiar 'room' por 'to'
 
+def send_werewolf_info(room_code: str):
+    """Tarea programada: información automática para cada lobo"""
+    if room_code not in rooms or rooms[room_code].game is None:
+        return
+    
+    game = rooms[room_code].game
+    role_name = ROLE_NAMES[Role.WEREWOLF]
+    
+    for player in game.get_players_with_original_role(Role.WEREWOLF):
+        if player.has_acted:
+            continue
+        result = execute_werewolf_action(game, player.socket_id, {})
+        log.debug("Resultado para %s: %s", player.username, result,
+                  extra={'room_code': room_code, 'socket_id': player.socket_id})
+        
+        # Si es lobo solitario, permitir elegir carta del centro
+        if result['is_lone_wolf']:
+            socketio.emit('your_turn', {
+                'phase': Role.WEREWOLF,
+                'role_name': role_name,
+                'can_act': True,
+                'action_type': 'choose_center_card',
+                'werewolf_info': {
+                    'other_werewolves': result['other_werewolves'],
+                    'is_lone_wolf': True,
+                    'message': 'Eres el único lobo. Puedes elegir UNA carta del centro para ver.'
+                }
+            }, to=player.socket_id)  # Cambiar 'room' por 'to'
+        else:
+            # Para múltiples lobos, enviar la información directamente
+            other_wolves_names = [w['username'] for w in result['other_werewolves']]
+            message = wire.text('other_wolf' if len(other_wolves_names) == 1 else 'other_wolves',
+                                names=', '.join(other_wolves_names))
+            
+            socketio.emit('werewolf_multiple_info', {
+                'other_werewolves': result['other_werewolves'],
+                'is_lone_wolf': False,
+                'message': message
+            }, to=player.socket_id)  # Cambiar 'room' por 'to'
+    
+    # Si no hay lobos solitarios, verificar si la fase está completa
+    werewolves = game.get_players_with_role(Role.WEREWOLF)
+    if len(werewolves) > 1:
+        log.debug("Múltiples lobos (%d), avanzando automáticamente", len(werewolves), extra={'room_code': room_code})
+        # Todos los lobos ya "actuaron" automáticamente, continuar
+        complete_phase(room_code, game.phase_seq, PHASE_DELAYS['werewolves_advance'])
+
 def end_night_phase(room_code: str):
     """Termina la fase nocturna e inicia la discusión"""
-    if room_code not in rooms or 'game' not in rooms[room_code]:
+    if room_code not in rooms or rooms[room_code].game is None:
         return
         
-    rooms[room_code]['game_state'] = 'discussion'
+    # Los intercambios de la noche se aplican todos juntos al amanecer
+    swaps = rooms[room_code].game.resolve_night()
+    rooms[room_code].game_state = 'discussion'
     
-    socketio.emit('night_ended', {
+    broadcast('night_ended', {
         'msg': '☀️ ¡Amaneció! Es hora de discutir...',
         'phase': 'discussion'
-    }, room=room_code)
+    }, room_code)
     
-    print(f'Fase nocturna terminada en sala {room_code}')
+    log.info('Fase nocturna terminada en sala %s (%d intercambios)', room_code, swaps, extra={'room_code': room_code})
 
-@socketio.on('night_action')
+@socket_handler('night_action')
 def handle_night_action(data):
     """Manejar acciones nocturnas de los jugadores"""
     if request.sid not in players:
         emit('error', {'msg': 'No estás en una sala'})
         return
         
-    room_code = players[request.sid]['room_code']
+    room_code = players[request.sid].room_code
     
     if (room_code not in rooms or 
-        'game' not in rooms[room_code] or 
-        rooms[room_code]['game_state'] != 'night'):
+        rooms[room_code].game is None or 
+        rooms[room_code].game_state != 'night'):
         emit('error', {'msg': 'No es el momento de actuar'})
         return
     
-    game = rooms[room_code]['game']
+    game = rooms[room_code].game
     action_type = data.get('action_type')
     
-    # Ejecutar acción según el tipo
-    result = None
-    if action_type == 'werewolf':
-        result = execute_werewolf_action(game, request.sid, data)
+    # Validar y ejecutar la acción de su rol
+    result = execute_night_action(game, request.sid, action_type, data)
     
-    if result and result.get('success'):
+    if result.get('success'):
         emit('action_result', result)
+        to_spectators(room_code, 'spectator_action', {
+            'username': players[request.sid].username,
+            'action_type': action_type,
+            'result': result
+        })
         
         # Si el lobo solitario eligió una carta del centro, avanzar después de 3 segundos
         if (action_type == 'werewolf' and 
             result.get('center_card') and 
             result.get('is_lone_wolf')):
-            print(f"DEBUG: Lobo solitario eligió carta del centro, avanzando en 3 segundos")
-            socketio.start_background_task(delayed_next_phase, room_code, 3.0)
+            log.debug("Lobo solitario eligió carta del centro, avanzando", extra={'room_code': room_code})
+            complete_phase(room_code, game.phase_seq, PHASE_DELAYS['lone_wolf_advance'])
         else:
             # Para otros casos, verificar si todos completaron la fase
             check_phase_completion(room_code)
@@ -492,41 +1237,131 @@ def handle_night_action(data):
 
 def check_phase_completion(room_code: str):
     """Verifica si todos los jugadores de la fase actual completaron sus acciones"""
-    if room_code not in rooms or 'game' not in rooms[room_code]:
+    if room_code not in rooms or rooms[room_code].game is None:
         return
         
-    game = rooms[room_code]['game']
+    game = rooms[room_code].game
     current_phase = game.current_phase
     
     # Verificar si todos los jugadores que podían actuar ya actuaron
-    players_in_phase = [p for p in game.players if p['original_role'] == current_phase]
-    all_acted = all(p['has_acted'] for p in players_in_phase)
+    players_in_phase = game.get_players_with_original_role(current_phase)
+    all_acted = all(p.has_acted for p in players_in_phase)
     
     if all_acted:
-        # Continuar con la siguiente fase después de un delay
-        socketio.emit('phase_completed', {
-            'phase': current_phase,
-            'msg': f'Todos los {current_phase} terminaron. Continuando...'
-        }, room=room_code)
-        
-        # Usar un timer para dar tiempo a que se procese
-        socketio.start_background_task(delayed_next_phase, room_code, 2.0)
-
-# Funciones auxiliares para background tasks
-def delayed_next_phase(room_code, delay_seconds):
-    """Tarea en background para avanzar a la siguiente fase después de un delay"""
-    import time
-    time.sleep(delay_seconds)
-    start_next_night_phase(room_code)
+        complete_phase(room_code, game.phase_seq)
 
-def delayed_werewolf_info(room_code, callback_function):
-    """Tarea en background para ejecutar acciones de lobos después de un delay"""
-    print(f"DEBUG: delayed_werewolf_info iniciada para sala {room_code}")
-    import time
-    time.sleep(2.0)  # Esperar 2 segundos
-    print(f"DEBUG: delayed_werewolf_info ejecutando callback para sala {room_code}")
-    callback_function()
-    print(f"DEBUG: delayed_werewolf_info completada para sala {room_code}")
+def complete_phase(room_code: str, phase_seq: int, delay=None):
+    """Cierra la fase en curso (una sola vez) y programa la siguiente"""
+    if room_code not in rooms or rooms[room_code].game is None:
+        return
+    
+    game = rooms[room_code].game
+    # Un plazo de una fase anterior, o una fase ya cerrada, no hace nada
+    if game.phase_seq != phase_seq or game.phase_resolved:
+        return
+    game.phase_resolved = True
+    
+    # Continuar con la siguiente fase después de un delay
+    broadcast('phase_completed', {
+        'phase': game.current_phase,
+        'msg': wire.text('phase_done', phase=game.current_phase)
+    }, room_code)
+    
+    # Dar tiempo a que se procese antes de avanzar
+    if delay is None:
+        delay = PHASE_DELAYS['phase_completed']
+    scheduler.call_later(room_code, delay, start_next_night_phase, room_code)
+
+def phase_timeout(room_code: str, phase_seq: int):
+    """Tarea programada: se agotó el plazo de la fase; los que no actuaron pierden el turno"""
+    if room_code not in rooms or rooms[room_code].game is None:
+        return
+    
+    game = rooms[room_code].game
+    if game.phase_seq != phase_seq or game.phase_resolved:
+        return
+    
+    for player in game.get_players_with_original_role(game.current_phase):
+        if not player.has_acted:
+            player.has_acted = True
+            socketio.emit('phase_timeout', {
+                'phase': game.current_phase,
+                'msg': 'Se acabó el tiempo para actuar'
+            }, to=player.socket_id)
+    
+    log.debug("Plazo agotado en la fase %s", game.current_phase, extra={'room_code': room_code})
+    complete_phase(room_code, phase_seq)
+
+# Transiciones que se guardan en el diario y se reprograman al recuperar (por nombre)
+SCHEDULED_TASKS = {task.__name__: task for task in (
+    delayed_role_assignment, start_next_night_phase, send_werewolf_info, complete_phase, phase_timeout
+)}
+
+def encode_room_state(room):
+    """Registro de la sala para el diario, con sus transiciones pendientes"""
+    timers = [(callback.__name__, delay, args) for delay, callback, args in scheduler.tasks(room.code)
+              if SCHEDULED_TASKS.get(callback.__name__) is callback]
+    return encode_room(room, timers)
+
+def start_persistence():
+    """Recupera las salas guardadas en WEREWOLF_STATE_DIR y arranca el diario"""
+    global journal
+    state_dir = os.environ.get('WEREWOLF_STATE_DIR')
+    if not state_dir:
+        return
+    if cluster_config is not None:
+        state_dir = os.path.join(state_dir, f'worker-{cluster_config.worker_id}')
+    
+    store = RoomJournal(state_dir, rooms, encode_room_state)
+    for record in store.load().values():
+        room, timers = decode_room(record)
+        rooms[room.code] = room
+        (test_room_codes if room.is_test_room else room_codes).reserve(room.code)
+        update_lobby(room.code)
+        for name, delay, args in timers:
+            scheduler.call_later(room.code, delay, SCHEDULED_TASKS[name], *args)
+    store.start()
+    journal = store
+    if rooms:
+        ensure_sweeping()
+    log.info('%d salas recuperadas de %s', len(rooms), state_dir)
+
+def recording_config():
+    """Configuración de la que dependen los tiempos de la noche (va en la cabecera de la grabación)"""
+    return {
+        'phase_delays': PHASE_DELAYS,
+        'phase_budgets': {role.value: seconds for role, seconds in PHASE_BUDGETS.items()},
+        'fake_phases': FAKE_NIGHT_PHASES,
+        'fake_phase_span': list(FAKE_PHASE_SPAN),
+    }
+
+def start_recording():
+    """Graba el tráfico en WEREWOLF_RECORD (un fichero por worker) para reproducirlo después"""
+    global recorder
+    path = os.environ.get('WEREWOLF_RECORD')
+    if not path:
+        return
+    if cluster_config is not None:
+        path = f'{path}.worker-{cluster_config.worker_id}'
+    recorder = Recorder.open(path, recording_config())
+    atexit.register(recorder.close)
+    log.info('Grabando el tráfico en %s', path)
+
+def run_worker():
+    """Punto de entrada de cada worker en modo multi-proceso"""
+    start_persistence()
+    start_recording()
+    socketio.run(app, host=cluster_config.host, port=cluster_config.port,
+                 debug=False, use_reloader=False, allow_unsafe_werkzeug=True)
 
 if __name__ == '__main__':
-    socketio.run(app, debug=True, host='127.0.0.1', port=5000)
\ No newline at end of file
+    workers = int(os.environ.get('WEREWOLF_WORKERS', '1'))
+    if workers > 1:
+        run_cluster(workers, host='127.0.0.1', base_port=5000)
+    else:
+        # Con el reloader de debug, solo el proceso hijo sirve peticiones
+        if os.environ.get('WERKZEUG_RUN_MAIN') == 'true':
+            start_persistence()
+            start_recording()
+        log.info('Servidor en modo %s', ASYNC_MODE)
+        socketio.run(app, debug=True, host='127.0.0.1', port=5000)
\ No newline at end of file
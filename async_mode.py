@@ -0,0 +1,61 @@
+"""Modo asíncrono del servidor, elegido con WEREWOLF_ASYNC_MODE.
+
+threading (por defecto) usa un hilo del sistema por conexión. eventlet y gevent
+ejecutan handlers, transiciones y hilos de fondo como corrutinas cooperativas
+sobre un bucle de eventos, con lo que las conexiones abiertas dejan de estar
+limitadas por el número de hilos. Requieren instalar el paquete correspondiente.
+"""
+import importlib
+import os
+
+ASYNC_MODES = ('threading', 'eventlet', 'gevent')
+
+# Modo aplicado por setup()
+current = 'threading'
+
+
+def configured_mode():
+    """Modo pedido en WEREWOLF_ASYNC_MODE"""
+    mode = os.environ.get('WEREWOLF_ASYNC_MODE', 'threading')
+    if mode not in ASYNC_MODES:
+        raise ValueError(f"WEREWOLF_ASYNC_MODE={mode!r} no es válido; opciones: {', '.join(ASYNC_MODES)}")
+    return mode
+
+
+def setup(mode=None):
+    """Aplica el monkey patching del modo; hay que llamarlo antes de importar flask"""
+    global current
+    mode = mode or configured_mode()
+    try:
+        if mode == 'eventlet':
+            import eventlet
+            eventlet.monkey_patch()
+        elif mode == 'gevent':
+            from gevent import monkey
+            monkey.patch_all()
+    except ImportError as exc:
+        raise RuntimeError(f"WEREWOLF_ASYNC_MODE={mode} necesita el paquete {mode} (pip install {mode})") from exc
+    current = mode
+    return mode
+
+
+def run_blocking(func, *args):
+    """Ejecuta una llamada que bloquea de verdad (p. ej. fsync) sin parar el bucle de eventos"""
+    if current == 'eventlet':
+        from eventlet import tpool
+        return tpool.execute(func, *args)
+    if current == 'gevent':
+        from gevent import get_hub
+        return get_hub().threadpool.apply(func, args)
+    return func(*args)
+
+
+def original(module_name, name):
+    """Objeto de la librería estándar sin parchear (p. ej. para un hilo del sistema de verdad)"""
+    if current == 'eventlet':
+        from eventlet import patcher
+        return getattr(patcher.original(module_name), name)
+    if current == 'gevent':
+        from gevent import monkey
+        return monkey.get_original(module_name, name)
+    return getattr(importlib.import_module(module_name), name)
@@ -0,0 +1,161 @@
+"""Benchmark: conexiones simultáneas y latencia según WEREWOLF_ASYNC_MODE.
+
+Uso: python benchmarks/bench_async_mode.py --connections 1000 --modes threading,eventlet
+
+Arranca el servidor real en un subproceso por cada modo y abre N conexiones
+WebSocket (Engine.IO v4 a mano con websocket-client, sin hilos en el cliente).
+Con todas abiertas mide la ida y vuelta de create_room -> room_created en
+ráfaga desde todas las conexiones, y el RSS e hilos del servidor. Los modos
+cuyo paquete no está instalado se omiten.
+"""
+import argparse
+import importlib.util
+import json
+import os
+import socket
+import subprocess
+import sys
+import time
+
+import websocket
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+
+SERVER = """
+import app
+app.socketio.run(app.app, host='127.0.0.1', port={port}, debug=False,
+                 use_reloader=False, log_output=False, allow_unsafe_werkzeug=True)
+"""
+
+
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def process_status(pid):
+    status = {}
+    with open(f'/proc/{pid}/status') as lines:
+        for line in lines:
+            key, _, value = line.partition(':')
+            status[key] = value.split()[0] if value.split() else ''
+    return int(status.get('VmRSS', 0)) / 1024, int(status.get('Threads', 0))
+
+
+def start_server(mode, port):
+    # Todas las conexiones salen de 127.0.0.1: sin límite de ritmo en los eventos usados
+    env = dict(os.environ, WEREWOLF_ASYNC_MODE=mode, WEREWOLF_LOG_LEVEL='WARNING', PYTHONPATH=ROOT,
+               WEREWOLF_RATE_LIMITS='connect=off,create_room=off')
+    server = subprocess.Popen([sys.executable, '-c', SERVER.format(port=port)], cwd=ROOT, env=env,
+                              stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    deadline = time.monotonic() + 20
+    while time.monotonic() < deadline:
+        try:
+            socket.create_connection(('127.0.0.1', port), timeout=0.5).close()
+            return server
+        except OSError:
+            time.sleep(0.1)
+    server.kill()
+    raise RuntimeError(f'el servidor en modo {mode} no arrancó')
+
+
+def connect(port, timeout):
+    """Conexión Engine.IO por WebSocket unida al namespace '/'"""
+    ws = websocket.create_connection(f'ws://127.0.0.1:{port}/socket.io/?EIO=4&transport=websocket',
+                                     timeout=timeout)
+    if not ws.recv().startswith('0'):
+        raise RuntimeError('handshake de Engine.IO inesperado')
+    ws.send('40')
+    while not ws.recv().startswith('40'):
+        pass
+    return ws
+
+
+def wait_for(ws, event):
+    """Lee paquetes hasta recibir el evento (suelto o dentro de un batch)"""
+    while True:
+        packet = ws.recv()
+        if packet == '2':
+            ws.send('3')  # ping del servidor
+            continue
+        if not packet.startswith('42'):
+            continue
+        name, *args = json.loads(packet[2:])
+        if name == event:
+            return
+        if name == 'batch' and any(inner == event for inner, _ in args[0]['events']):
+            return
+
+
+def run_mode(mode, connections, timeout):
+    port = free_port()
+    server = start_server(mode, port)
+    sockets = []
+    try:
+        idle_rss, idle_threads = process_status(server.pid)
+        start = time.perf_counter()
+        for _ in range(connections):
+            try:
+                sockets.append(connect(port, timeout))
+            except (OSError, websocket.WebSocketException):
+                break
+        connect_s = time.perf_counter() - start
+        rss, threads = process_status(server.pid)
+
+        # Ráfaga: todas las conexiones piden una sala a la vez
+        sent = []
+        for i, ws in enumerate(sockets):
+            ws.send('42' + json.dumps(['create_room', {'username': f'U{i}'}]))
+            sent.append(time.perf_counter())
+        latencies = []
+        for ws, sent_at in zip(sockets, sent):
+            try:
+                wait_for(ws, 'room_created')
+                latencies.append(time.perf_counter() - sent_at)
+            except (OSError, websocket.WebSocketException):
+                pass
+        return {
+            'open': len(sockets), 'connect_s': connect_s, 'answered': len(latencies),
+            'p50': percentile(latencies, 50), 'p99': percentile(latencies, 99),
+            'idle_rss': idle_rss, 'rss': rss, 'idle_threads': idle_threads, 'threads': threads,
+        }
+    finally:
+        for ws in sockets:
+            try:
+                ws.close()
+            except (OSError, websocket.WebSocketException):
+                pass
+        server.kill()
+        server.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Conexiones y latencia por modo asíncrono')
+    parser.add_argument('--connections', type=int, default=1000)
+    parser.add_argument('--modes', default='threading,eventlet,gevent')
+    parser.add_argument('--timeout', type=float, default=10.0, help='segundos por conexión o respuesta')
+    args = parser.parse_args()
+
+    print(f"{args.connections} conexiones WebSocket por modo")
+    print(f"  {'modo':<10} {'abiertas':>8} {'conexión':>10} {'respuestas':>10} {'p50':>9} {'p99':>9} "
+          f"{'RSS':>16} {'hilos':>10}")
+    for mode in args.modes.split(','):
+        if mode != 'threading' and importlib.util.find_spec(mode) is None:
+            print(f"  {mode:<10} (no instalado: pip install {mode})")
+            continue
+        r = run_mode(mode, args.connections, args.timeout)
+        print(f"  {mode:<10} {r['open']:>8} {r['connect_s']:>9.2f}s {r['answered']:>10} "
+              f"{r['p50'] * 1000:>7.1f}ms {r['p99'] * 1000:>7.1f}ms "
+              f"{r['idle_rss']:>6.1f}->{r['rss']:>6.1f}MB {r['idle_threads']:>4}->{r['threads']:<5}")
+
+
+if __name__ == '__main__':
+    main()
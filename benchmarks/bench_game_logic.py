@@ -0,0 +1,244 @@
+"""Microbenchmarks de las funciones calientes de game_logic, con baseline y umbral.
+
+Uso: python benchmarks/bench_game_logic.py [--games 2000] [--save | --threshold 0.25]
+
+Mide setup_game, start_night_phase, get_player_by_socket_id,
+can_player_act_in_phase, get_players_with_role, execute_werewolf_action y
+TestGameLogic.setup_test_game con 3 a 10 jugadores, sobre --games partidas
+vivas a la vez: cada medición es una pasada que llama a la función una vez
+en cada partida (así los datos no caben todos en caché, como en un servidor
+con muchas salas). Se repite --repeat veces y se queda la mejor pasada, en
+ns por llamada. Las partidas se reparten con semillas fijas.
+
+Con --save escribe los resultados en --baseline (JSON). Sin --save compara
+con ese fichero y termina con código 1 si alguna función es más lenta que
+la baseline en más de --threshold (0.25 = 25 %). La comparación usa el tiempo
+relativo (mediana de los cocientes) a una referencia fija de Python puro
+medida intercalada con cada caso, para que una máquina más lenta (o con ruido de vecinos en una VM) no
+parezca una regresión; aun así, conviene regenerar la baseline con --save
+en la máquina donde se use como puerta.
+"""
+import argparse
+import gc
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from game_logic import GameLogic, TestGameLogic, execute_werewolf_action  # noqa: E402
+from models import Player, Role  # noqa: E402
+
+PLAYER_COUNTS = range(3, 11)
+BASELINE = os.path.join(os.path.dirname(__file__), 'baseline_game_logic.json')
+
+# Roles fijos de las partidas de testing (cíclicos hasta el número de jugadores)
+TEST_ROLES = (Role.WEREWOLF, Role.SEER, Role.ROBBER, Role.TROUBLEMAKER, Role.DRUNK,
+              Role.WEREWOLF, Role.INSOMNIAC, Role.VILLAGER, Role.TANNER, Role.VILLAGER)
+
+
+def make_players(num_players):
+    return [Player(socket_id=f's{i}', username=f'P{i}', is_host=i == 0) for i in range(num_players)]
+
+
+def make_games(count, num_players, seed):
+    """Partidas repartidas, cada una con un lobo entre los jugadores"""
+    games = []
+    for index in range(count):
+        game = GameLogic(make_players(num_players), f'R{index:05d}')
+        game.setup_game(rng=random.Random(seed * 100_003 + index))
+        if not game.get_players_with_original_role(Role.WEREWOLF):
+            wolf = game.players[0]
+            wolf.original_role = wolf.current_role = Role.WEREWOLF
+            game._reindex_roles()
+        games.append(game)
+    return games
+
+
+def make_test_games(count, num_players, seed=None):
+    games = []
+    for index in range(count):
+        players = make_players(num_players)
+        for player, role in zip(players, TEST_ROLES):
+            player.original_role = player.current_role = role
+        game = TestGameLogic(players, f'TEST{index:03d}')
+        game.setup_test_game()
+        games.append(game)
+    return games
+
+
+def wolf_sid(game):
+    return game.get_players_with_original_role(Role.WEREWOLF)[0].socket_id
+
+
+def reset_werewolves(game):
+    """Lobos sin actuar en la fase de lobos, para medir la acción completa"""
+    game.start_night_phase(Role.WEREWOLF)
+    for wolf in game.get_players_with_original_role(Role.WEREWOLF):
+        wolf.has_acted = False
+
+
+# nombre: (constructor de partidas, preparación antes de cada pasada o None, llamada medida).
+# La llamada recibe la partida, el socket de su primer lobo y un rng con semilla.
+CASES = {
+    'setup_game': (make_games, None,
+                   lambda game, sid, rng: game.setup_game(rng=rng)),
+    'start_night_phase': (make_games, None,
+                          lambda game, sid, rng: game.start_night_phase(Role.SEER)),
+    'get_player_by_socket_id': (make_games, None,
+                                lambda game, sid, rng: game.get_player_by_socket_id(sid)),
+    'can_player_act_in_phase': (make_games, lambda game: game.start_night_phase(Role.WEREWOLF),
+                                lambda game, sid, rng: game.can_player_act_in_phase(sid, Role.WEREWOLF)),
+    'get_players_with_role': (make_games, None,
+                              lambda game, sid, rng: game.get_players_with_role(Role.WEREWOLF)),
+    'execute_werewolf_action': (make_games, reset_werewolves,
+                                lambda game, sid, rng: execute_werewolf_action(game, sid, {})),
+    'setup_test_game': (make_test_games, None,
+                        lambda game, sid, rng: game.setup_test_game()),
+}
+
+
+def reference(game, sid, rng):
+    """Trabajo fijo de Python puro que se mide junto a cada caso para descontar la velocidad de la máquina"""
+    return sorted([player.username for player in game.players], reverse=rng.random() < 0.5)
+
+
+def timed_pass(targets, call, rng):
+    # Como timeit: sin pausas del recolector dentro de la pasada
+    gc.disable()
+    start = time.perf_counter()
+    for game, sid in targets:
+        call(game, sid, rng)
+    elapsed = time.perf_counter() - start
+    gc.enable()
+    return elapsed
+
+
+def measure(games, prepare, call, repeat, seed):
+    """Pasadas del caso y de la referencia, intercaladas.
+
+    Devuelve la mejor pasada del caso en ns por llamada y la mediana del
+    cociente caso / referencia de cada par de pasadas seguidas.
+    """
+    targets = [(game, wolf_sid(game)) for game in games]
+    best = float('inf')
+    ratios = []
+    rng = random.Random(seed)
+    for _ in range(repeat):
+        if prepare is not None:
+            for game in games:
+                prepare(game)
+        elapsed = timed_pass(targets, call, rng)
+        ratios.append(elapsed / timed_pass(targets, reference, rng))
+        best = min(best, elapsed)
+    return best / len(games) * 1e9, statistics.median(ratios)
+
+
+def run_case(name, num_players, games_count, repeat, seed):
+    """{'ns': ns por llamada, 'relative': tiempo relativo a la referencia medida a la vez}"""
+    build, prepare, call = CASES[name]
+    ns, relative = measure(build(games_count, num_players, seed), prepare, call, repeat, seed)
+    return {'ns': round(ns, 1), 'relative': round(relative, 3)}
+
+
+def run(games_count, repeat, seed, only):
+    results = {}
+    for num_players in PLAYER_COUNTS:
+        for name in CASES:
+            if only and name not in only:
+                continue
+            results.setdefault(name, {})[str(num_players)] = run_case(name, num_players, games_count, repeat, seed)
+    return results
+
+
+def compare(results, baseline, threshold, confirm):
+    """Funciones y tamaños más lentos que la baseline más el umbral.
+
+    Se compara el tiempo relativo a la referencia (no depende de si la
+    máquina va más lenta en ese momento). Cada candidato se vuelve a medir
+    (confirm) y cuenta la mejor medición, para no fallar por un pico puntual.
+    """
+    regressions = []
+    for name, by_players in results.items():
+        for players, result in by_players.items():
+            reference = baseline.get(name, {}).get(players)
+            if not reference or result['relative'] <= reference['relative'] * (1 + threshold):
+                continue
+            result = min([result] + [confirm(name, int(players)) for _ in range(2)],
+                         key=lambda measured: measured['relative'])
+            by_players[players] = result
+            if result['relative'] > reference['relative'] * (1 + threshold):
+                regressions.append((name, players, reference['relative'], result['relative']))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Microbenchmarks de game_logic con baseline')
+    parser.add_argument('--games', type=int, default=2000, help='partidas vivas por pasada')
+    parser.add_argument('--repeat', type=int, default=9)
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--baseline', default=BASELINE)
+    parser.add_argument('--save', action='store_true', help='escribe la baseline en lugar de comparar')
+    parser.add_argument('--threshold', type=float, default=0.25)
+    parser.add_argument('--only', default='', help='funciones separadas por comas')
+    args = parser.parse_args()
+
+    only = set(filter(None, args.only.split(',')))
+    results = run(args.games, args.repeat, args.seed, only)
+    if args.save:
+        # La baseline es la ejecución mediana de tres, por caso
+        runs = [results] + [run(args.games, args.repeat, args.seed, only) for _ in range(2)]
+        results = {name: {players: sorted((measured[name][players] for measured in runs),
+                                          key=lambda result: result['relative'])[1]
+                          for players in by_players}
+                   for name, by_players in results.items()}
+    baseline = {}
+    if not args.save and os.path.exists(args.baseline):
+        with open(args.baseline) as file:
+            baseline = json.load(file)['results']
+    regressions = compare(results, baseline, args.threshold,
+                          lambda name, players: run_case(name, players, args.games, args.repeat, args.seed))
+
+    counts = [str(n) for n in PLAYER_COUNTS]
+    print(f"ns por llamada (mejor de {args.repeat} pasadas sobre {args.games} partidas); "
+          f"entre paréntesis, cambio del tiempo relativo a la referencia frente a la baseline")
+    print(f"  {'función':<25}" + ''.join(f"{n + ' jug.':>16}" for n in counts))
+    for name, by_players in results.items():
+        cells = []
+        for players in counts:
+            result = by_players[players]
+            reference = baseline.get(name, {}).get(players)
+            change = f" ({(result['relative'] / reference['relative'] - 1) * 100:+.0f}%)" if reference else ''
+            cells.append(f"{result['ns']:>8.0f}{change:<8}")
+        print(f"  {name:<25}" + ''.join(f"{cell:>16}" for cell in cells))
+
+    if args.save:
+        with open(args.baseline, 'w') as file:
+            json.dump({
+                'python': platform.python_version(),
+                'machine': platform.machine(),
+                'games': args.games,
+                'repeat': args.repeat,
+                'seed': args.seed,
+                'results': results,
+            }, file, indent=2, sort_keys=True)
+            file.write('\n')
+        print(f"Baseline guardada en {args.baseline}")
+        return
+    if not baseline:
+        print(f"Sin baseline en {args.baseline}: ejecuta con --save para crearla")
+        return
+    for name, players, reference, relative in regressions:
+        print(f"  REGRESIÓN {name} con {players} jugadores: {reference:.2f} -> {relative:.2f} veces la referencia "
+              f"(+{(relative / reference - 1) * 100:.0f}%, umbral {args.threshold * 100:.0f}%)")
+    if regressions:
+        sys.exit(1)
+    print(f"Sin regresiones por encima del {args.threshold * 100:.0f}%")
+
+
+if __name__ == '__main__':
+    main()
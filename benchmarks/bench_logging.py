@@ -0,0 +1,66 @@
+"""Benchmark: coste de los logs en el camino caliente de la noche.
+
+Uso: python benchmarks/bench_logging.py
+
+Ejecuta execute_werewolf_action (que loguea en DEBUG en cada llamada) con:
+  - escritura síncrona a stderr, formateando en el hilo del handler (como los
+    antiguos print),
+  - el pipeline de logs.configure() en DEBUG (QueueHandler + QueueListener),
+  - el pipeline de logs.configure() en INFO (DEBUG desactivado, por defecto).
+La salida se descarta en /dev/null para medir solo el coste del hilo que loguea.
+"""
+import logging
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import logs  # noqa: E402
+from game_logic import GameLogic, execute_werewolf_action  # noqa: E402
+from models import Player, Role  # noqa: E402
+
+CALLS = 50_000
+
+
+def make_game():
+    players = [Player(socket_id=f'sid-{i}', username=f'p{i}') for i in range(5)]
+    game = GameLogic(players, 'BNCH')
+    game.setup_game()
+    game.current_phase = Role.WEREWOLF
+    wolf = (game.get_players_with_original_role(Role.WEREWOLF) or players[:1])[0]
+    return game, wolf.socket_id
+
+
+def per_call_us(game, socket_id):
+    start = time.perf_counter()
+    for _ in range(CALLS):
+        execute_werewolf_action(game, socket_id, {})
+    return (time.perf_counter() - start) / CALLS * 1e6
+
+
+def main():
+    game, socket_id = make_game()
+    sink = open(os.devnull, 'w')
+    root = logging.getLogger('werewolf')
+
+    root.handlers[:] = [logging.StreamHandler(sink)]
+    root.handlers[0].setFormatter(logs.JsonLinesFormatter())
+    root.setLevel(logging.DEBUG)
+    root.propagate = False
+    sync = per_call_us(game, socket_id)
+
+    logs.configure(level='DEBUG', stream=sink)
+    queued = per_call_us(game, socket_id)
+
+    logs.configure(level='INFO', stream=sink)
+    disabled = per_call_us(game, socket_id)
+
+    print(f"execute_werewolf_action, {CALLS:,} llamadas:")
+    print(f"  DEBUG síncrono:    {sync:6.2f} us/llamada")
+    print(f"  DEBUG en cola:     {queued:6.2f} us/llamada")
+    print(f"  DEBUG desactivado: {disabled:6.2f} us/llamada")
+
+
+if __name__ == '__main__':
+    main()
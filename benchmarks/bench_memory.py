@@ -0,0 +1,96 @@
+"""Benchmark: bytes por sala inactiva y por partida en curso.
+
+Uso: python benchmarks/bench_memory.py
+
+Compara el modelo con __slots__ (models.py) con los dicts libres que se
+usaban antes para salas y jugadores.
+"""
+import os
+import sys
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from game_logic import GameLogic  # noqa: E402
+from models import Player, PlayerSession, Room  # noqa: E402
+
+ROOMS = 10_000
+PLAYERS_PER_GAME = 5
+
+
+def slotted_idle(rooms, players, code):
+    sid = f'{code}_sid_0'
+    rooms[code] = Room(code=code, host_id=sid, players=[Player(socket_id=sid, username='Host', is_host=True)])
+    players[sid] = PlayerSession(username='Host', room_code=code)
+
+
+def slotted_game(rooms, players, code):
+    room_players = []
+    for i in range(PLAYERS_PER_GAME):
+        sid = f'{code}_sid_{i}'
+        room_players.append(Player(socket_id=sid, username=f'P{i}', is_host=i == 0))
+        players[sid] = PlayerSession(username=f'P{i}', room_code=code)
+    game = GameLogic(room_players.copy(), code)
+    game.setup_game()
+    rooms[code] = Room(code=code, host_id=room_players[0].socket_id, players=room_players,
+                       game_state='night', game=game, roles_assigned=True)
+
+
+def dict_idle(rooms, players, code):
+    sid = f'{code}_sid_0'
+    rooms[code] = {
+        'players': [{'socket_id': sid, 'username': 'Host', 'is_host': True}],
+        'game_state': 'waiting',
+        'host_id': sid
+    }
+    players[sid] = {'username': 'Host', 'room_code': code}
+
+
+def dict_game(rooms, players, code):
+    room_players = []
+    for i in range(PLAYERS_PER_GAME):
+        sid = f'{code}_sid_{i}'
+        room_players.append({'socket_id': sid, 'username': f'P{i}', 'is_host': i == 0})
+        players[sid] = {'username': f'P{i}', 'room_code': code}
+    # Forma anterior: mismos campos secretos añadidos a cada dict de jugador
+    for player in room_players:
+        player['original_role'] = 'villager'
+        player['current_role'] = 'villager'
+        player['has_acted'] = False
+    game = {
+        'players': room_players.copy(),
+        'room_code': code,
+        'center_cards': ['werewolf', 'seer', 'villager'],
+        'game_state': 'night',
+        'current_phase': None,
+        'phase_order': ['werewolf', 'seer', 'robber', 'troublemaker', 'drunk', 'insomniac'],
+    }
+    rooms[code] = {
+        'players': room_players,
+        'game_state': 'night',
+        'host_id': room_players[0]['socket_id'],
+        'game': game,
+        'roles_assigned': True
+    }
+
+
+def measure(build):
+    rooms, players = {}, {}
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    for n in range(ROOMS):
+        build(rooms, players, f'{n:05d}')
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    total = sum(stat.size_diff for stat in after.compare_to(before, 'filename'))
+    return total / ROOMS
+
+
+def main():
+    print(f"{'modelo':<10} {'sala inactiva (B)':>18} {'partida en curso (B)':>22}")
+    for name, idle, game in (('dicts', dict_idle, dict_game), ('slots', slotted_idle, slotted_game)):
+        print(f"{name:<10} {measure(idle):>18.0f} {measure(game):>22.0f}")
+
+
+if __name__ == '__main__':
+    main()
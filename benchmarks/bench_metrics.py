@@ -0,0 +1,55 @@
+"""Benchmark: coste de la instrumentación de handlers y emits.
+
+Uso: python benchmarks/bench_metrics.py
+
+Compara un handler vacío con y sin Metrics.instrument, y un emit vacío con y
+sin Metrics.count_emits. El objetivo es mantenerse en pocos microsegundos.
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from metrics import Metrics  # noqa: E402
+
+CALLS = 1_000_000
+
+
+def per_call_ns(func, *args):
+    start = time.perf_counter_ns()
+    for _ in range(CALLS):
+        func(*args)
+    return (time.perf_counter_ns() - start) / CALLS
+
+
+class FakeSocketIO:
+    def emit(self, event, data, to=None):
+        return None
+
+
+def main():
+    metrics = Metrics()
+
+    def handler(data):
+        return None
+
+    plain = per_call_ns(handler, {})
+    instrumented = per_call_ns(metrics.instrument('bench', handler), {})
+    print(f"handler: {plain:.0f} ns sin métricas, {instrumented:.0f} ns con métricas "
+          f"(+{instrumented - plain:.0f} ns)")
+
+    sio = FakeSocketIO()
+    plain = per_call_ns(sio.emit, 'evento', {})
+    metrics.count_emits(sio)
+    counted = per_call_ns(sio.emit, 'evento', {})
+    print(f"emit:    {plain:.0f} ns sin métricas, {counted:.0f} ns con métricas "
+          f"(+{counted - plain:.0f} ns)")
+
+    start = time.perf_counter()
+    metrics.render()
+    print(f"render:  {(time.perf_counter() - start) * 1e6:.0f} us por scrape")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,69 @@
+"""Benchmark: acciones nocturnas por segundo en el motor de acciones.
+
+Uso: python benchmarks/bench_night_actions.py --nights 20000
+
+Prepara N partidas de 5 jugadores con un rol de acción cada uno y mide
+execute_night_action por tipo de acción (validación + despacho + intención),
+y después resolve_night() aplicando los intercambios al amanecer. Sin red
+ni Socket.IO: solo game_logic.
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from game_logic import GameLogic, execute_night_action  # noqa: E402
+from models import Player, Role  # noqa: E402
+
+ROLES = (Role.SEER, Role.ROBBER, Role.TROUBLEMAKER, Role.DRUNK, Role.INSOMNIAC)
+
+# (rol, socket del jugador, datos de la acción)
+ACTIONS = (
+    (Role.SEER, 's0', {'target': 'P4'}),
+    (Role.ROBBER, 's1', {'target': 'P4'}),
+    (Role.TROUBLEMAKER, 's2', {'targets': ['P0', 'P1']}),
+    (Role.DRUNK, 's3', {'center_index': 0}),
+    (Role.INSOMNIAC, 's4', {}),
+)
+
+
+def make_game(index):
+    room_players = [Player(socket_id=f's{j}', username=f'P{j}', original_role=role, current_role=role)
+                    for j, role in enumerate(ROLES)]
+    game = GameLogic(room_players, f'R{index:05d}')
+    game._reindex_roles()
+    game.center_cards = [Role.WEREWOLF, Role.VILLAGER, Role.TANNER]
+    return game
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Acciones nocturnas por segundo')
+    parser.add_argument('--nights', type=int, default=20_000)
+    args = parser.parse_args()
+
+    games = [make_game(i) for i in range(args.nights)]
+    print(f"{args.nights:,} noches de {len(ROLES)} jugadores")
+    total = 0.0
+    for role, socket_id, data in ACTIONS:
+        for game in games:
+            game.start_night_phase(role)
+        start = time.perf_counter()
+        for game in games:
+            result = execute_night_action(game, socket_id, role, data)
+        elapsed = time.perf_counter() - start
+        assert result['success'], result
+        total += elapsed
+        print(f"  {role.value:<14} {args.nights / elapsed:>12,.0f} acciones/s  ({elapsed / args.nights * 1e6:.2f} us)")
+
+    start = time.perf_counter()
+    for game in games:
+        game.resolve_night()
+    resolve_s = time.perf_counter() - start
+    print(f"  {'todas':<14} {args.nights * len(ACTIONS) / total:>12,.0f} acciones/s")
+    print(f"resolve_night(): {resolve_s / args.nights * 1e6:.2f} us por noche (3 intercambios)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,147 @@
+"""Benchmark: duración de la noche según el plan de fases.
+
+Uso: python benchmarks/bench_night_plan.py --games 200 --players 5
+
+Juega partidas completas contra la app con el test client y un reloj virtual
+(PHASE_DELAYS y PHASE_BUDGETS reales, sin esperar de verdad). Cada jugador
+responde a your_turn tras un tiempo de reflexión aleatorio. Compara:
+  - todas las fases: las seis fases siempre, las vacías esperan su plazo
+    (lo que hacía el código anterior, que además se quedaba atascado sin plazos),
+  - plan: solo las fases de los roles repartidos,
+  - plan + simuladas: también fases simuladas para los roles del centro.
+Informa el tiempo de noche (de start_game a night_ended) en segundos de juego.
+"""
+import argparse
+import contextlib
+import os
+import random
+import statistics
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import app as server  # noqa: E402
+import game_logic  # noqa: E402
+from scheduler import PhaseScheduler  # noqa: E402
+
+THINK_TIME = (2.0, 8.0)
+
+
+class VirtualClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def choose_action(turn, rng):
+    """night_action aleatorio pero válido para un your_turn"""
+    phase = turn.get('phase')
+    if turn.get('action_type') == 'choose_center_card':
+        return {'action_type': 'werewolf', 'center_index': rng.randrange(3)}
+    targets, center_count = turn.get('targets', []), turn.get('center_count', 3)
+    if phase == 'seer':
+        if rng.random() < 0.5:
+            return {'action_type': phase, 'target': rng.choice(targets)}
+        return {'action_type': phase, 'center_indices': rng.sample(range(center_count), 2)}
+    if phase == 'robber':
+        return {'action_type': phase, 'target': rng.choice(targets)}
+    if phase == 'troublemaker':
+        return {'action_type': phase, 'targets': rng.sample(targets, 2)}
+    if phase == 'drunk':
+        return {'action_type': phase, 'center_index': rng.randrange(center_count)}
+    return {'action_type': phase}
+
+
+def unbatch(messages):
+    for message in messages:
+        if message['name'] == 'batch':
+            for event, data in message['args'][0]['events']:
+                yield event, data
+        else:
+            yield message['name'], message['args'][0] if message['args'] else {}
+
+
+def play_night(clock, num_players, rng):
+    clients = [server.socketio.test_client(server.app) for _ in range(num_players)]
+    clients[0].emit('create_room', {'username': 'Host'})
+    room_code = next(data['room_code'] for event, data in unbatch(clients[0].get_received())
+                     if event == 'room_created')
+    for i, client in enumerate(clients[1:], start=1):
+        client.emit('join_room', {'username': f'P{i}', 'room_code': room_code})
+    clients[0].emit('start_game')
+    started = clock.now
+
+    actions = []  # (instante, cliente, datos)
+    night_over = False
+    while not night_over:
+        for client in clients:
+            for event, data in unbatch(client.get_received()):
+                if event == 'night_ended':
+                    night_over = True
+                elif event == 'your_turn' and data.get('can_act'):
+                    actions.append((clock.now + rng.uniform(*THINK_TIME), client, choose_action(data, rng)))
+        if night_over:
+            break
+
+        next_due = server.scheduler.stats()['next_due_in']
+        candidates = [at for at, _, _ in actions]
+        if next_due is not None:
+            candidates.append(clock.now + max(0.0, next_due))
+        clock.now = max(clock.now, min(candidates))
+
+        due = [entry for entry in actions if entry[0] <= clock.now]
+        actions = [entry for entry in actions if entry[0] > clock.now]
+        for _, client, action in due:
+            client.emit('night_action', action)
+        server.scheduler.run_pending()
+
+    elapsed = clock.now - started
+    for client in clients:
+        client.disconnect()
+    return elapsed
+
+
+def run_variant(name, games, num_players, seed, plan=None, fake_phases=False, span=None):
+    clock = VirtualClock()
+    server.scheduler = PhaseScheduler(clock=clock, autostart=False, around=server.run_scheduled)
+    server.sweeping = True  # sin barrido periódico: usa el reloj real
+    server.rate_limiter.limits = {}  # todos los clientes simulados comparten IP
+    server.FAKE_NIGHT_PHASES = fake_phases
+    original_plan, original_span = game_logic.plan_night, server.FAKE_PHASE_SPAN
+    if plan is not None:
+        game_logic.plan_night = plan
+    if span is not None:
+        server.FAKE_PHASE_SPAN = span
+    random.seed(seed)
+    rng = random.Random(seed)
+    try:
+        nights = [play_night(clock, num_players, rng) for _ in range(games)]
+    finally:
+        game_logic.plan_night, server.FAKE_PHASE_SPAN = original_plan, original_span
+    nights.sort()
+    print(f"  {name:<20} media {statistics.mean(nights):6.1f} s   p50 {nights[len(nights) // 2]:6.1f} s   "
+          f"p95 {nights[int(len(nights) * 0.95)]:6.1f} s")
+
+
+def all_phases(dealt_roles, deck=()):
+    return list(game_logic.NIGHT_PHASE_ORDER), set()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Duración de la noche según el plan de fases')
+    parser.add_argument('--games', type=int, default=200)
+    parser.add_argument('--players', type=int, default=5)
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+
+    print(f"{args.games} noches de {args.players} jugadores (tiempo de juego, reflexión {THINK_TIME} s)")
+    with contextlib.redirect_stderr(open(os.devnull, 'w')):
+        run_variant('todas las fases', args.games, args.players, args.seed, plan=all_phases, span=(1.0, 1.0))
+        run_variant('plan', args.games, args.players, args.seed)
+        run_variant('plan + simuladas', args.games, args.players, args.seed, fake_phases=True)
+
+
+if __name__ == '__main__':
+    main()
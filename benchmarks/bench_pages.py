@@ -0,0 +1,62 @@
+"""Benchmark: peticiones por segundo de la página principal.
+
+Uso: python benchmarks/bench_pages.py --requests 5000
+
+Compara, con el test client de Flask (sin red), el render_template por
+petición que hacía index() antes con la página pre-renderizada de page_cache:
+sin comprimir, con gzip y como revalidación con If-None-Match (304). Informa
+también los bytes de la respuesta.
+"""
+import argparse
+import contextlib
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from flask import render_template  # noqa: E402
+
+import app as server  # noqa: E402
+import wire  # noqa: E402
+
+
+def render_per_request():
+    """Lo que hacía index() antes: render_template en cada petición"""
+    return render_template('index.html', wire_tables=wire.client_tables(),
+                           asset_url=server.page_cache.asset_url)
+
+
+def measure(client, path, headers, count):
+    response = client.get(path, headers=headers)
+    size = len(response.data)
+    start = time.perf_counter()
+    for _ in range(count):
+        client.get(path, headers=headers)
+    elapsed = time.perf_counter() - start
+    return count / elapsed, response.status_code, size
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Peticiones por segundo de la página principal')
+    parser.add_argument('--requests', type=int, default=5000)
+    args = parser.parse_args()
+
+    server.app.add_url_rule('/_render', 'render_per_request', render_per_request)
+    client = server.app.test_client()
+    etag = client.get('/', headers={'Accept-Encoding': 'gzip'}).headers['ETag']
+    cases = (
+        ('render_template por petición', '/_render', {}),
+        ('pre-renderizada', '/', {}),
+        ('pre-renderizada + gzip', '/', {'Accept-Encoding': 'gzip'}),
+        ('revalidación (304)', '/', {'Accept-Encoding': 'gzip', 'If-None-Match': etag}),
+    )
+    print(f"{args.requests} peticiones a la página principal por caso")
+    with contextlib.redirect_stderr(open(os.devnull, 'w')):
+        for name, path, headers in cases:
+            rps, status, size = measure(client, path, headers, args.requests)
+            print(f"  {name:<30} {rps:>8,.0f} req/s   {status}  {size:>6} bytes")
+
+
+if __name__ == '__main__':
+    main()
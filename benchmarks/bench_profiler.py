@@ -0,0 +1,89 @@
+"""Benchmark: coste del profiler por muestreo apagado y encendido.
+
+Uso: python benchmarks/bench_profiler.py [--calls 200000] [--games 30000] [--threads 4]
+
+Apagado: ns por llamada de un handler trivial con y sin la envoltura
+profiled() de app.py (lo que pagan todos los eventos aunque nadie perfile).
+Encendido: tiempo de --threads hilos repartiendo partidas (setup_game) sin
+profiler y con profiler en modo cpu a varios intervalos (mejor de --repeat,
+alternando con y sin profiler para que el ruido de la máquina afecte a los
+dos por igual), y la parte del tiempo que se lleva el hilo muestreador.
+"""
+import argparse
+import os
+import random
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+os.environ.setdefault('WEREWOLF_LOG_LEVEL', 'WARNING')
+
+import app as server  # noqa: E402
+from game_logic import GameLogic  # noqa: E402
+from models import Player  # noqa: E402
+
+
+def per_call_ns(func, calls):
+    start = time.perf_counter_ns()
+    for _ in range(calls):
+        func()
+    return (time.perf_counter_ns() - start) / calls
+
+
+def deal(games, seed):
+    """Trabajo de CPU de un hilo: repartir partidas, etiquetado como un handler"""
+    rng = random.Random(seed)
+    players = [Player(socket_id=f's{i}', username=f'P{i}') for i in range(7)]
+    for index in range(games):
+        if server.profiler.running:
+            with server.profiler.tag('start_game', f'R{seed:03d}'):
+                GameLogic(players, 'BENCH').setup_game(rng=rng)
+        else:
+            GameLogic(players, 'BENCH').setup_game(rng=rng)
+
+
+def workload(threads, games):
+    workers = [threading.Thread(target=deal, args=(games, seed)) for seed in range(threads)]
+    start = time.perf_counter()
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Coste del profiler por muestreo')
+    parser.add_argument('--calls', type=int, default=200000)
+    parser.add_argument('--games', type=int, default=30000, help='partidas por hilo')
+    parser.add_argument('--threads', type=int, default=4)
+    parser.add_argument('--intervals', default='0.01,0.005,0.001')
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    handler = lambda: None  # noqa: E731
+    wrapped = server.profiled('bench', handler)
+    bare = min(per_call_ns(handler, args.calls) for _ in range(3))
+    off = min(per_call_ns(wrapped, args.calls) for _ in range(3))
+    print(f"Profiler apagado: handler {bare:.0f} ns, con profiled() {off:.0f} ns (+{off - bare:.0f} ns por evento)")
+
+    print(f"{args.threads} hilos x {args.games} partidas, mejor de {args.repeat}")
+    print(f"  {'intervalo':>10} {'sin':>8} {'con':>8} {'cambio':>8} {'muestreador':>12} {'pilas':>7}  "
+          f"función más caliente")
+    for interval in (float(value) for value in args.intervals.split(',')):
+        baseline = elapsed = float('inf')
+        for _ in range(args.repeat):
+            baseline = min(baseline, workload(args.threads, args.games))
+            server.profiler.start(interval, mode='cpu')
+            elapsed = min(elapsed, workload(args.threads, args.games))
+            server.profiler.stop()
+        status = server.profiler.status()
+        hottest = server.profiler.top(1, event='start_game')
+        print(f"  {interval * 1000:>8.1f}ms {baseline:>7.2f}s {elapsed:>7.2f}s {(elapsed / baseline - 1) * 100:>+7.1f}% "
+              f"{status['overhead'] * 100:>11.2f}% {status['stacks']:>7}  "
+              f"{hottest[0]['function'] if hottest else '-'}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,71 @@
+"""Benchmark: asignación de roles frente al número de usuarios conectados.
+
+Uso: python benchmarks/bench_role_assignment.py
+
+El tiempo de start_role_assignment_and_night debe mantenerse plano aunque el
+registro global de jugadores crezca hasta 50k sockets.
+"""
+import contextlib
+import io
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import app as server  # noqa: E402
+from game_logic import GameLogic  # noqa: E402
+from models import Player, PlayerSession, Room  # noqa: E402
+
+PLAYERS_PER_GAME = 5
+CONNECTED_USERS = [100, 1_000, 10_000, 50_000]
+REPEAT = 200
+
+
+def build_room(room_code):
+    room_players = [
+        Player(socket_id=f'{room_code}_sid_{i}', username=f'P{i}', is_host=i == 0)
+        for i in range(PLAYERS_PER_GAME)
+    ]
+    for p in room_players:
+        server.players[p.socket_id] = PlayerSession(username=p.username, room_code=room_code)
+    game = GameLogic(room_players.copy(), room_code)
+    game.setup_game()
+    server.rooms[room_code] = Room(
+        code=room_code,
+        host_id=room_players[0].socket_id,
+        players=room_players,
+        game_state='preparation',
+        game=game,
+    )
+
+
+def bench(connected):
+    server.players.clear()
+    server.rooms.clear()
+    for i in range(connected - PLAYERS_PER_GAME):
+        server.players[f'idle_{i}'] = PlayerSession(username=f'U{i}', room_code='ZZZZ')
+
+    total = 0.0
+    for n in range(REPEAT):
+        room_code = f'B{n:03d}'
+        build_room(room_code)
+        start = time.perf_counter()
+        server.start_role_assignment_and_night(room_code)
+        total += time.perf_counter() - start
+        server.remove_room(room_code)
+    return total / REPEAT
+
+
+def main():
+    # Sin E/S de red: solo medimos el trabajo del servidor
+    server.socketio.emit = lambda *args, **kwargs: None
+    print(f"{'conectados':>12} {'us/asignación':>15}")
+    for connected in CONNECTED_USERS:
+        with contextlib.redirect_stdout(io.StringIO()):
+            elapsed = bench(connected)
+        print(f"{connected:>12} {elapsed * 1e6:>15.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,73 @@
+"""Benchmark: asignación de códigos de sala según la ocupación.
+
+Uso: python benchmarks/bench_room_codes.py
+
+Llena el espacio de 26^4 códigos al 10%, 50% y 90% y mide el coste de crear
+y borrar salas en ese estado con el bucle anterior (código aleatorio y
+reintento mientras exista) y con RoomCodeAllocator (cursor + lista libre).
+"""
+import os
+import random
+import string
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from room_codes import RoomCodeAllocator  # noqa: E402
+
+SPACE = 26 ** 4
+OPERATIONS = 20_000
+OCCUPANCY = (0.10, 0.50, 0.90)
+
+
+def generate_room_code():
+    return ''.join(random.choices(string.ascii_uppercase, k=4))
+
+
+def bench_random_retry(occupied):
+    rooms = dict.fromkeys(occupied)
+    victims = list(occupied)
+    random.shuffle(victims)
+    attempts = 0
+    start = time.perf_counter()
+    for victim in victims[:OPERATIONS]:
+        del rooms[victim]
+        room_code = generate_room_code()
+        attempts += 1
+        while room_code in rooms:
+            room_code = generate_room_code()
+            attempts += 1
+        rooms[room_code] = None
+    elapsed = time.perf_counter() - start
+    return elapsed / OPERATIONS * 1e6, attempts / OPERATIONS
+
+
+def bench_allocator(count):
+    allocator = RoomCodeAllocator(seed=1)
+    occupied = [allocator.allocate() for _ in range(count)]
+    random.shuffle(occupied)
+    start = time.perf_counter()
+    for victim in occupied[:OPERATIONS]:
+        allocator.release(victim)
+        allocator.allocate()
+    elapsed = time.perf_counter() - start
+    return elapsed / OPERATIONS * 1e6
+
+
+def main():
+    random.seed(1)
+    print(f"{'ocupación':>10} {'reintento aleatorio':>28} {'allocator':>12}")
+    for occupancy in OCCUPANCY:
+        count = int(SPACE * occupancy)
+        occupied = set()
+        while len(occupied) < count:
+            occupied.add(generate_room_code())
+        retry_us, attempts = bench_random_retry(occupied)
+        allocator_us = bench_allocator(count)
+        print(f"{occupancy:>10.0%} {retry_us:>10.2f} us ({attempts:5.2f} intentos) "
+              f"{allocator_us:>9.2f} us")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,110 @@
+"""Benchmark: coste del reparto de eventos a los espectadores de una sala.
+
+Uso: python benchmarks/bench_spectators.py --spectators 1000,5000,10000 [--events 3]
+
+Registra N espectadores directamente en el gestor de Socket.IO (sin clientes
+reales: la escritura en cada socket se sustituye por un contador) y mide un
+tick de espectadores con --events eventos públicos visibles. Compara:
+  - compartido: send_to_spectators, un payload codificado una vez por formato
+    y un emit al grupo (o dos listas si hay clientes binarios),
+  - por espectador: un emit por sid, codificando el payload cada vez (lo que
+    costaría reenviar a cada espectador por separado).
+Informa µs por tick y por cada 1.000 espectadores, con --binary de los
+espectadores en formato binario.
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+os.environ.setdefault('WEREWOLF_LOG_LEVEL', 'WARNING')
+
+import app as server  # noqa: E402
+from models import Player, Room  # noqa: E402
+
+
+def sample_events(count):
+    """Eventos públicos típicos de una noche"""
+    events = [
+        ('night_phase_started', {'phase': 'seer', 'role_name': 'Vidente',
+                                 'description': server.wire.text('phase_turn', role='Vidente')}),
+        ('spectator_action', {'username': 'P3', 'action_type': 'seer',
+                              'result': {'success': True, 'seen': [{'username': 'P1', 'role': 'werewolf'}]}}),
+        ('phase_completed', {'phase': 'seer', 'msg': server.wire.text('phase_done', phase='seer')}),
+    ]
+    return [events[i % len(events)] for i in range(count)]
+
+
+def add_spectators(room_code, count, binary_share):
+    """Espectadores falsos en el grupo de la sala; devuelve sus sids"""
+    manager = server.socketio.server.manager
+    group = server.spectator_room(room_code)
+    sids = []
+    binary_every = round(1 / binary_share) if binary_share > 0 else 0
+    for index in range(count):
+        sid = manager.connect(f'eio-{room_code}-{index}', '/')
+        manager.enter_room(sid, '/', group)
+        server.spectators[sid] = room_code
+        if binary_every and index % binary_every == 0:
+            server.outbox.binary_sids.add(sid)
+        sids.append(sid)
+    server.spectator_counts[room_code] = count
+    return sids
+
+
+def per_spectator(sids, events):
+    """Reparto ingenuo: un emit por espectador"""
+    event, data = events[0] if len(events) == 1 else ('batch', {'events': events})
+    for sid in sids:
+        if sid in server.outbox.binary_sids:
+            server.outbox.send('wire', server.wire.encode(event, data), namespace='/', to=sid)
+        else:
+            server.outbox.send(event, data, namespace='/', to=sid)
+
+
+def best_of(repeat, func):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Coste del reparto a espectadores')
+    parser.add_argument('--spectators', default='1000,5000,10000')
+    parser.add_argument('--events', type=int, default=3, help='eventos visibles por tick')
+    parser.add_argument('--binary', type=float, default=0.5, help='fracción de espectadores binarios')
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    writes = [0]
+
+    def count_write(eio_sid, packet):
+        writes[0] += 1
+
+    # Sin transporte: solo cuenta lo que saldría por cada socket
+    server.socketio.server._send_eio_packet = count_write
+    events = sample_events(args.events)
+
+    print(f"{args.events} eventos por tick, {args.binary:.0%} de espectadores binarios; mejor de {args.repeat}")
+    print(f"  {'espectadores':>12} {'compartido':>14} {'por espectador':>16} {'µs/1000 comp.':>14} "
+          f"{'µs/1000 ind.':>13} {'escrituras':>11}")
+    for count in (int(n) for n in args.spectators.split(',')):
+        room_code = f'S{count}'
+        server.rooms[room_code] = Room(code=room_code, host_id='h', players=[Player(socket_id='h', username='H')])
+        sids = add_spectators(room_code, count, args.binary)
+
+        writes[0] = 0
+        shared = best_of(args.repeat, lambda: server.send_to_spectators(room_code, events))
+        shared_writes = writes[0] // args.repeat
+        naive = best_of(args.repeat, lambda: per_spectator(sids, events))
+        print(f"  {count:>12,} {shared * 1e3:>12.2f}ms {naive * 1e3:>14.2f}ms "
+              f"{shared * 1e6 / count * 1000:>14.0f} {naive * 1e6 / count * 1000:>13.0f} {shared_writes:>11,}")
+        del server.rooms[room_code]
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,92 @@
+"""Benchmark: bytes por partida y CPU de codificación, JSON frente al formato binario.
+
+Uso: python benchmarks/bench_wire.py --games 200 --players 5
+
+Juega partidas completas contra la app (test client y reloj virtual, como
+bench_night_plan) y apunta cada escritura real del outbox. Para cada una
+calcula el paquete Socket.IO completo en JSON y en formato binario ('wire'
+con el adjunto), multiplicado por sus destinatarios, y mide el tiempo de
+codificar todas las escrituras de las dos formas.
+"""
+import argparse
+import contextlib
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import app as server  # noqa: E402
+import wire  # noqa: E402
+from bench_night_plan import VirtualClock, play_night  # noqa: E402
+from scheduler import PhaseScheduler  # noqa: E402
+from socketio import packet  # noqa: E402
+
+
+def json_packet(event, data):
+    return packet.Packet(packet.EVENT, data=[event, data]).encode()
+
+
+def wire_packet(event, data):
+    return packet.Packet(packet.EVENT, data=['wire', wire.encode(event, data)]).encode()
+
+
+def packet_size(encoded):
+    # Con adjuntos binarios encode() devuelve [cabecera, adjunto, ...]
+    if isinstance(encoded, list):
+        return sum(len(part) if isinstance(part, bytes) else len(part.encode()) for part in encoded)
+    return len(encoded.encode())
+
+
+def record_writes(writes):
+    send = server.outbox.send
+
+    def recording_send(event, data, **kwargs):
+        to = kwargs.get('to')
+        writes.append((event, data, len(to) if isinstance(to, list) else 1))
+        return send(event, data, **kwargs)
+
+    server.outbox.send = recording_send
+
+
+def main():
+    parser = argparse.ArgumentParser(description='JSON frente al formato binario')
+    parser.add_argument('--games', type=int, default=200)
+    parser.add_argument('--players', type=int, default=5)
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+
+    clock = VirtualClock()
+    server.scheduler = PhaseScheduler(clock=clock, autostart=False, around=server.run_scheduled)
+    server.sweeping = True
+    server.rate_limiter.limits = {}  # todos los clientes simulados comparten IP
+    random.seed(args.seed)
+    rng = random.Random(args.seed)
+    writes = []
+    record_writes(writes)
+    with contextlib.redirect_stderr(open(os.devnull, 'w')):
+        for _ in range(args.games):
+            play_night(clock, args.players, rng)
+
+    json_bytes = sum(packet_size(json_packet(event, data)) * n for event, data, n in writes)
+    wire_bytes = sum(packet_size(wire_packet(event, data)) * n for event, data, n in writes)
+    messages = sum(n for _, _, n in writes)
+
+    timings = {}
+    for name, encode in (('json', json_packet), ('binario', wire_packet)):
+        start = time.perf_counter()
+        for event, data, _ in writes:
+            encode(event, data)
+        timings[name] = (time.perf_counter() - start) / len(writes) * 1e6
+
+    print(f"{args.games} partidas de {args.players} jugadores, {len(writes)} escrituras, {messages} mensajes entregados"
+          f" (msgpack {'instalado' if wire.msgpack is not None else 'no instalado: codificador propio'})")
+    print(f"  {'formato':<8} {'bytes/partida':>14} {'bytes/mensaje':>14} {'us/escritura':>13}")
+    for name, total in (('json', json_bytes), ('binario', wire_bytes)):
+        print(f"  {name:<8} {total / args.games:>14,.0f} {total / messages:>14.1f} {timings[name]:>13.2f}")
+    print(f"  ahorro: {100 * (1 - wire_bytes / json_bytes):.1f}% de bytes")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,264 @@
+"""Generador de carga sintética para el flujo de eventos Socket.IO.
+
+Uso: python benchmarks/loadgen.py --games 500 --players 5
+
+Simula miles de clientes con el test client de Flask-SocketIO, en el mismo
+proceso que la app: create_room -> join_room -> start_game -> night_action,
+reaccionando a your_turn/werewolf_multiple_info hasta night_ended.
+
+Informa latencia de handlers (p50/p95/p99), latencia de fan-out de los
+emits, partidas por segundo y RSS del servidor. Con --max-p99-ms termina con
+código 1 si se supera el umbral, para poder usarlo como puerta de release.
+Con --no-batching se desactiva el outbox para comparar mensajes y escrituras.
+"""
+import argparse
+import contextlib
+import os
+import random
+import resource
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import app as server  # noqa: E402
+
+
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def rss_mb():
+    try:
+        with open('/proc/self/status') as status:
+            for line in status:
+                if line.startswith('VmRSS:'):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+class Stats:
+    def __init__(self):
+        self.handlers = {}  # evento: [segundos]
+        self.emits = {}  # evento: [segundos]
+        self.errors = 0
+
+    def record(self, table, event, elapsed):
+        table.setdefault(event, []).append(elapsed)
+
+
+class SimulatedGame:
+    """Una partida con sus clientes simulados"""
+
+    def __init__(self, index, num_players, stats, rng):
+        self.index = index
+        self.stats = stats
+        self.rng = rng
+        self.clients = [self._connect() for _ in range(num_players)]
+        self.room_code = None
+        self.finished = set()
+        self.started_at = None
+        self.done = False
+
+    def _connect(self):
+        start = time.perf_counter()
+        client = server.socketio.test_client(server.app)
+        self.stats.record(self.stats.handlers, 'connect', time.perf_counter() - start)
+        return client
+
+    def send(self, client, event, *args):
+        start = time.perf_counter()
+        try:
+            client.emit(event, *args)
+        except Exception:
+            self.stats.errors += 1
+        self.stats.record(self.stats.handlers, event, time.perf_counter() - start)
+
+    def start(self):
+        host = self.clients[0]
+        self.send(host, 'create_room', {'username': f'Host{self.index}'})
+        for message in unbatch(host.get_received()):
+            if message['name'] == 'room_created':
+                self.room_code = message['args'][0]['room_code']
+        for i, client in enumerate(self.clients[1:], start=1):
+            self.send(client, 'join_room', {'username': f'P{i}', 'room_code': self.room_code})
+        self.send(host, 'start_game')
+        self.started_at = time.perf_counter()
+
+    def poll(self):
+        for position, client in enumerate(self.clients):
+            for message in unbatch(client.get_received()):
+                self.react(position, client, message)
+        if len(self.finished) == len(self.clients):
+            self.done = True
+
+    def react(self, position, client, message):
+        name = message['name']
+        data = message['args'][0] if message['args'] else {}
+        if name == 'your_turn' and data.get('can_act'):
+            if data.get('action_type') == 'choose_center_card' or data.get('phase') != 'werewolf':
+                self.send(client, 'night_action', choose_action(data, self.rng))
+        elif name == 'night_ended':
+            self.finished.add(position)
+
+    def close(self):
+        for client in self.clients:
+            start = time.perf_counter()
+            client.disconnect()
+            self.stats.record(self.stats.handlers, 'disconnect', time.perf_counter() - start)
+
+
+def choose_action(turn, rng):
+    """night_action aleatorio pero válido para un your_turn"""
+    phase = turn.get('phase')
+    if turn.get('action_type') == 'choose_center_card':
+        return {'action_type': 'werewolf', 'center_index': rng.randrange(3)}
+    targets, center_count = turn.get('targets', []), turn.get('center_count', 3)
+    if phase == 'seer':
+        if rng.random() < 0.5:
+            return {'action_type': phase, 'target': rng.choice(targets)}
+        return {'action_type': phase, 'center_indices': rng.sample(range(center_count), 2)}
+    if phase == 'robber':
+        return {'action_type': phase, 'target': rng.choice(targets)}
+    if phase == 'troublemaker':
+        return {'action_type': phase, 'targets': rng.sample(targets, 2)}
+    if phase == 'drunk':
+        return {'action_type': phase, 'center_index': rng.randrange(center_count)}
+    return {'action_type': phase}
+
+
+def unbatch(messages):
+    """Expande los eventos 'batch' del outbox en mensajes sueltos"""
+    for message in messages:
+        if message['name'] == 'batch':
+            for event, data in message['args'][0]['events']:
+                yield {'name': event, 'args': [data]}
+        else:
+            yield message
+
+
+def instrument_emits(stats):
+    """Mide cada escritura real (serialización + entrega a todos los destinatarios)"""
+    outbox = server.outbox
+    original = outbox.send
+
+    def timed_emit(event, *args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return original(event, *args, **kwargs)
+        finally:
+            stats.record(stats.emits, event, time.perf_counter() - start)
+
+    outbox.send = timed_emit
+
+
+def run(args):
+    rng = random.Random(args.seed)
+    random.seed(args.seed)
+    stats = Stats()
+
+    # El bucle del generador ejecuta el planificador: todo ocurre en un hilo
+    server.scheduler.autostart = False
+    server.outbox.enabled = not args.no_batching
+    server.rate_limiter.limits = {}  # todos los clientes simulados comparten IP
+    for delays in (server.PHASE_DELAYS, server.PHASE_BUDGETS):
+        for key in delays:
+            delays[key] *= args.delay_scale
+    instrument_emits(stats)
+
+    rss_before = rss_after = rss_mb()
+    completed, stalled, night_times = 0, 0, []
+    wall_start = time.perf_counter()
+    pending = list(range(args.games))
+    active = []
+
+    with contextlib.redirect_stdout(open(os.devnull, 'w')):
+        while pending or active:
+            while pending and len(active) < args.concurrency:
+                game = SimulatedGame(pending.pop(0), args.players, stats, rng)
+                game.start()
+                active.append(game)
+
+            server.scheduler.run_pending()
+            now = time.perf_counter()
+            still_active = []
+            for game in active:
+                game.poll()
+                if game.done:
+                    completed += 1
+                    night_times.append(now - game.started_at)
+                    game.close()
+                elif now - game.started_at > args.timeout:
+                    stalled += 1
+                    game.close()
+                else:
+                    still_active.append(game)
+            active = still_active
+            rss_after = rss_mb()
+
+    wall = time.perf_counter() - wall_start
+    return stats, completed, stalled, night_times, wall, rss_before, rss_after
+
+
+def report(stats, completed, stalled, night_times, wall, rss_before, rss_after, args):
+    def row(name, values):
+        ms = [v * 1000 for v in values]
+        print(f"  {name:<24} {len(ms):>8} {percentile(ms, 50):>9.3f} {percentile(ms, 95):>9.3f} {percentile(ms, 99):>9.3f}")
+
+    print(f"Partidas: {args.games} x {args.players} jugadores, concurrencia {args.concurrency}")
+    print(f"\nLatencia de handlers (ms)\n  {'evento':<24} {'n':>8} {'p50':>9} {'p95':>9} {'p99':>9}")
+    for event, values in sorted(stats.handlers.items()):
+        row(event, values)
+    print(f"\nLatencia de fan-out de emits (ms)\n  {'evento':<24} {'n':>8} {'p50':>9} {'p95':>9} {'p99':>9}")
+    for event, values in sorted(stats.emits.items()):
+        row(event, values)
+
+    print(f"\nCompletadas: {completed}  Atascadas: {stalled}  Errores en handlers: {stats.errors}")
+    if night_times:
+        print(f"Noche completa: p50 {percentile(night_times, 50) * 1000:.1f} ms")
+    print(f"Partidas/s: {completed / wall:.1f}  (tiempo total {wall:.2f} s)")
+    print(f"RSS: {rss_before:.1f} MB -> {rss_after:.1f} MB")
+
+    writes = sum(len(values) for values in stats.emits.values())
+    counters = server.metrics.counters
+    queued = sum(counters.get('outbox_messages_total', [None, {}])[1].values())
+    if queued:
+        sizes = counters['outbox_batch_size_total'][1]
+        histogram = '  '.join(f"<={dict(labels)['le']}: {count}" for labels, count in sorted(
+            sizes.items(), key=lambda item: float(dict(item[0])['le'])))
+        print(f"Outbox: {queued} mensajes agrupados; destinatarios por tamaño de lote {histogram}")
+    print(f"Escrituras (emits reales): {writes}")
+
+    all_handlers = [v * 1000 for values in stats.handlers.values() for v in values]
+    p99 = percentile(all_handlers, 99)
+    if args.max_p99_ms is not None and p99 > args.max_p99_ms:
+        print(f"FALLO: p99 de handlers {p99:.3f} ms > {args.max_p99_ms} ms")
+        return 1
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--games', type=int, default=200)
+    parser.add_argument('--players', type=int, default=5)
+    parser.add_argument('--concurrency', type=int, default=100, help='partidas en curso a la vez')
+    parser.add_argument('--delay-scale', type=float, default=0.0,
+                        help='factor aplicado a PHASE_DELAYS y PHASE_BUDGETS (0 = sin esperas)')
+    parser.add_argument('--timeout', type=float, default=10.0, help='segundos antes de dar una partida por atascada')
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--max-p99-ms', type=float, default=None)
+    parser.add_argument('--no-batching', action='store_true', help='desactiva el outbox (un emit por mensaje)')
+    args = parser.parse_args()
+
+    results = run(args)
+    sys.exit(report(*results, args))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,252 @@
+"""Reproduce una grabación de WEREWOLF_RECORD contra la app y mide cada evento.
+
+Uso: python benchmarks/replay.py sesion.rec [--speed 1] [--max-p99-ms 5]
+
+Crea un cliente de prueba por cada sid grabado y le hace emitir sus eventos en
+el orden grabado. El planificador usa un reloj virtual que sigue los
+instantes de la grabación, así que las transiciones programadas caen entre
+los mismos eventos que en producción; las partidas usan las semillas grabadas
+y los códigos de sala grabados se traducen a los repartidos ahora.
+--speed 1 respeta los tiempos originales, 2 va al doble y 0 (por defecto) lo
+más rápido posible. Informa el tiempo por evento (p50/p99 por tipo) y
+compara las transiciones ejecutadas con las grabadas. Con --max-p99-ms
+termina con código 1 si algún tipo de evento supera el umbral.
+
+Con --record-demo N graba antes N partidas sintéticas (como loadgen) en el
+fichero indicado, para tener una grabación con la que probar.
+"""
+import argparse
+import collections
+import io
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+os.environ.setdefault('WEREWOLF_LOG_LEVEL', 'WARNING')
+
+import app as server  # noqa: E402
+import recorder  # noqa: E402
+from bench_night_plan import VirtualClock, choose_action, unbatch  # noqa: E402
+from models import ROLE_BY_VALUE  # noqa: E402
+from scheduler import PhaseScheduler  # noqa: E402
+
+
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+def use_virtual_clock(clock):
+    """Planificador, límites de ritmo, TTL y códigos de sala con el reloj de la grabación"""
+    server.scheduler = PhaseScheduler(clock=clock, autostart=False, around=server.run_scheduled)
+    server.sweeping = True  # el barrido no es tráfico: no se reproduce
+    server.rate_limiter.clock = clock
+    server.rooms.clock = clock
+    server.room_codes._clock = clock
+    server.test_room_codes._clock = clock
+
+
+def use_recorded_config(header):
+    """Mismos retrasos y plazos de fase que el servidor grabado"""
+    server.PHASE_DELAYS.update(header.get('phase_delays', {}))
+    for role, seconds in header.get('phase_budgets', {}).items():
+        server.PHASE_BUDGETS[ROLE_BY_VALUE[role]] = seconds
+    server.FAKE_NIGHT_PHASES = header.get('fake_phases', server.FAKE_NIGHT_PHASES)
+    server.FAKE_PHASE_SPAN = tuple(header.get('fake_phase_span', server.FAKE_PHASE_SPAN))
+
+
+def advance(clock, until, pace):
+    """Ejecuta las transiciones que vencen hasta until, cada una en su instante"""
+    while True:
+        next_due = server.scheduler.stats()['next_due_in']
+        if next_due is None or clock.now + next_due > until:
+            break
+        clock.now += max(0.0, next_due)
+        pace(clock.now)
+        server.scheduler.run_pending()
+    clock.now = max(clock.now, until)
+
+
+class Replay:
+    """Estado de una reproducción: clientes por sid y códigos de sala traducidos"""
+
+    def __init__(self):
+        self.clients = {}  # sid grabado: cliente de prueba
+        self.codes = {}  # código grabado: código repartido ahora
+        self.seeds = collections.defaultdict(list)  # código grabado: [semilla, ...]
+        self.timings = collections.defaultdict(list)  # evento: [segundos]
+
+    def live_sid(self, client):
+        return server.socketio.server.manager.sid_from_eio_sid(client.eio_sid, '/')
+
+    def translate(self, args):
+        data = args[0] if args else None
+        if isinstance(data, dict) and isinstance(data.get('room_code'), str):
+            code = data['room_code'].strip().upper()
+            data = dict(data, room_code=self.codes.get(code, code))
+            return [data, *args[1:]]
+        return args
+
+    def event(self, sid, event, args):
+        start = time.perf_counter()
+        if event == 'connect':
+            auth = args[0] if args else None
+            self.clients[sid] = server.socketio.test_client(server.app, auth=auth)
+        elif event == 'disconnect':
+            client = self.clients.pop(sid, None)
+            if client is not None and client.is_connected():
+                client.disconnect()
+        else:
+            client = self.clients.get(sid)
+            if client is None:
+                return
+            client.emit(event, *self.translate(args))
+        self.timings[event].append(time.perf_counter() - start)
+        client = self.clients.get(sid)
+        if client is not None:
+            client.get_received()  # no acumular lo recibido
+
+    def room(self, sid, code):
+        client = self.clients.get(sid)
+        session = server.players.get(self.live_sid(client)) if client is not None else None
+        if session is None:
+            return
+        self.codes[code] = session.room_code
+        # Las semillas de la sala, para sus próximas partidas
+        server.game_seeds[session.room_code] = self.seeds.pop(code, [])
+
+
+def replay(header, records, speed):
+    clock = VirtualClock()
+    use_virtual_clock(clock)
+    use_recorded_config(header)
+    # Las transiciones ejecutadas ahora se graban en memoria para compararlas
+    replayed_log = io.BytesIO()
+    server.recorder = recorder.Recorder(replayed_log, clock=clock)
+    state = Replay()
+    for _, kind, fields in records:
+        if kind == recorder.SEED:
+            state.seeds[fields[0]].append(fields[1])
+
+    wall_start = time.perf_counter()
+
+    def pace(at):
+        if speed > 0:
+            delay = wall_start + at / speed - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+
+    recorded_ticks = []
+    for at, kind, fields in records:
+        advance(clock, at, pace)
+        pace(at)
+        if kind == recorder.EVENT:
+            sid, event, _, args = fields
+            state.event(sid, event, args)
+        elif kind == recorder.ROOM:
+            state.room(*fields)
+        elif kind == recorder.TICK:
+            recorded_ticks.append(fields)
+    # Lo que quedaba programado al terminar la grabación
+    last = records[-1][0] if records else 0.0
+    advance(clock, last, pace)
+    elapsed = time.perf_counter() - wall_start
+
+    _, replayed = recorder.parse_log(replayed_log.getvalue())
+    replayed_ticks = [fields for _, kind, fields in replayed if kind == recorder.TICK]
+    return state, elapsed, recorded_ticks, replayed_ticks
+
+
+def compare_ticks(recorded, replayed, codes):
+    """Transiciones grabadas frente a reproducidas, con los códigos traducidos"""
+    def normalized(ticks, translate):
+        return [(name, translate(args[0]) if args else None, *args[1:]) for name, args in ticks]
+
+    expected = normalized(recorded, lambda code: codes.get(code, code))
+    actual = normalized(replayed, lambda code: code)
+    differences = [(i, a, b) for i, (a, b) in enumerate(zip(expected, actual)) if a != b]
+    return len(expected), len(actual), differences
+
+
+def record_demo(path, games, num_players, seed):
+    """Graba partidas sintéticas con el reloj real (lo que haría producción)"""
+    server.rate_limiter.limits = {}
+    for key in server.PHASE_DELAYS:
+        server.PHASE_DELAYS[key] *= 0.01
+    for key in server.PHASE_BUDGETS:
+        server.PHASE_BUDGETS[key] *= 0.01
+    server.recorder = recorder.Recorder.open(path, server.recording_config())
+    rng = random.Random(seed)
+    for _ in range(games):
+        clients = [server.socketio.test_client(server.app) for _ in range(num_players)]
+        clients[0].emit('create_room', {'username': 'Host'})
+        room_code = next(data['room_code'] for event, data in unbatch(clients[0].get_received())
+                         if event == 'room_created')
+        for i, client in enumerate(clients[1:], start=1):
+            client.emit('join_room', {'username': f'P{i}', 'room_code': room_code})
+        clients[0].emit('start_game')
+        night_over = False
+        while not night_over:
+            for client in clients:
+                for event, data in unbatch(client.get_received()):
+                    if event == 'night_ended':
+                        night_over = True
+                    elif event == 'your_turn' and data.get('can_act'):
+                        client.emit('night_action', choose_action(data, rng))
+            time.sleep(0.001)
+        for client in clients:
+            client.disconnect()
+    server.recorder.close()
+    server.recorder = None
+    print(f"Grabadas {games} partidas de {num_players} jugadores en {path}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Reproduce una grabación de tráfico')
+    parser.add_argument('path')
+    parser.add_argument('--speed', type=float, default=0.0, help='1 = tiempo original, 0 = lo más rápido posible')
+    parser.add_argument('--max-p99-ms', type=float, default=None)
+    parser.add_argument('--record-demo', type=int, default=0, metavar='N')
+    parser.add_argument('--players', type=int, default=5)
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+
+    if args.record_demo:
+        record_demo(args.path, args.record_demo, args.players, args.seed)
+        return
+
+    header, records = recorder.read_log(args.path)
+    size = os.path.getsize(args.path)
+    duration = records[-1][0] if records else 0.0
+    counts = collections.Counter(recorder.KIND_NAMES[kind] for _, kind, _ in records)
+    print(f"{args.path}: {len(records)} registros en {size:,} bytes ({size / max(1, len(records)):.1f} bytes/registro), "
+          f"{duration:.1f} s grabados, {dict(counts)}")
+
+    state, elapsed, recorded_ticks, replayed_ticks = replay(header, records, args.speed)
+    events = sum(len(values) for values in state.timings.values())
+    mode = 'lo más rápido posible' if args.speed <= 0 else f'velocidad x{args.speed:g}'
+    print(f"Reproducción ({mode}): {events} eventos en {elapsed:.2f} s ({events / max(elapsed, 1e-9):,.0f} eventos/s)")
+    print(f"  {'evento':<24} {'n':>6} {'media':>9} {'p50':>9} {'p99':>9}")
+    over = []
+    for event, values in sorted(state.timings.items()):
+        p99 = percentile(values, 99) * 1000
+        print(f"  {event:<24} {len(values):>6} {sum(values) / len(values) * 1000:>7.3f}ms "
+              f"{percentile(values, 50) * 1000:>7.3f}ms {p99:>7.3f}ms")
+        if args.max_p99_ms is not None and p99 > args.max_p99_ms:
+            over.append(event)
+
+    expected, actual, differences = compare_ticks(recorded_ticks, replayed_ticks, state.codes)
+    print(f"Transiciones: {expected} grabadas, {actual} reproducidas, {len(differences)} distintas")
+    for i, want, got in differences[:5]:
+        print(f"  #{i}: grabada {want}, reproducida {got}")
+    if over:
+        print(f"p99 por encima de {args.max_p99_ms} ms: {', '.join(over)}")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,208 @@
+"""Prueba de estrés: handlers y transiciones programadas concurrentes en la misma sala.
+
+Uso: python benchmarks/stress_actors.py --rooms 30 --players 5 [--no-actors]
+
+Juega muchas noches a la vez con el planificador real (su hilo) y los retrasos
+y plazos escalados por --scale, y un hilo por jugador que responde a your_turn
+cerca del plazo de la fase (para chocar con phase_timeout), repite la acción y
+pide snapshots sin parar. Las operaciones que modifican la partida se
+envuelven con un detector de entrada concurrente y una pequeña pausa que
+ensancha las ventanas de carrera. Al final comprueba, por sala:
+  - ningún hilo entró en el estado de la sala mientras otro lo modificaba,
+  - la noche terminó exactamente una vez,
+  - cada fase del plan empezó una sola vez y en orden (phase_seq coincide),
+  - las cartas se conservan (jugadores + centro = mazo repartido).
+Con --no-actors los mensajes se ejecutan sin buzón, como antes, para comparar.
+Termina con código 1 si se viola algún invariante.
+"""
+import argparse
+import collections
+import os
+import random
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+os.environ.setdefault('WEREWOLF_LOG_LEVEL', 'WARNING')  # los errores de los buzones sí se ven
+
+import app as server  # noqa: E402
+import game_logic  # noqa: E402
+from bench_night_plan import choose_action, unbatch  # noqa: E402
+
+
+class Occupancy:
+    """Detecta dos hilos a la vez dentro del estado de una misma partida"""
+
+    def __init__(self, pause):
+        self.pause = pause
+        self.violations = collections.Counter()  # nombre de la operación: entradas concurrentes
+        self._inside = {}  # id(partida): hilo
+        self._lock = threading.Lock()
+
+    def wrap(self, name, func, game_of):
+        def guarded(*args, **kwargs):
+            game = game_of(*args)
+            key, me = id(game), threading.get_ident()
+            with self._lock:
+                owner = self._inside.get(key)
+                if owner is not None and owner != me:
+                    self.violations[name] += 1
+                outermost = owner is None
+                self._inside[key] = me
+            try:
+                time.sleep(self.pause)
+                return func(*args, **kwargs)
+            finally:
+                if outermost:
+                    with self._lock:
+                        if self._inside.get(key) == me:
+                            del self._inside[key]
+        return guarded
+
+
+def instrument(occupancy, history):
+    """Envuelve las operaciones que modifican la partida y apunta fases y finales"""
+    setup_game = game_logic.GameLogic.setup_game
+    start_night_phase = game_logic.GameLogic.start_night_phase
+    end_night_phase = server.end_night_phase
+
+    def recording_setup(game, *args, **kwargs):
+        result = setup_game(game, *args, **kwargs)
+        history[game.room_code]['planned'] = list(game.phase_order)
+        return result
+
+    def recording_start(game, phase):
+        history[game.room_code]['started'].append(phase)
+        return start_night_phase(game, phase)
+
+    def recording_end(room_code):
+        if room_code in server.rooms and server.rooms[room_code].game is not None:
+            history[room_code]['ended'] += 1
+        return end_night_phase(room_code)
+
+    def room_game(room_code, *args):
+        room = server.rooms.get(room_code)
+        return room.game if room is not None else None
+
+    game_logic.GameLogic.setup_game = recording_setup
+    game_logic.GameLogic.start_night_phase = occupancy.wrap(
+        'start_night_phase', recording_start, lambda game, *args: game)
+    game_logic.GameLogic.resolve_night = occupancy.wrap(
+        'resolve_night', game_logic.GameLogic.resolve_night, lambda game: game)
+    server.execute_night_action = occupancy.wrap(
+        'execute_night_action', server.execute_night_action, lambda game, *args: game)
+    server.complete_phase = occupancy.wrap('complete_phase', server.complete_phase, room_game)
+    server.end_night_phase = occupancy.wrap('end_night_phase', recording_end, room_game)
+
+
+def scale_delays(scale):
+    for key in server.PHASE_DELAYS:
+        server.PHASE_DELAYS[key] *= scale
+    for key in server.PHASE_BUDGETS:
+        server.PHASE_BUDGETS[key] *= scale
+
+
+def play(client, history, room_code, rng, stop):
+    """Hilo de un jugador: actúa cerca del plazo, repite la acción y pide snapshots"""
+    pending = []  # (instante, acción)
+    while not stop.is_set() and not history[room_code]['ended']:
+        for event, data in unbatch(client.get_received()):
+            if event == 'your_turn' and data.get('can_act'):
+                budget = server.PHASE_BUDGETS.get(data['phase'], 0.1)
+                pending.append((time.monotonic() + budget * rng.uniform(0.8, 1.1), choose_action(data, rng)))
+        now = time.monotonic()
+        for entry in [entry for entry in pending if entry[0] <= now]:
+            pending.remove(entry)
+            client.emit('night_action', entry[1])
+            client.emit('night_action', entry[1])  # la repetida debe rechazarse
+        client.emit('request_room_snapshot')
+        time.sleep(rng.uniform(0.0, 0.004))
+
+
+def check(history, rooms, num_players):
+    """Invariantes por sala; devuelve la lista de fallos"""
+    failures = []
+    deck = collections.Counter(game_logic.deck_for(num_players))
+    for room_code, game in rooms.items():
+        record = history[room_code]
+        if record['ended'] != 1:
+            failures.append(f"{room_code}: la noche terminó {record['ended']} veces")
+        if record['started'] != record['planned']:
+            failures.append(f"{room_code}: fases {record['started']} en vez de {record['planned']}")
+        if game.phase_seq != len(record['started']):
+            failures.append(f"{room_code}: phase_seq {game.phase_seq} con {len(record['started'])} fases")
+        cards = collections.Counter(p.current_role for p in game.players) + collections.Counter(game.center_cards)
+        if cards != deck:
+            failures.append(f"{room_code}: cartas {dict(cards)} en vez de {dict(deck)}")
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Estrés de concurrencia por sala')
+    parser.add_argument('--rooms', type=int, default=30)
+    parser.add_argument('--players', type=int, default=5)
+    parser.add_argument('--scale', type=float, default=0.02, help='factor de PHASE_DELAYS y PHASE_BUDGETS')
+    parser.add_argument('--pause', type=float, default=0.0005, help='pausa (s) dentro de cada operación vigilada')
+    parser.add_argument('--timeout', type=float, default=60.0)
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--no-actors', action='store_true', help='sin buzón por sala (comportamiento anterior)')
+    args = parser.parse_args()
+
+    server.actors.enabled = not args.no_actors
+    server.rate_limiter.limits = {}  # todos los clientes simulados comparten IP
+    server.sweeping = True  # sin barrido periódico
+    scale_delays(args.scale)
+    occupancy = Occupancy(args.pause)
+    history = collections.defaultdict(lambda: {'planned': None, 'started': [], 'ended': 0})
+    instrument(occupancy, history)
+    rng = random.Random(args.seed)
+    stop = threading.Event()
+
+    games, threads = {}, []
+    for _ in range(args.rooms):
+        clients = [server.socketio.test_client(server.app) for _ in range(args.players)]
+        clients[0].emit('create_room', {'username': 'Host'})
+        room_code = next(data['room_code'] for event, data in unbatch(clients[0].get_received())
+                         if event == 'room_created')
+        for i, client in enumerate(clients[1:], start=1):
+            client.emit('join_room', {'username': f'P{i}', 'room_code': room_code})
+        for client in clients:
+            client.get_received()
+        threads += [threading.Thread(target=play, args=(client, history, room_code,
+                                                        random.Random(rng.random()), stop), daemon=True)
+                    for client in clients]
+        games[room_code] = clients
+
+    start = time.monotonic()
+    for room_code, clients in games.items():
+        clients[0].emit('start_game')
+    for thread in threads:
+        thread.start()
+    deadline = start + args.timeout
+    while time.monotonic() < deadline and not all(history[code]['ended'] for code in games):
+        time.sleep(0.05)
+    elapsed = time.monotonic() - start
+    # Margen para que aparezca una noche terminada dos veces
+    time.sleep(max(server.PHASE_DELAYS.values()) * 2 + 0.2)
+    stop.set()
+    for thread in threads:
+        thread.join()
+
+    rooms = {code: server.rooms[code].game for code in games}
+    failures = check(history, rooms, args.players)
+
+    mode = 'sin actores' if args.no_actors else 'con actores'
+    print(f"{args.rooms} salas de {args.players} jugadores, {len(threads)} hilos de cliente, {mode}: "
+          f"{elapsed:.1f} s")
+    print(f"  entradas concurrentes en una partida: {sum(occupancy.violations.values())} "
+          f"{dict(occupancy.violations) if occupancy.violations else ''}")
+    print(f"  mensajes procesados por los buzones: {server.actors.processed()}")
+    print(f"  invariantes violados: {len(failures)}")
+    for failure in failures[:10]:
+        print(f"    {failure}")
+    sys.exit(1 if failures or occupancy.violations else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,257 @@
+import abc
+import bisect
+import hashlib
+import multiprocessing
+import os
+import pickle
+import queue
+import threading
+from dataclasses import dataclass, field
+from multiprocessing.connection import Client, Listener
+
+import socketio
+
+from logs import get_logger
+
+log = get_logger('cluster')
+
+
+class HashRing:
+    """Hash consistente de códigos de sala a workers"""
+
+    def __init__(self, nodes, replicas=64):
+        self._ring = []
+        for node in nodes:
+            for i in range(replicas):
+                self._ring.append((self._hash(f'{node}:{i}'), node))
+        self._ring.sort()
+        self._keys = [h for h, _ in self._ring]
+
+    @staticmethod
+    def _hash(value):
+        return int.from_bytes(hashlib.blake2b(value.encode(), digest_size=8).digest(), 'big')
+
+    def node_for(self, key):
+        """Worker dueño de un código de sala"""
+        index = bisect.bisect(self._keys, self._hash(key)) % len(self._ring)
+        return self._ring[index][1]
+
+
+class MessageBus(abc.ABC):
+    """Bus de mensajes entre procesos; las implementaciones son intercambiables"""
+
+    @abc.abstractmethod
+    def publish(self, channel, message):
+        """Entrega el mensaje a todos los que escuchan el canal"""
+
+    @abc.abstractmethod
+    def listen(self, channel):
+        """Generador bloqueante con los mensajes publicados en el canal"""
+
+
+class LocalBus(MessageBus):
+    """Bus en memoria para varios managers dentro de un mismo proceso"""
+
+    def __init__(self):
+        self._subscribers = {}  # channel: [queue.Queue]
+        self._lock = threading.Lock()
+
+    def publish(self, channel, message):
+        with self._lock:
+            subscribers = list(self._subscribers.get(channel, ()))
+        for q in subscribers:
+            q.put(message)
+
+    def listen(self, channel):
+        q = queue.Queue()
+        with self._lock:
+            self._subscribers.setdefault(channel, []).append(q)
+        while True:
+            yield q.get()
+
+
+class SocketBus(MessageBus):
+    """Cliente del BusHub por un socket local; no necesita servicios externos"""
+
+    def __init__(self, address, authkey):
+        self._address = address
+        self._authkey = authkey
+        self._conn = Client(address, authkey=authkey)
+        self._lock = threading.Lock()
+
+    def publish(self, channel, message):
+        payload = pickle.dumps(('pub', channel, message), protocol=pickle.HIGHEST_PROTOCOL)
+        with self._lock:
+            self._conn.send_bytes(payload)
+
+    def listen(self, channel):
+        conn = Client(self._address, authkey=self._authkey)
+        conn.send_bytes(pickle.dumps(('sub', channel, None)))
+        while True:
+            yield pickle.loads(conn.recv_bytes())
+
+
+class BusHub:
+    """Concentrador del SocketBus; corre en el proceso supervisor"""
+
+    def __init__(self, address=('127.0.0.1', 0), authkey=None):
+        self.authkey = authkey or os.urandom(16)
+        self._listener = Listener(address, authkey=self.authkey)
+        self.address = self._listener.address
+        self._subscribers = {}  # channel: [(conn, lock)]
+        self._lock = threading.Lock()
+
+    def start(self):
+        threading.Thread(target=self._accept_loop, name='bus-hub', daemon=True).start()
+
+    def _accept_loop(self):
+        while True:
+            conn = self._listener.accept()
+            threading.Thread(target=self._serve, args=(conn,), daemon=True).start()
+
+    def _serve(self, conn):
+        subscription = None
+        try:
+            while True:
+                kind, channel, message = pickle.loads(conn.recv_bytes())
+                if kind == 'sub':
+                    subscription = (channel, (conn, threading.Lock()))
+                    with self._lock:
+                        self._subscribers.setdefault(channel, []).append(subscription[1])
+                elif kind == 'pub':
+                    self._forward(channel, pickle.dumps(message, protocol=pickle.HIGHEST_PROTOCOL))
+        except (EOFError, OSError):
+            pass
+        finally:
+            if subscription is not None:
+                with self._lock:
+                    self._subscribers[subscription[0]].remove(subscription[1])
+            conn.close()
+
+    def _forward(self, channel, payload):
+        with self._lock:
+            subscribers = list(self._subscribers.get(channel, ()))
+        for conn, lock in subscribers:
+            try:
+                with lock:
+                    conn.send_bytes(payload)
+            except OSError:
+                pass
+
+
+class BusManager(socketio.PubSubManager):
+    """Client manager de Socket.IO que reparte los emits por un MessageBus.
+
+    Los emits a sockets o salas de este worker se entregan localmente sin
+    pasar por el bus; solo el resto se publica para los demás workers.
+    """
+    name = 'werewolf-bus'
+
+    def __init__(self, bus, is_local_room=None, channel='werewolf'):
+        super().__init__(channel=channel)
+        self.bus = bus
+        self._is_local_room = is_local_room or (lambda room: False)
+
+    def emit(self, event, data, namespace=None, room=None, skip_sid=None,
+             callback=None, to=None, **kwargs):
+        room = to or room
+        if callback is None and room is not None and self.is_local(room, namespace or '/'):
+            kwargs['ignore_queue'] = True
+        return super().emit(event, data, namespace=namespace, room=room,
+                            skip_sid=skip_sid, callback=callback, **kwargs)
+
+    def is_local(self, room, namespace='/'):
+        """True si todos los sockets del destino (sala, sid o lista) están en este worker"""
+        if isinstance(room, (list, tuple)):
+            return all(self.is_local(r, namespace) for r in room)
+        if not isinstance(room, str):
+            return False
+        return self._is_local_room(room) or self.is_connected(room, namespace)
+
+    def _publish(self, data):
+        self.bus.publish(self.channel, data)
+
+    def _listen(self):
+        yield from self.bus.listen(self.channel)
+
+
+@dataclass(slots=True)
+class ClusterConfig:
+    """Configuración de un worker en modo multi-proceso"""
+    worker_id: int
+    workers: int
+    host: str
+    base_port: int
+    bus_address: tuple
+    authkey: bytes
+    ring: HashRing = field(init=False, repr=False)
+
+    def __post_init__(self):
+        self.ring = HashRing(range(self.workers))
+
+    @property
+    def port(self):
+        return self.base_port + self.worker_id
+
+    def owner(self, room_code):
+        return self.ring.node_for(room_code)
+
+    def owns(self, room_code):
+        return self.owner(room_code) == self.worker_id
+
+    def worker_url(self, worker_id):
+        return f'http://{self.host}:{self.base_port + worker_id}'
+
+    def client_manager(self, is_local_room):
+        return BusManager(SocketBus(self.bus_address, self.authkey), is_local_room)
+
+
+def load_cluster_config(environ=os.environ):
+    """Lee la configuración del worker del entorno; None en modo de un solo proceso"""
+    if 'WEREWOLF_WORKER_ID' not in environ:
+        return None
+    bus_host, bus_port = environ['WEREWOLF_BUS_ADDRESS'].rsplit(':', 1)
+    return ClusterConfig(
+        worker_id=int(environ['WEREWOLF_WORKER_ID']),
+        workers=int(environ['WEREWOLF_WORKERS']),
+        host=environ.get('WEREWOLF_HOST', '127.0.0.1'),
+        base_port=int(environ.get('WEREWOLF_BASE_PORT', '5000')),
+        bus_address=(bus_host, int(bus_port)),
+        authkey=bytes.fromhex(environ['WEREWOLF_BUS_AUTHKEY'])
+    )
+
+
+def _worker_main(environ):
+    os.environ.update(environ)
+    import app as server
+    server.run_worker()
+
+
+def run_cluster(workers, host='127.0.0.1', base_port=5000):
+    """Arranca el bus y N workers, cada uno dueño de un tramo de códigos de sala"""
+    hub = BusHub()
+    hub.start()
+    bus_host, bus_port = hub.address
+
+    ctx = multiprocessing.get_context('spawn')
+    processes = []
+    for worker_id in range(workers):
+        environ = {
+            'WEREWOLF_WORKER_ID': str(worker_id),
+            'WEREWOLF_WORKERS': str(workers),
+            'WEREWOLF_HOST': host,
+            'WEREWOLF_BASE_PORT': str(base_port),
+            'WEREWOLF_BUS_ADDRESS': f'{bus_host}:{bus_port}',
+            'WEREWOLF_BUS_AUTHKEY': hub.authkey.hex()
+        }
+        process = ctx.Process(target=_worker_main, args=(environ,), name=f'werewolf-worker-{worker_id}')
+        process.start()
+        processes.append(process)
+        log.info('Worker %d escuchando en http://%s:%d', worker_id, host, base_port + worker_id)
+
+    try:
+        for process in processes:
+            process.join()
+    except KeyboardInterrupt:
+        for process in processes:
+            process.terminate()
@@ -1,18 +1,54 @@
+import logging
 import random
+from logs import get_logger
+from models import ROLE_BY_VALUE, Role
+
+log = get_logger('game')
 
 # Mapeo de roles en inglés a español (variable global)
 ROLE_NAMES = {
-    'werewolf': 'Werewolf',
-    'seer': 'Pitonisa',
-    'robber': 'Ladrón',
-    'troublemaker': 'Alborotadora',
-    'drunk': 'Borracho',
-    'insomniac': 'Insomne',
-    'tanner': 'Curtidor',
-    'villager': 'Aldeano'
+    Role.WEREWOLF: 'Werewolf',
+    Role.SEER: 'Pitonisa',
+    Role.ROBBER: 'Ladrón',
+    Role.TROUBLEMAKER: 'Alborotadora',
+    Role.DRUNK: 'Borracho',
+    Role.INSOMNIAC: 'Insomne',
+    Role.TANNER: 'Curtidor',
+    Role.VILLAGER: 'Aldeano'
 }
 
+# Orden de las fases nocturnas
+NIGHT_PHASE_ORDER = (Role.WEREWOLF, Role.SEER, Role.ROBBER, Role.TROUBLEMAKER, Role.DRUNK, Role.INSOMNIAC)
+
+def deck_for(num_players):
+    """Cartas en juego según el número de jugadores (se reparten y 3 van al centro)"""
+    # Roles simples para testing
+    if num_players == 2:
+        return [Role.WEREWOLF, Role.WEREWOLF, Role.SEER, Role.VILLAGER, Role.VILLAGER]
+    elif num_players == 3:
+        return [Role.WEREWOLF, Role.WEREWOLF, Role.SEER, Role.ROBBER, Role.VILLAGER, Role.VILLAGER]
+    # Para 4+ jugadores; con más de 5, aldeanos extra para que sigan quedando 3 en el centro
+    deck = [Role.WEREWOLF, Role.WEREWOLF, Role.SEER, Role.ROBBER, Role.TROUBLEMAKER,
+            Role.DRUNK, Role.VILLAGER, Role.VILLAGER]
+    return deck + [Role.VILLAGER] * max(0, num_players + 3 - len(deck))
+
+def plan_night(dealt_roles, deck=()):
+    """Fases nocturnas de una partida: solo los roles repartidos, en orden.
+
+    Con deck, también los roles del mazo que quedaron en el centro, como fases
+    simuladas (nadie actúa, pero duran lo mismo) para no delatar las cartas del
+    centro. Devuelve (phase_order, fake_phases).
+    """
+    dealt = set(dealt_roles)
+    in_deck = dealt.union(deck)
+    phase_order = [role for role in NIGHT_PHASE_ORDER if role in in_deck]
+    return phase_order, {role for role in phase_order if role not in dealt}
+
 class GameLogic:
+    __slots__ = ('players', 'room_code', 'center_cards', 'game_state', 'current_phase',
+                 'phase_order', 'fake_phases', 'phase_seq', 'phase_resolved', 'night_intents',
+                 'rng', '_by_socket', '_by_username', '_by_role', '_by_original_role')
+
     def __init__(self, players, room_code):
         self.players = players
         self.room_code = room_code
@@ -20,101 +56,224 @@ class GameLogic:
         self.game_state = 'setup'
         self.current_phase = None
         self.phase_order = []
+        self.fake_phases = set()
+        # Cada fase iniciada incrementa phase_seq; los plazos programados la comparan
+        self.phase_seq = 0
+        self.phase_resolved = False
+        # Intercambios pedidos durante la noche; se aplican al amanecer (resolve_night)
+        self.night_intents = []
+        # Azar de la partida (reparto, duración de fases simuladas); setup_game acepta uno con semilla
+        self.rng = random
         
-    def setup_game(self):
-        """Configura el juego: asigna roles"""
-        num_players = len(self.players)
-        
-        # Roles simples para testing
-        if num_players == 2:
-            available_roles = ['werewolf', 'werewolf', 'seer', 'villager', 'villager']
-        elif num_players == 3:
-            available_roles = ['werewolf', 'werewolf', 'seer', 'robber', 'villager', 'villager']
-        else:
-            # Para 4+ jugadores
-            available_roles = ['werewolf', 'werewolf', 'seer', 'robber', 'troublemaker', 'drunk', 'villager', 'villager']
+        # Índices: socket_id -> jugador, username -> jugador, rol -> [jugadores]
+        self._by_socket = {p.socket_id: p for p in players}
+        self._by_username = {p.username: p for p in players}
+        self._by_role = {}
+        self._by_original_role = {}
         
-        random.shuffle(available_roles)
+    def _reindex_roles(self):
+        """Reconstruye los índices por rol a partir de los jugadores"""
+        self._by_role = {}
+        self._by_original_role = {}
+        for player in self.players:
+            self._by_role.setdefault(player.current_role, []).append(player)
+            self._by_original_role.setdefault(player.original_role, []).append(player)
+    
+    def setup_game(self, fake_phases=False, rng=None):
+        """Configura el juego: asigna roles y planifica las fases de la noche"""
+        if rng is not None:
+            self.rng = rng
+        num_players = len(self.players)
+        available_roles = deck_for(num_players)
+        self.rng.shuffle(available_roles)
         
         # Asignar roles a jugadores
         for i, player in enumerate(self.players):
-            player['original_role'] = available_roles[i]
-            player['current_role'] = available_roles[i]
-            player['has_acted'] = False
+            player.original_role = available_roles[i]
+            player.current_role = available_roles[i]
+            player.has_acted = False
+        self._reindex_roles()
             
         # 3 cartas al centro
         self.center_cards = available_roles[num_players:num_players+3]
         
-        # Orden de fases
-        self.phase_order = ['werewolf', 'seer', 'robber', 'troublemaker', 'drunk', 'insomniac']
+        # Orden de fases: solo roles repartidos (y simulados del centro si se piden)
+        self.phase_order, self.fake_phases = plan_night(
+            available_roles[:num_players], available_roles if fake_phases else ())
         
         self.game_state = 'night'
         
+        # El orden que se anuncia sale del mazo: el de las fases reales delataría
+        # qué roles quedaron en el centro
         return {
             'players': self.players,
             'center_cards': len(self.center_cards),
             'game_state': self.game_state,
-            'phase_order': self.phase_order
+            'phase_order': plan_night((), available_roles)[0]
         }
     
     def start_night_phase(self, phase):
         """Inicia una fase nocturna"""
         self.current_phase = phase
+        self.phase_seq += 1
+        self.phase_resolved = False
         
-        # Encontrar jugadores que pueden actuar
+        # Encontrar jugadores que pueden actuar (ninguno en una fase simulada)
         players_can_act = []
-        for player in self.players:
-            if player['original_role'] == phase and not player['has_acted']:
+        for player in self._by_original_role.get(phase, ()):
+            if not player.has_acted:
                 players_can_act.append({
-                    'socket_id': player['socket_id'],
-                    'username': player['username']
+                    'socket_id': player.socket_id,
+                    'username': player.username
                 })
         
         return {
             'phase': phase,
             'role_name': ROLE_NAMES.get(phase, phase.title()),
             'description': f'Es el turno de {ROLE_NAMES.get(phase, phase)}',
-            'players_can_act': players_can_act
+            'players_can_act': players_can_act,
+            'simulated': phase in self.fake_phases or not players_can_act
         }
     
+    def dump_state(self):
+        """Estado de la partida para persistir (los jugadores van aparte)"""
+        return {
+            'center_cards': list(self.center_cards),
+            'game_state': self.game_state,
+            'current_phase': self.current_phase,
+            'phase_order': list(self.phase_order),
+            'fake_phases': sorted(self.fake_phases),
+            'phase_seq': self.phase_seq,
+            'phase_resolved': self.phase_resolved,
+            # Jugadores por username, cartas del centro por índice
+            'night_intents': [[role, _slot_key(a), _slot_key(b)] for role, a, b in self.night_intents]
+        }
+
+    def load_state(self, state):
+        """Restaura el estado guardado con dump_state y reconstruye los índices"""
+        self.center_cards = [ROLE_BY_VALUE[role] for role in state['center_cards']]
+        self.game_state = state['game_state']
+        self.current_phase = ROLE_BY_VALUE.get(state['current_phase'])
+        self.phase_order = [ROLE_BY_VALUE[role] for role in state['phase_order']]
+        self.fake_phases = {ROLE_BY_VALUE[role] for role in state.get('fake_phases', ())}
+        self.phase_seq = state.get('phase_seq', 0)
+        self.phase_resolved = state.get('phase_resolved', False)
+        self._by_socket = {p.socket_id: p for p in self.players}
+        self._by_username = {p.username: p for p in self.players}
+        self._reindex_roles()
+        self.night_intents = [(ROLE_BY_VALUE[role], self._slot(a), self._slot(b))
+                              for role, a, b in state.get('night_intents', ())]
+
+    def _slot(self, key):
+        return key if isinstance(key, int) else self._by_username[key]
+
+    def rebind_socket(self, player, socket_id):
+        """Asigna un socket nuevo a un jugador que vuelve a la partida"""
+        self._by_socket.pop(player.socket_id, None)
+        player.socket_id = socket_id
+        self._by_socket[socket_id] = player
+
     def get_player_by_socket_id(self, socket_id):
         """Obtiene un jugador por su socket_id"""
-        for player in self.players:
-            if player['socket_id'] == socket_id:
-                return player
-        return None
+        return self._by_socket.get(socket_id)
     
     def can_player_act_in_phase(self, socket_id, phase):
         """Verifica si un jugador puede actuar"""
         player = self.get_player_by_socket_id(socket_id)
         if not player:
             return False
-        return (player['original_role'] == phase and 
-                not player['has_acted'] and 
+        return (player.original_role == phase and 
+                not player.has_acted and 
                 self.current_phase == phase)
     
     def get_players_with_role(self, role):
         """Obtiene jugadores con un rol específico"""
-        return [p for p in self.players if p['current_role'] == role]
+        return list(self._by_role.get(role, ()))
+    
+    def get_players_with_original_role(self, role):
+        """Obtiene jugadores que empezaron la noche con un rol"""
+        return list(self._by_original_role.get(role, ()))
+    
+    def set_current_role(self, player, role):
+        """Cambia el rol actual de un jugador manteniendo el índice por rol"""
+        old_role = player.current_role
+        if old_role == role:
+            return
+        holders = self._by_role.get(old_role)
+        if holders is not None:
+            holders.remove(player)
+            if not holders:
+                del self._by_role[old_role]
+        player.current_role = role
+        self._by_role.setdefault(role, []).append(player)
+    
+    def swap_roles(self, player_a, player_b):
+        """Intercambia las cartas actuales de dos jugadores"""
+        role_a, role_b = player_a.current_role, player_b.current_role
+        self.set_current_role(player_a, role_b)
+        self.set_current_role(player_b, role_a)
+
+    def get_player_by_username(self, username):
+        """Obtiene un jugador por su nombre (los clientes solo conocen los nombres)"""
+        return self._by_username.get(username)
+
+    def record_swap(self, role, slot_a, slot_b):
+        """Registra un intercambio (jugador o índice del centro) para el amanecer"""
+        self.night_intents.append((role, slot_a, slot_b))
+
+    def projected_cards(self):
+        """Cartas tras aplicar los intercambios registrados, sin modificar a nadie.
+
+        Claves: jugadores e índices del centro.
+        """
+        cards = {player: player.current_role for player in self.players}
+        cards.update(enumerate(self.center_cards))
+        for _, a, b in sorted(self.night_intents, key=_intent_rank):
+            cards[a], cards[b] = cards[b], cards[a]
+        return cards
+
+    def resolve_night(self):
+        """Aplica todos los intercambios de la noche en orden de fase; devuelve cuántos hubo"""
+        if not self.night_intents:
+            return 0
+        cards = self.projected_cards()
+        for player in self.players:
+            self.set_current_role(player, cards[player])
+        self.center_cards = [cards[i] for i in range(len(self.center_cards))]
+        applied = len(self.night_intents)
+        self.night_intents = []
+        return applied
+
+    def turn_info(self, player):
+        """Objetivos posibles que se envían con your_turn"""
+        return {
+            'action_type': player.original_role,
+            'targets': [p.username for p in self.players if p is not player],
+            'center_count': len(self.center_cards),
+            'message': ACTION_PROMPTS.get(player.original_role, '')
+        }
 
 class TestGameLogic(GameLogic):
     """Versión de GameLogic para testing con roles predefinidos"""
+    __slots__ = ()
     
     def setup_test_game(self):
         """Configura el juego de testing: NO mezcla roles, usa los predefinidos"""
         # No mezclar roles, ya están asignados
+        self._reindex_roles()
         
         # Simular 3 cartas al centro (roles ficticios)
-        self.center_cards = ['villager', 'villager', 'troublemaker']
+        self.center_cards = [Role.VILLAGER, Role.VILLAGER, Role.TROUBLEMAKER]
         
-        # Orden de fases
-        self.phase_order = ['werewolf', 'seer', 'robber', 'troublemaker', 'drunk', 'insomniac']
+        # Orden de fases según los roles predefinidos
+        self.phase_order, self.fake_phases = plan_night(p.original_role for p in self.players)
         
         self.game_state = 'night'
         
-        print(f"DEBUG: Setup de testing completado:")
-        for player in self.players:
-            print(f"DEBUG: - {player['username']}: {player['original_role']}")
+        if log.isEnabledFor(logging.DEBUG):
+            log.debug("Setup de testing completado: %s",
+                      ', '.join(f'{p.username}={p.original_role}' for p in self.players),
+                      extra={'room_code': self.room_code})
         
         return {
             'players': self.players,
@@ -123,27 +282,41 @@ class TestGameLogic(GameLogic):
             'phase_order': self.phase_order
         }
 
-def execute_werewolf_action(game, socket_id, action_data):
+def _slot_key(slot):
+    """Jugador -> username; las cartas del centro ya son un índice"""
+    return slot if isinstance(slot, int) else slot.username
+
+def _intent_rank(intent):
+    return PHASE_RANK[intent[0]]
+
+def _failure(error):
+    return {'success': False, 'error': error}
+
+def _other_player(game, player, username):
+    """Jugador objetivo válido (existe y no es uno mismo) o None"""
+    if not isinstance(username, str):
+        return None
+    target = game.get_player_by_username(username)
+    return target if target is not player else None
+
+def _center_index(game, value):
+    """Índice del centro válido o None"""
+    if isinstance(value, int) and not isinstance(value, bool) and 0 <= value < len(game.center_cards):
+        return value
+    return None
+
+def werewolf_action(game, player, action_data):
     """Acción de los lobos - AUTOMÁTICA al empezar la fase"""
-    player = game.get_player_by_socket_id(socket_id)
-    if not player:
-        return {'success': False, 'error': 'Jugador no encontrado'}
-        
-    print(f"DEBUG: Player {player['username']}: original_role={player['original_role']}, current_role={player['current_role']}, has_acted={player['has_acted']}, current_phase={game.current_phase}")
-    
-    if not game.can_player_act_in_phase(socket_id, 'werewolf'):
-        return {'success': False, 'error': 'No puedes actuar ahora'}
-    
     # Obtener todos los lobos
-    werewolves = game.get_players_with_role('werewolf')
+    werewolves = game.get_players_with_role(Role.WEREWOLF)
     other_werewolves = []
     
     # Encontrar otros lobos (excluyendo al jugador actual)
     for wolf in werewolves:
-        if wolf['socket_id'] != socket_id:
+        if wolf is not player:
             other_werewolves.append({
-                'username': wolf['username'],
-                'socket_id': wolf['socket_id']
+                'username': wolf.username,
+                'socket_id': wolf.socket_id
             })
     
     center_card = None
@@ -151,17 +324,17 @@ def execute_werewolf_action(game, socket_id, action_data):
     
     # Si eligió ver una carta del centro (solo lobos solitarios)
     if is_lone_wolf and 'center_index' in action_data:
-        center_index = action_data['center_index']
-        if 0 <= center_index < len(game.center_cards):
+        center_index = _center_index(game, action_data['center_index'])
+        if center_index is not None:
             center_card = {
                 'index': center_index,
                 'role': ROLE_NAMES.get(game.center_cards[center_index], game.center_cards[center_index])
             }
             # Marcar como actuado después de ver la carta del centro
-            player['has_acted'] = True
+            player.has_acted = True
     elif not is_lone_wolf:
         # Si hay múltiples lobos, se marcan como actuados automáticamente
-        player['has_acted'] = True
+        player.has_acted = True
     # Si es lobo solitario pero no eligió carta, NO marcar como actuado aún
     
     return {
@@ -170,4 +343,106 @@ def execute_werewolf_action(game, socket_id, action_data):
         'center_card': center_card,
         'is_lone_wolf': is_lone_wolf,
         'auto_reveal': not is_lone_wolf
-    }
\ No newline at end of file
+    }
+
+def seer_action(game, player, action_data):
+    """Pitonisa: ve la carta de otro jugador o dos cartas del centro"""
+    # La pitonisa actúa antes de cualquier intercambio: las cartas actuales son las buenas
+    if 'target' in action_data:
+        target = _other_player(game, player, action_data['target'])
+        if target is None:
+            return _failure('Elige a otro jugador')
+        seen = [{'username': target.username, 'role': ROLE_NAMES.get(target.current_role, target.current_role)}]
+    else:
+        indices = action_data.get('center_indices')
+        if not isinstance(indices, list) or len(indices) != 2:
+            return _failure('Elige un jugador o dos cartas del centro')
+        indices = [_center_index(game, index) for index in indices]
+        if None in indices or indices[0] == indices[1]:
+            return _failure('Elige dos cartas distintas del centro')
+        seen = [{'index': index, 'role': ROLE_NAMES.get(game.center_cards[index], game.center_cards[index])}
+                for index in indices]
+    player.has_acted = True
+    return {'success': True, 'seen': seen}
+
+def robber_action(game, player, action_data):
+    """Ladrón: cambia su carta por la de otro jugador y mira la nueva"""
+    target = _other_player(game, player, action_data.get('target'))
+    if target is None:
+        return _failure('Elige a otro jugador')
+    game.record_swap(Role.ROBBER, player, target)
+    player.has_acted = True
+    new_role = game.projected_cards()[player]
+    return {'success': True, 'new_role': ROLE_NAMES.get(new_role, new_role), 'target': target.username}
+
+def troublemaker_action(game, player, action_data):
+    """Alborotadora: intercambia las cartas de otros dos jugadores sin mirarlas"""
+    usernames = action_data.get('targets')
+    if not isinstance(usernames, list) or len(usernames) != 2:
+        return _failure('Elige a dos jugadores')
+    first, second = (_other_player(game, player, username) for username in usernames)
+    if first is None or second is None or first is second:
+        return _failure('Elige a dos jugadores distintos (que no seas tú)')
+    game.record_swap(Role.TROUBLEMAKER, first, second)
+    player.has_acted = True
+    return {'success': True, 'targets': [first.username, second.username]}
+
+def drunk_action(game, player, action_data):
+    """Borracho: cambia su carta por una del centro sin mirarla"""
+    center_index = _center_index(game, action_data.get('center_index'))
+    if center_index is None:
+        return _failure('Elige una carta del centro')
+    game.record_swap(Role.DRUNK, player, center_index)
+    player.has_acted = True
+    return {'success': True, 'center_index': center_index}
+
+def insomniac_action(game, player, action_data):
+    """Insomne: mira su carta al final de la noche"""
+    final_role = game.projected_cards()[player]
+    player.has_acted = True
+    return {'success': True, 'final_role': ROLE_NAMES.get(final_role, final_role)}
+
+# Acción de cada rol: (game, player, action_data) -> resultado para action_result
+NIGHT_ACTIONS = {
+    Role.WEREWOLF: werewolf_action,
+    Role.SEER: seer_action,
+    Role.ROBBER: robber_action,
+    Role.TROUBLEMAKER: troublemaker_action,
+    Role.DRUNK: drunk_action,
+    Role.INSOMNIAC: insomniac_action
+}
+
+# Los intercambios se resuelven en el orden de las fases
+PHASE_RANK = {role: rank for rank, role in enumerate(NIGHT_PHASE_ORDER)}
+
+# Instrucciones que acompañan a your_turn
+ACTION_PROMPTS = {
+    Role.SEER: 'Mira la carta de otro jugador o dos cartas del centro.',
+    Role.ROBBER: 'Cambia tu carta por la de otro jugador y mira tu nueva carta.',
+    Role.TROUBLEMAKER: 'Intercambia las cartas de otros dos jugadores.',
+    Role.DRUNK: 'Cambia tu carta por una del centro sin mirarla.',
+    Role.INSOMNIAC: 'Mira tu carta al final de la noche.'
+}
+
+def execute_night_action(game, socket_id, action_type, action_data):
+    """Valida una acción nocturna contra el estado de la partida y la ejecuta"""
+    action = NIGHT_ACTIONS.get(action_type) if isinstance(action_type, str) else None
+    if action is None:
+        return _failure('Acción desconocida')
+    
+    player = game.get_player_by_socket_id(socket_id)
+    if not player:
+        return _failure('Jugador no encontrado')
+        
+    log.debug("Player %s: action=%s, original_role=%s, has_acted=%s, current_phase=%s",
+              player.username, action_type, player.original_role, player.has_acted, game.current_phase,
+              extra={'room_code': game.room_code, 'socket_id': socket_id})
+    
+    if not game.can_player_act_in_phase(socket_id, action_type):
+        return _failure('No puedes actuar ahora')
+    
+    return action(game, player, action_data)
+
+def execute_werewolf_action(game, socket_id, action_data):
+    """Acción de los lobos (atajo de execute_night_action)"""
+    return execute_night_action(game, socket_id, Role.WEREWOLF, action_data)
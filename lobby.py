@@ -0,0 +1,112 @@
+import threading
+
+
+class LobbyIndex:
+    """Índice de las salas a las que se puede entrar (en espera y con asientos libres).
+
+    Se mantiene al crear, unirse, salir o empezar partida (update/discard), sin
+    recorrer nunca todas las salas. Las salas se agrupan por asientos libres y
+    el listado va de las más llenas a las más vacías (antes se completan
+    partidas), cada grupo en el orden en que sus salas entraron en él. El
+    listado ordenado y las páginas ya servidas se guardan hasta el siguiente
+    cambio, así que muchos clientes mirando el lobby no cuestan más que uno.
+    Cada cambio sube la versión y queda pendiente para los suscriptores
+    (take_changes), igual que los deltas de una sala.
+    """
+
+    def __init__(self, max_players=10, max_page=50, max_cached_pages=64):
+        self.max_players = max_players
+        self.max_page = max_page
+        self.max_cached_pages = max_cached_pages
+        self.version = 0
+        self._buckets = {free: {} for free in range(1, max_players + 1)}  # asientos libres: {código: entrada}
+        self._entries = {}  # código: entrada pública de la sala
+        self._pending = []  # cambios aún no enviados a los suscriptores
+        self._listing = None  # (entradas ordenadas, posición donde empieza cada grupo)
+        self._pages = {}  # (offset, limit, min_free): página de la versión actual
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def entry_for(self, room):
+        """Entrada pública de la sala, o None si no se puede entrar en ella"""
+        free = self.max_players - len(room.players)
+        if room.game_state != 'waiting' or room.is_test_room or free <= 0:
+            return None
+        host = next((p.username for p in room.players if p.socket_id == room.host_id), None)
+        return {'room_code': room.code, 'host': host, 'players': len(room.players), 'free': free}
+
+    def update(self, room):
+        """Refleja el estado de la sala; True si es el primer cambio pendiente"""
+        entry = self.entry_for(room)
+        with self._lock:
+            if entry == self._entries.get(room.code):
+                return False
+            self._remove_locked(room.code)
+            if entry is None:
+                return self._record_locked({'op': 'unlisted', 'room_code': room.code})
+            self._entries[room.code] = entry
+            self._buckets[entry['free']][room.code] = entry
+            return self._record_locked({'op': 'listed', 'room': entry})
+
+    def discard(self, room_code):
+        """Quita la sala del índice (sala eliminada); True si es el primer cambio pendiente"""
+        with self._lock:
+            if room_code not in self._entries:
+                return False
+            self._remove_locked(room_code)
+            return self._record_locked({'op': 'unlisted', 'room_code': room_code})
+
+    def page(self, offset=0, limit=20, min_free=1):
+        """Página del listado con al menos min_free asientos libres (la misma para todos hasta el próximo cambio)"""
+        offset = max(0, int(offset))
+        limit = min(max(1, int(limit)), self.max_page)
+        min_free = min(max(1, int(min_free)), self.max_players)
+        key = (offset, limit, min_free)
+        with self._lock:
+            page = self._pages.get(key)
+            if page is not None:
+                return page
+            if self._listing is None:
+                self._listing = self._build_listing_locked()
+            entries, starts = self._listing
+            start = starts[min_free] + offset
+            total = len(entries) - starts[min_free]
+            page = {
+                'version': self.version,
+                'offset': offset,
+                'total': total,
+                'rooms': entries[start:start + limit],
+                'next_offset': offset + limit if offset + limit < total else None
+            }
+            if len(self._pages) < self.max_cached_pages:
+                self._pages[key] = page
+            return page
+
+    def take_changes(self):
+        """Cambios pendientes desde el último envío"""
+        with self._lock:
+            changes, self._pending = self._pending, []
+            return changes
+
+    def _remove_locked(self, room_code):
+        entry = self._entries.pop(room_code, None)
+        if entry is not None:
+            del self._buckets[entry['free']][room_code]
+
+    def _record_locked(self, change):
+        self.version += 1
+        self._listing = None
+        self._pages = {}
+        self._pending.append({'v': self.version, **change})
+        return len(self._pending) == 1
+
+    def _build_listing_locked(self):
+        # Grupos de menos a más asientos libres; starts[n]: posición de la primera sala con n o más libres
+        entries = []
+        starts = [0, 0]
+        for free in range(1, self.max_players + 1):
+            entries.extend(self._buckets[free].values())
+            starts.append(len(entries))
+        return entries, starts
@@ -0,0 +1,90 @@
+import atexit
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import sys
+
+# Campos de contexto que se copian a cada línea JSON si vienen en `extra`
+CONTEXT_FIELDS = ('room_code', 'socket_id')
+
+_listener = None
+
+
+def _stop_listener():
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+atexit.register(_stop_listener)
+
+
+class JsonLinesFormatter(logging.Formatter):
+    """Una línea JSON por registro, con room_code/socket_id si están presentes"""
+
+    def format(self, record):
+        entry = {
+            'ts': round(record.created, 6),
+            'level': record.levelname,
+            'logger': record.name,
+            'msg': record.getMessage()
+        }
+        for field in CONTEXT_FIELDS:
+            value = getattr(record, field, None)
+            if value is not None:
+                entry[field] = value
+        if record.exc_info:
+            entry['exc'] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            entry['exc'] = record.exc_text
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class _LazyQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler que solo resuelve el mensaje; el formateo JSON va en el listener"""
+
+    def prepare(self, record):
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+
+def get_logger(name):
+    """Logger del servidor (hijo de 'werewolf')"""
+    return logging.getLogger(f'werewolf.{name}')
+
+
+def configure(level=None, json_lines=None, stream=None):
+    """Configura el pipeline de logs: QueueHandler en el hilo que loguea y
+    un QueueListener que formatea y escribe en segundo plano.
+
+    Nivel y formato se leen de WEREWOLF_LOG_LEVEL (INFO por defecto) y
+    WEREWOLF_LOG_JSON (1 por defecto). Con el nivel por encima de DEBUG, las
+    llamadas log.debug(...) se descartan antes de formatear nada.
+    """
+    global _listener
+
+    if level is None:
+        level = os.environ.get('WEREWOLF_LOG_LEVEL', 'INFO').upper()
+    if json_lines is None:
+        json_lines = os.environ.get('WEREWOLF_LOG_JSON', '1') != '0'
+
+    output = logging.StreamHandler(stream or sys.stderr)
+    if json_lines:
+        output.setFormatter(JsonLinesFormatter())
+    else:
+        output.setFormatter(logging.Formatter('%(asctime)s %(levelname)s %(name)s: %(message)s'))
+
+    _stop_listener()
+    log_queue = queue.SimpleQueue()
+    _listener = logging.handlers.QueueListener(log_queue, output)
+    _listener.start()
+
+    root = logging.getLogger('werewolf')
+    root.handlers[:] = [_LazyQueueHandler(log_queue)]
+    root.setLevel(level)
+    root.propagate = False
+    return root
@@ -0,0 +1,141 @@
+import bisect
+import functools
+import threading
+import time
+
+# Límites de los buckets de latencia de handlers (segundos)
+LATENCY_BUCKETS = (0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005,
+                   0.01, 0.025, 0.05, 0.1, 0.25, 1.0)
+_BUCKETS_NS = tuple(int(b * 1e9) for b in LATENCY_BUCKETS)
+
+
+class HandlerStats:
+    """Contadores de un handler de Socket.IO"""
+    __slots__ = ('calls', 'errors', 'total_ns', 'buckets')
+
+    def __init__(self):
+        self.calls = 0
+        self.errors = 0
+        self.total_ns = 0
+        self.buckets = [0] * (len(_BUCKETS_NS) + 1)
+
+
+class Metrics:
+    """Registro de métricas del servidor en formato de texto de Prometheus.
+
+    Los contadores se actualizan sin lock (bajo el GIL) para mantener el
+    coste por evento en unos pocos microsegundos; los gauges se calculan
+    solo al hacer scrape.
+    """
+
+    def __init__(self, prefix='werewolf'):
+        self.prefix = prefix
+        self.handlers = {}  # evento: HandlerStats
+        self.counters = {}  # nombre: [ayuda, {etiquetas: valor}]
+        self.gauges = []  # (nombre, ayuda, función)
+        self.emits = 0
+        self._rate_lock = threading.Lock()
+        self._last_scrape = (time.monotonic(), 0)
+
+    def instrument(self, event, handler):
+        """Envuelve un handler con tiempo, llamadas y errores"""
+        stats = self.handlers.setdefault(event, HandlerStats())
+        clock = time.perf_counter_ns
+        buckets = _BUCKETS_NS
+
+        @functools.wraps(handler)
+        def wrapper(*args, **kwargs):
+            start = clock()
+            try:
+                return handler(*args, **kwargs)
+            except Exception:
+                stats.errors += 1
+                raise
+            finally:
+                elapsed = clock() - start
+                stats.calls += 1
+                stats.total_ns += elapsed
+                stats.buckets[bisect.bisect_left(buckets, elapsed)] += 1
+        return wrapper
+
+    def count_emits(self, socketio):
+        """Cuenta cada socketio.emit (también los emit() de contexto, que pasan por él)"""
+        original = socketio.emit
+
+        @functools.wraps(original)
+        def emit(*args, **kwargs):
+            self.emits += 1
+            return original(*args, **kwargs)
+
+        socketio.emit = emit
+
+    def inc(self, name, help_text, amount=1, **labels):
+        """Incrementa un contador con etiquetas"""
+        counter = self.counters.setdefault(name, [help_text, {}])
+        key = tuple(sorted(labels.items()))
+        counter[1][key] = counter[1].get(key, 0) + amount
+
+    def gauge(self, name, help_text, func):
+        """Registra un gauge; func devuelve un número o {etiquetas: número}"""
+        self.gauges.append((name, help_text, func))
+
+    def emits_per_second(self):
+        """Emits por segundo desde el scrape anterior"""
+        with self._rate_lock:
+            now, emits = time.monotonic(), self.emits
+            last_time, last_emits = self._last_scrape
+            self._last_scrape = (now, emits)
+        elapsed = now - last_time
+        return (emits - last_emits) / elapsed if elapsed > 0 else 0.0
+
+    def render(self):
+        """Exposición en formato de texto de Prometheus"""
+        p = self.prefix
+        lines = []
+
+        lines.append(f'# HELP {p}_handler_duration_seconds Tiempo de los handlers de Socket.IO')
+        lines.append(f'# TYPE {p}_handler_duration_seconds histogram')
+        for event, stats in sorted(self.handlers.items()):
+            cumulative = 0
+            for bound, count in zip(LATENCY_BUCKETS, stats.buckets):
+                cumulative += count
+                lines.append(f'{p}_handler_duration_seconds_bucket{{event="{event}",le="{bound}"}} {cumulative}')
+            lines.append(f'{p}_handler_duration_seconds_bucket{{event="{event}",le="+Inf"}} {stats.calls}')
+            lines.append(f'{p}_handler_duration_seconds_sum{{event="{event}"}} {stats.total_ns / 1e9}')
+            lines.append(f'{p}_handler_duration_seconds_count{{event="{event}"}} {stats.calls}')
+
+        lines.append(f'# HELP {p}_handler_errors_total Excepciones en handlers de Socket.IO')
+        lines.append(f'# TYPE {p}_handler_errors_total counter')
+        for event, stats in sorted(self.handlers.items()):
+            lines.append(f'{p}_handler_errors_total{{event="{event}"}} {stats.errors}')
+
+        lines.append(f'# HELP {p}_emits_total Mensajes emitidos')
+        lines.append(f'# TYPE {p}_emits_total counter')
+        lines.append(f'{p}_emits_total {self.emits}')
+        lines.append(f'# HELP {p}_emits_per_second Emits por segundo desde el último scrape')
+        lines.append(f'# TYPE {p}_emits_per_second gauge')
+        lines.append(f'{p}_emits_per_second {self.emits_per_second():.3f}')
+
+        for name, (help_text, values) in sorted(self.counters.items()):
+            lines.append(f'# HELP {p}_{name} {help_text}')
+            lines.append(f'# TYPE {p}_{name} counter')
+            for labels, value in sorted(values.items()):
+                lines.append(f'{p}_{name}{_labels(labels)} {value}')
+
+        for name, help_text, func in self.gauges:
+            value = func()
+            lines.append(f'# HELP {p}_{name} {help_text}')
+            lines.append(f'# TYPE {p}_{name} gauge')
+            if isinstance(value, dict):
+                for labels, v in sorted(value.items()):
+                    lines.append(f'{p}_{name}{_labels(labels)} {v}')
+            else:
+                lines.append(f'{p}_{name} {value}')
+
+        return '\n'.join(lines) + '\n'
+
+
+def _labels(labels):
+    if not labels:
+        return ''
+    return '{' + ','.join(f'{k}="{v}"' for k, v in labels) + '}'
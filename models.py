@@ -0,0 +1,76 @@
+import secrets
+from dataclasses import dataclass, field
+from enum import StrEnum
+
+
+class Role(StrEnum):
+    """Roles del juego; al ser str se serializan igual que antes ('werewolf', ...)"""
+    WEREWOLF = 'werewolf'
+    SEER = 'seer'
+    ROBBER = 'robber'
+    TROUBLEMAKER = 'troublemaker'
+    DRUNK = 'drunk'
+    INSOMNIAC = 'insomniac'
+    TANNER = 'tanner'
+    VILLAGER = 'villager'
+
+
+# Búsqueda rápida por valor (Role('x') es lento en caminos masivos como la recuperación)
+ROLE_BY_VALUE = {role.value: role for role in Role}
+
+
+@dataclass(slots=True, eq=False)
+class Player:
+    """Jugador dentro de una sala"""
+    socket_id: str
+    username: str
+    is_host: bool = False
+    original_role: Role | None = None
+    current_role: Role | None = None
+    has_acted: bool = False
+    # Secreto que solo conoce el cliente del jugador: hace falta para recuperar el asiento
+    rejoin_token: str = field(default_factory=lambda: secrets.token_urlsafe(16), repr=False)
+
+    def public_dict(self):
+        """Campos visibles para el resto de la sala (sin roles ni socket_id)"""
+        return {'username': self.username, 'is_host': self.is_host}
+
+
+@dataclass(slots=True, eq=False)
+class PlayerSession:
+    """Entrada del registro global de sockets conectados"""
+    username: str
+    room_code: str
+
+
+@dataclass(slots=True, eq=False)
+class Room:
+    """Estado de una sala"""
+    code: str
+    host_id: str
+    players: list = field(default_factory=list)
+    game_state: str = 'waiting'
+    game: object = None
+    roles_assigned: bool = False
+    is_test_room: bool = False
+    version: int = 0
+    pending_deltas: list = field(default_factory=list)
+
+    def players_payload(self):
+        """Lista pública de jugadores tal como se envía en room_updated"""
+        return [p.public_dict() for p in self.players]
+
+    def snapshot(self):
+        """Estado completo de la sala para room_updated"""
+        return {'room_code': self.code, 'version': self.version, 'players': self.players_payload()}
+
+    def record_change(self, op, **fields):
+        """Sube la versión y encola un delta; True si es el primero pendiente"""
+        self.version += 1
+        self.pending_deltas.append({'v': self.version, 'op': op, **fields})
+        return len(self.pending_deltas) == 1
+
+    def take_deltas(self):
+        """Deltas pendientes desde el último envío"""
+        deltas, self.pending_deltas = self.pending_deltas, []
+        return deltas
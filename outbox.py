@@ -0,0 +1,148 @@
+import functools
+import threading
+
+from flask import request
+
+# Límites de los buckets de tamaño de lote (mensajes por destinatario y flush)
+BATCH_SIZE_BUCKETS = (1, 2, 4, 8, 16)
+
+# Opciones de emit compatibles con el encolado (callback se comprueba aparte)
+_QUEUEABLE_KWARGS = {'namespace', 'to', 'room', 'include_self', 'skip_sid', 'callback', 'ignore_queue'}
+
+
+class Outbox:
+    """Cola de salida que agrupa los emits de un handler o transición programada.
+
+    Mientras hay un bloque `batched` activo en el hilo, socketio.emit no envía:
+    expande el destino (sala o sid) a los sockets que lo forman en ese momento
+    y apunta el mensaje en la secuencia de cada uno. Al salir del bloque, los
+    destinatarios con la misma secuencia reciben una sola escritura: el evento
+    original si es un único mensaje, o un evento 'batch' con la lista en orden.
+    La expansión solo ve los sockets de este proceso: los destinos remotos
+    (ver is_local) no se agrupan.
+    """
+
+    def __init__(self, metrics=None, namespace='/'):
+        self.namespace = namespace
+        self.metrics = metrics
+        self.enabled = True
+        self.send = None
+        # Clientes que negociaron el formato binario: reciben encode(evento, datos) como 'wire'
+        self.encode = None
+        self.binary_sids = set()
+        # Filtro opcional de destinatarios antes de cada escritura (backpressure)
+        self.admit = None
+        # is_local(destino, namespace): en modo multi-proceso, False para destinos con
+        # sockets en otros workers. Solo se ven los sockets locales, así que esos emits
+        # no se encolan y salen directos por el client manager (el bus)
+        self.is_local = None
+        self._local = threading.local()
+
+    def install(self, socketio):
+        """Intercepta socketio.emit; los flush usan el emit original"""
+        self.socketio = socketio
+        self.send = socketio.emit
+
+        @functools.wraps(self.send)
+        def emit(event, *args, **kwargs):
+            if not self._queue(event, args, kwargs):
+                self._flush_current()
+                return self.send(event, *args, **kwargs)
+
+        socketio.emit = emit
+
+    def batched(self, func):
+        """Envuelve func para que sus emits salgan agrupados al terminar"""
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            local = self._local
+            depth = getattr(local, 'depth', 0)
+            if depth == 0:
+                local.messages = []
+                local.sequences = {}  # sid: [índice de mensaje]
+            local.depth = depth + 1
+            try:
+                return func(*args, **kwargs)
+            finally:
+                local.depth = depth
+                if depth == 0:
+                    self._flush_current()
+        return wrapper
+
+    def _queue(self, event, args, kwargs):
+        local = self._local
+        if not self.enabled or not getattr(local, 'depth', 0):
+            return False
+        namespace = kwargs.get('namespace') or '/'
+        to = kwargs.get('to') or kwargs.get('room')
+        if (to is None or namespace != self.namespace or kwargs.get('callback')
+                or len(args) != 1 or set(kwargs) - _QUEUEABLE_KWARGS):
+            return False
+        if self.is_local is not None and not self.is_local(to, namespace):
+            return False
+
+        skip = kwargs.get('skip_sid')
+        if not kwargs.get('include_self', True) and not skip:
+            skip = request.sid
+        skip = set(skip) if isinstance(skip, list) else {skip}
+
+        index = len(local.messages)
+        local.messages.append((event, args[0]))
+        manager = self.socketio.server.manager
+        for sid, _ in manager.get_participants(namespace, to):
+            if sid not in skip:
+                local.sequences.setdefault(sid, []).append(index)
+        return True
+
+    def _flush_current(self):
+        local = self._local
+        messages = getattr(local, 'messages', None)
+        if not messages:
+            return
+        sequences = local.sequences
+        local.messages, local.sequences = [], {}
+
+        groups = {}  # secuencia: [sid]
+        for sid, indexes in sequences.items():
+            groups.setdefault(tuple(indexes), []).append(sid)
+
+        for indexes, sids in groups.items():
+            if len(indexes) == 1:
+                event, data = messages[indexes[0]]
+            else:
+                event, data = 'batch', {'events': [messages[i] for i in indexes]}
+            self._deliver(event, data, sids)
+
+        if self.metrics is not None:
+            self.metrics.inc('outbox_messages_total', 'Mensajes encolados en el outbox', len(messages))
+            self.metrics.inc('outbox_writes_total', 'Escrituras (emits) al vaciar el outbox', len(groups))
+            for indexes, sids in groups.items():
+                self.metrics.inc('outbox_batch_size_total', 'Destinatarios por tamaño de lote',
+                                 len(sids), le=_bucket(len(indexes)))
+
+
+    def _deliver(self, event, data, sids):
+        """Una escritura por grupo; los clientes binarios reciben la versión codificada"""
+        if self.admit is not None:
+            sids = self.admit(sids)
+            if not sids:
+                return
+        if self.encode is not None and self.binary_sids:
+            binary = [sid for sid in sids if sid in self.binary_sids]
+            if binary:
+                self.send('wire', self.encode(event, data), namespace=self.namespace, to=_target(binary))
+                sids = [sid for sid in sids if sid not in self.binary_sids]
+                if not sids:
+                    return
+        self.send(event, data, namespace=self.namespace, to=_target(sids))
+
+
+def _target(sids):
+    return sids[0] if len(sids) == 1 else sids
+
+
+def _bucket(size):
+    for bound in BATCH_SIZE_BUCKETS:
+        if size <= bound:
+            return str(bound)
+    return '+Inf'
@@ -0,0 +1,107 @@
+"""Páginas pre-renderizadas y assets estáticos servidos desde memoria.
+
+Las plantillas se renderizan una vez al arrancar y cada cuerpo se guarda con
+sus variantes comprimidas (gzip, y brotli si el paquete está instalado) y un
+ETag fuerte por variante. Las páginas se revalidan en cada visita (no-cache +
+If-None-Match -> 304); los assets llevan la huella del contenido en el nombre
+(index.3f2a9c1b04de.js) y se cachean un año como inmutables.
+"""
+import gzip
+import hashlib
+import mimetypes
+import os
+from dataclasses import dataclass
+
+from flask import Response, abort, request
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - dependencia opcional
+    brotli = None
+
+PAGE_CACHE_CONTROL = 'no-cache'
+ASSET_CACHE_CONTROL = 'public, max-age=31536000, immutable'
+
+# Orden de preferencia si el cliente acepta varias codificaciones
+ENCODINGS = ('br', 'gzip', 'identity')
+
+
+@dataclass(slots=True, eq=False)
+class CachedBody:
+    """Un recurso listo para servir: variantes por codificación y sus ETags"""
+    content_type: str
+    cache_control: str
+    variants: dict  # codificación: bytes
+    etags: dict  # codificación: ETag (sin comillas)
+
+
+def compress(body, content_type, cache_control):
+    """CachedBody con las variantes que ocupan menos que el original"""
+    digest = hashlib.sha256(body).hexdigest()[:16]
+    variants = {'identity': body}
+    compressed = gzip.compress(body, compresslevel=9, mtime=0)
+    if len(compressed) < len(body):
+        variants['gzip'] = compressed
+    if brotli is not None:
+        compressed = brotli.compress(body, quality=11)
+        if len(compressed) < len(body):
+            variants['br'] = compressed
+    etags = {encoding: digest if encoding == 'identity' else f'{digest}-{encoding}' for encoding in variants}
+    return CachedBody(content_type, cache_control, variants, etags)
+
+
+class PageCache:
+    """Páginas y assets en memoria con respuestas condicionales"""
+
+    def __init__(self, static_dir, url_prefix='/assets/'):
+        self.static_dir = static_dir
+        self.url_prefix = url_prefix
+        self.pages = {}  # nombre: CachedBody
+        self.assets = {}  # nombre con huella: CachedBody
+        self.asset_urls = {}  # nombre: URL con huella
+
+    def add_asset(self, name):
+        """Carga un fichero de static_dir y devuelve su URL con huella"""
+        with open(os.path.join(self.static_dir, name), 'rb') as asset:
+            body = asset.read()
+        stem, ext = os.path.splitext(name)
+        fingerprinted = f'{stem}.{hashlib.sha256(body).hexdigest()[:12]}{ext}'
+        content_type = mimetypes.guess_type(name)[0] or 'application/octet-stream'
+        if content_type.startswith('text/') or content_type.endswith('javascript'):
+            content_type += '; charset=utf-8'
+        self.assets[fingerprinted] = compress(body, content_type, ASSET_CACHE_CONTROL)
+        self.asset_urls[name] = self.url_prefix + fingerprinted
+        return self.asset_urls[name]
+
+    def asset_url(self, name):
+        """URL con huella de un asset (para usar en las plantillas)"""
+        return self.asset_urls[name]
+
+    def add_page(self, name, html):
+        self.pages[name] = compress(html.encode('utf-8'), 'text/html; charset=utf-8', PAGE_CACHE_CONTROL)
+
+    def page(self, name):
+        return self.respond(self.pages[name])
+
+    def asset(self, fingerprinted):
+        cached = self.assets.get(fingerprinted)
+        if cached is None:
+            abort(404)
+        return self.respond(cached)
+
+    def respond(self, cached):
+        """Respuesta con la mejor codificación aceptada; 304 si el ETag coincide"""
+        encoding = next(encoding for encoding in ENCODINGS
+                        if encoding in cached.variants
+                        and (encoding == 'identity' or request.accept_encodings[encoding]))
+        etag = cached.etags[encoding]
+        headers = {
+            'ETag': f'"{etag}"',
+            'Cache-Control': cached.cache_control,
+            'Vary': 'Accept-Encoding',
+        }
+        if request.if_none_match.contains(etag):
+            return Response(status=304, headers=headers)
+        if encoding != 'identity':
+            headers['Content-Encoding'] = encoding
+        return Response(cached.variants[encoding], headers=headers, content_type=cached.content_type)
@@ -0,0 +1,237 @@
+"""Persistencia de salas: diario append-only y snapshots compactos.
+
+Los handlers solo marcan la sala como modificada (touch). Un hilo escritor
+serializa cada pocos milisegundos las salas marcadas y añade una línea JSON por
+sala al diario (o un borrado si la sala ya no existe). Cuando el diario crece,
+escribe un snapshot con todas las salas y empieza un diario nuevo; cada línea
+lleva un número de secuencia para que al recuperar solo se apliquen las
+entradas posteriores al snapshot.
+"""
+import json
+import os
+import threading
+import time
+
+import async_mode
+from game_logic import GameLogic, TestGameLogic
+from logs import get_logger
+from models import ROLE_BY_VALUE, Player, Room
+
+log = get_logger('persistence')
+
+SNAPSHOT_FILE = 'snapshot.jsonl'
+JOURNAL_FILE = 'journal.jsonl'
+
+# Campos de Player en el orden en que se guardan (listas posicionales, no dicts)
+PLAYER_FIELDS = Player.__slots__
+
+
+def encode_room(room, timers=()):
+    """Registro JSON de una sala; timers: [(nombre, segundos restantes, args)]"""
+    people = {p.socket_id: p for p in room.players}
+    record = {
+        'code': room.code,
+        'host_id': room.host_id,
+        'game_state': room.game_state,
+        'roles_assigned': room.roles_assigned,
+        'is_test_room': room.is_test_room,
+        'version': room.version,
+        'players': [p.socket_id for p in room.players],
+        'game': None,
+        'timers': [[name, time.time() + delay, list(args)] for name, delay, args in timers]
+    }
+    game = room.game
+    if game is not None:
+        people.update((p.socket_id, p) for p in game.players)
+        record['game'] = {
+            'test': isinstance(game, TestGameLogic),
+            'players': [p.socket_id for p in game.players],
+            **game.dump_state()
+        }
+    record['people'] = [[getattr(p, field) for field in PLAYER_FIELDS] for p in people.values()]
+    return record
+
+
+def decode_room(record):
+    """Reconstruye la Room (y su GameLogic) de un registro; devuelve (room, timers)"""
+    people = {}
+    for socket_id, username, is_host, original_role, current_role, has_acted, *rest in record['people']:
+        player = Player(socket_id, username, is_host, ROLE_BY_VALUE.get(original_role),
+                        ROLE_BY_VALUE.get(current_role), has_acted)
+        # Los registros anteriores al token no lo traen: el asiento recibe uno nuevo
+        # que nadie conoce, así que no se puede recuperar solo con el nombre
+        if rest:
+            player.rejoin_token = rest[0]
+        people[socket_id] = player
+
+    room = Room(
+        code=record['code'],
+        host_id=record['host_id'],
+        players=[people[sid] for sid in record['players']],
+        game_state=record['game_state'],
+        roles_assigned=record['roles_assigned'],
+        is_test_room=record['is_test_room'],
+        version=record['version']
+    )
+    state = record['game']
+    if state is not None:
+        cls = TestGameLogic if state['test'] else GameLogic
+        room.game = cls([people[sid] for sid in state['players']], room.code)
+        room.game.load_state(state)
+
+    now = time.time()
+    timers = [(name, max(0.0, deadline - now), tuple(args)) for name, deadline, args in record['timers']]
+    return room, timers
+
+
+class RoomJournal:
+    """Escritor en segundo plano del diario y los snapshots de un directorio"""
+
+    def __init__(self, directory, rooms, encode, interval=0.05, compact_every=20000, fsync=True):
+        self.directory = directory
+        self.rooms = rooms
+        self.encode = encode
+        self.interval = interval
+        self.compact_every = compact_every
+        self.fsync = fsync
+        os.makedirs(directory, exist_ok=True)
+
+        self._dirty = set()
+        self._dirty_lock = threading.Lock()
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._thread = None
+        self._journal = None
+        self._seq = 0
+        self._since_snapshot = 0
+
+        # Métricas
+        self.records_written = 0
+        self.snapshots_written = 0
+        self.last_flush_ms = 0.0
+
+    @property
+    def snapshot_path(self):
+        return os.path.join(self.directory, SNAPSHOT_FILE)
+
+    @property
+    def journal_path(self):
+        return os.path.join(self.directory, JOURNAL_FILE)
+
+    def touch(self, code):
+        """Marca una sala como modificada (o borrada); barato, sin E/S"""
+        with self._dirty_lock:
+            self._dirty.add(code)
+
+    def load(self):
+        """Registros vigentes {código: registro} según snapshot + diario"""
+        records, seq = {}, 0
+        try:
+            with open(self.snapshot_path, encoding='utf-8') as snapshot:
+                seq = json.loads(snapshot.readline())['seq']
+                for line in snapshot:
+                    record = json.loads(line)
+                    records[record['code']] = record
+        except FileNotFoundError:
+            pass
+
+        try:
+            with open(self.journal_path, encoding='utf-8') as journal:
+                for line in journal:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        # Última línea a medio escribir en una caída
+                        log.warning("Entrada del diario truncada, se descarta")
+                        break
+                    if entry['seq'] <= seq:
+                        continue
+                    seq = entry['seq']
+                    if entry['room'] is None:
+                        records.pop(entry['code'], None)
+                    else:
+                        records[entry['code']] = entry['room']
+        except FileNotFoundError:
+            pass
+
+        self._seq = seq
+        return records
+
+    def start(self):
+        self._journal = open(self.journal_path, 'a', encoding='utf-8')
+        self._thread = threading.Thread(target=self._run, name='room-journal', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Vacía lo pendiente y detiene el hilo escritor"""
+        if self._thread is None:
+            return
+        self._thread, thread = None, self._thread
+        self._wake.set()
+        thread.join()
+        self.flush()
+        self._journal.close()
+
+    def _run(self):
+        while self._thread is not None:
+            self._wake.wait(self.interval)
+            try:
+                self.flush()
+            except Exception:
+                log.exception("Error escribiendo el diario de salas")
+
+    def flush(self):
+        """Escribe en el diario las salas marcadas; compacta si toca"""
+        with self._lock:
+            if not self._dirty:
+                return
+            start = time.perf_counter()
+            with self._dirty_lock:
+                dirty, self._dirty = self._dirty, set()
+            lines = []
+            for code in dirty:
+                room = self.rooms.get(code)
+                try:
+                    record = None if room is None else self.encode(room)
+                except RuntimeError:
+                    # La sala cambió mientras se serializaba: se reintenta en la siguiente pasada
+                    self.touch(code)
+                    continue
+                self._seq += 1
+                lines.append(json.dumps({'seq': self._seq, 'code': code, 'room': record},
+                                        ensure_ascii=False, separators=(',', ':')))
+            if lines:
+                self._journal.write('\n'.join(lines) + '\n')
+                self._sync(self._journal)
+            self.records_written += len(lines)
+            self._since_snapshot += len(lines)
+            if self._since_snapshot >= self.compact_every:
+                self._compact()
+            self.last_flush_ms = (time.perf_counter() - start) * 1000
+
+    def _compact(self):
+        """Snapshot de todas las salas y diario nuevo"""
+        tmp = self.snapshot_path + '.tmp'
+        with open(tmp, 'w', encoding='utf-8') as snapshot:
+            snapshot.write(json.dumps({'seq': self._seq}) + '\n')
+            for room in list(self.rooms.values()):
+                try:
+                    record = self.encode(room)
+                except RuntimeError:
+                    self.touch(room.code)
+                    continue
+                snapshot.write(json.dumps(record, ensure_ascii=False, separators=(',', ':')) + '\n')
+            self._sync(snapshot)
+        os.replace(tmp, self.snapshot_path)
+
+        self._journal.close()
+        self._journal = open(self.journal_path, 'w', encoding='utf-8')
+        self._since_snapshot = 0
+        self.snapshots_written += 1
+        log.info("Snapshot de %d salas escrito (seq %d)", len(self.rooms), self._seq)
+
+    def _sync(self, file):
+        file.flush()
+        if self.fsync:
+            # En eventlet/gevent, el fsync va al pool de hilos reales
+            async_mode.run_blocking(os.fsync, file.fileno())
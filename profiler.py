@@ -0,0 +1,220 @@
+"""Profiler por muestreo que se enciende y se apaga con el servidor en marcha.
+
+Un hilo del sistema lee cada `interval` segundos la pila de todos los hilos
+(sys._current_frames), incluidos el planificador de fases, los buzones de sala
+y el escritor de logs, y cuenta cada pila junto con la etiqueta que el hilo
+tenga en ese momento (evento o transición y sala, ver tag()). En modo 'cpu'
+cada pila pesa los microsegundos de CPU que gastó su hilo desde la muestra
+anterior (un hilo que espera no suma, uno que solo despertó un momento suma
+poco); en modo 'wall' cada muestra pesa 1, esté el hilo trabajando o
+esperando. Apagado no hay hilo y las etiquetas cuestan una comprobación de
+`running` por handler.
+
+Exporta pilas colapsadas ("a;b;c N", lo que leen flamegraph.pl, inferno o
+speedscope) y un resumen de las funciones más calientes. Con eventlet o
+gevent todo corre en un hilo del sistema: las muestras son las del greenlet en
+ejecución y las etiquetas por hilo no se aplican.
+"""
+import collections
+import os
+import sys
+import threading
+import time
+
+import async_mode
+
+PROFILE_MODES = ('cpu', 'wall')
+
+
+class _Tag:
+    """Bloque with de SamplingProfiler.tag (más barato que un contextmanager de generador)"""
+    __slots__ = ('tags', 'tag', 'ident', 'previous')
+
+    def __init__(self, tags, tag):
+        self.tags = tags
+        self.tag = tag
+
+    def __enter__(self):
+        self.ident = threading.get_ident()
+        self.previous = self.tags.get(self.ident)
+        self.tags[self.ident] = self.tag
+
+    def __exit__(self, *exc_info):
+        if self.previous is None:
+            self.tags.pop(self.ident, None)
+        else:
+            self.tags[self.ident] = self.previous
+
+
+class SamplingProfiler:
+    """Muestras de pila de todos los hilos, agregadas por (hilo, evento, sala, pila)"""
+
+    def __init__(self, max_depth=64, max_stacks=50000):
+        self.max_depth = max_depth
+        self.max_stacks = max_stacks
+        self.running = False
+        self.interval = 0.005
+        self.mode = 'cpu'
+        self.samples = collections.Counter()  # (hilo, evento, sala, pila): peso (µs de CPU o muestras)
+        self.ticks = 0  # pasadas del muestreador
+        self.sampling_seconds = 0.0  # tiempo gastado muestreando
+        self.started = None
+        self.stopped = None
+        self._tags = {}  # id de hilo: (evento, sala)
+        self._labels = {}  # código: 'función (fichero:línea)'
+        self._names = {}  # id de hilo: nombre
+        self._cpu = {}  # id de hilo: ns de CPU en la muestra anterior
+        self._deadline = None
+        self._generation = 0  # un muestreador de un perfil anterior que aún duerme no sigue con el nuevo
+
+    def tag(self, event, room_code=None):
+        """Etiqueta las muestras del hilo actual mientras dura el bloque with"""
+        return _Tag(self._tags, (event, room_code))
+
+    def start(self, interval=0.005, duration=None, mode='cpu'):
+        """Empieza un perfil nuevo (descarta el anterior); False si ya estaba en marcha"""
+        if mode not in PROFILE_MODES:
+            raise ValueError(f"modo {mode!r} no válido; opciones: {', '.join(PROFILE_MODES)}")
+        if self.running:
+            return False
+        if mode == 'cpu' and not hasattr(time, 'pthread_getcpuclockid'):
+            mode = 'wall'  # sin relojes de CPU por hilo (p. ej. Windows)
+        self.interval = max(0.001, float(interval))
+        self.mode = mode
+        self.samples = collections.Counter()
+        self.ticks = 0
+        self.sampling_seconds = 0.0
+        self._cpu = {}
+        self.started, self.stopped = time.time(), None
+        self._deadline = time.monotonic() + duration if duration else None
+        self.running = True
+        self._generation += 1
+        # Hilo del sistema de verdad aunque el modo asíncrono parchee threading
+        thread_class = async_mode.original('threading', 'Thread')
+        thread_class(target=self._run, args=(self._generation,), name='profiler', daemon=True).start()
+        return True
+
+    def stop(self):
+        """Para el muestreo; el perfil sigue disponible hasta el próximo start"""
+        if not self.running:
+            return False
+        self.running = False
+        self.stopped = time.time()
+        return True
+
+    def status(self):
+        elapsed = (self.stopped or time.time()) - self.started if self.started else 0.0
+        return {
+            'running': self.running,
+            'mode': self.mode,
+            'interval': self.interval,
+            'seconds': round(elapsed, 3),
+            'unit': 'µs de CPU' if self.mode == 'cpu' else 'muestras',
+            'samples': sum(self.snapshot().values()),
+            'stacks': len(self.samples),
+            'ticks': self.ticks,
+            # Parte del tiempo de un núcleo que se llevó el muestreador
+            'overhead': round(self.sampling_seconds / elapsed, 5) if elapsed else 0.0,
+        }
+
+    def snapshot(self, event=None, room_code=None):
+        """Copia de las muestras, opcionalmente de un evento o una sala"""
+        samples = dict.copy(self.samples)  # copia atómica bajo el GIL mientras se muestrea
+        if event is None and room_code is None:
+            return samples
+        return {key: count for key, count in samples.items()
+                if (event is None or key[1] == event) and (room_code is None or key[2] == room_code)}
+
+    def collapsed(self, group=('event',), event=None, room_code=None):
+        """Pilas colapsadas para un flamegraph; group elige qué etiquetas van como raíz (thread, event, room)"""
+        lines = collections.Counter()
+        for (thread, tag_event, tag_room, stack), count in self.snapshot(event, room_code).items():
+            prefix = []
+            if 'thread' in group:
+                prefix.append(thread)
+            if 'event' in group:
+                prefix.append(f'event:{tag_event or "-"}')
+            if 'room' in group:
+                prefix.append(f'room:{tag_room or "-"}')
+            lines[';'.join(prefix + list(stack))] += count
+        return ''.join(f'{stack} {count}\n' for stack, count in sorted(lines.items()))
+
+    def top(self, limit=20, by='self', event=None, room_code=None):
+        """Funciones más calientes: propias (la función en la cima de la pila) o totales (en cualquier punto)"""
+        own = collections.Counter()
+        total = collections.Counter()
+        samples = 0
+        for (_, _, _, stack), count in self.snapshot(event, room_code).items():
+            samples += count
+            if stack:
+                own[stack[-1]] += count
+            for label in set(stack):
+                total[label] += count
+        ranking = (own if by == 'self' else total).most_common(limit)
+        return [{
+            'function': label,
+            'self': own[label],
+            'total': total[label],
+            'self_pct': round(own[label] * 100 / samples, 2) if samples else 0.0,
+            'total_pct': round(total[label] * 100 / samples, 2) if samples else 0.0,
+        } for label, _ in ranking]
+
+    def _run(self, generation):
+        sleep = async_mode.original('time', 'sleep')
+        me = threading.get_ident()
+        while self.running and self._generation == generation:
+            if self._deadline is not None and time.monotonic() >= self._deadline:
+                self.stop()
+                break
+            start = time.perf_counter()
+            self._sample(me)
+            self.sampling_seconds += time.perf_counter() - start
+            self.ticks += 1
+            sleep(self.interval)
+
+    def _sample(self, me):
+        frames = sys._current_frames()
+        for ident, frame in frames.items():
+            if ident == me:
+                continue
+            weight = self._cpu_used_us(ident) if self.mode == 'cpu' else 1
+            if not weight:
+                continue
+            stack = []
+            while frame is not None and len(stack) < self.max_depth:
+                stack.append(self._label(frame.f_code))
+                frame = frame.f_back
+            stack.reverse()
+            event, room_code = self._tags.get(ident, (None, None))
+            key = (self._thread_name(ident), event, room_code, tuple(stack))
+            if key not in self.samples and len(self.samples) >= self.max_stacks:
+                key = (key[0], event, None, ('[demasiadas pilas distintas]',))
+            self.samples[key] += weight
+        # Hilos que ya terminaron
+        if len(self._cpu) > len(frames):
+            for ident in [ident for ident in self._cpu if ident not in frames]:
+                del self._cpu[ident]
+                self._names.pop(ident, None)
+
+    def _cpu_used_us(self, ident):
+        """µs de CPU del hilo desde la muestra anterior (0 la primera vez)"""
+        try:
+            cpu = time.clock_gettime_ns(time.pthread_getcpuclockid(ident))
+        except (OSError, OverflowError):
+            return round(self.interval * 1e6)  # sin reloj para este hilo: como si no hubiera parado
+        previous = self._cpu.get(ident)
+        self._cpu[ident] = cpu
+        return (cpu - previous) // 1000 if previous is not None else 0
+
+    def _label(self, code):
+        label = self._labels.get(code)
+        if label is None:
+            label = self._labels[code] = f'{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})'
+        return label
+
+    def _thread_name(self, ident):
+        name = self._names.get(ident)
+        if name is None:
+            self._names = {thread.ident: thread.name for thread in threading.enumerate()}
+            name = self._names.setdefault(ident, f'thread-{ident}')
+        return name
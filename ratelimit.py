@@ -0,0 +1,138 @@
+"""Límites de ritmo de entrada y de cola de salida por cliente.
+
+RateLimiter aplica un token bucket por socket y otro por IP a cada evento
+configurado; se comprueba antes de ejecutar el handler, así que un evento
+rechazado solo cuesta un par de búsquedas en dicts. SendQueueLimit mira los
+paquetes pendientes en la cola de Engine.IO de cada destinatario para que un
+cliente lento no acumule datos sin límite.
+"""
+import time
+
+
+class TokenBucket:
+    """Fichas disponibles de un cliente para un evento"""
+    __slots__ = ('tokens', 'updated')
+
+    def __init__(self, tokens, updated):
+        self.tokens = tokens
+        self.updated = updated
+
+    def take(self, rate, burst, now):
+        """Gasta una ficha si hay; rellena según el tiempo transcurrido"""
+        tokens = min(burst, self.tokens + (now - self.updated) * rate)
+        self.updated = now
+        if tokens < 1.0:
+            self.tokens = tokens
+            return False
+        self.tokens = tokens - 1.0
+        return True
+
+
+def parse_limits(spec):
+    """'evento=tasa:ráfaga,...' (p. ej. WEREWOLF_RATE_LIMITS) -> {evento: (tasa, ráfaga)}
+
+    'evento=off' quita el límite de ese evento.
+    """
+    limits = {}
+    for item in filter(None, (part.strip() for part in spec.split(','))):
+        event, _, value = item.partition('=')
+        if value.strip() == 'off':
+            limits[event.strip()] = None
+            continue
+        rate, _, burst = value.partition(':')
+        limits[event.strip()] = (float(rate), float(burst or rate))
+    return limits
+
+
+class RateLimiter:
+    """Token buckets por socket y por IP, con límite configurable por evento.
+
+    limits: {evento: (fichas por segundo, ráfaga)} por socket; cada IP tiene
+    ip_factor veces ese límite (varios jugadores detrás de la misma NAT).
+    Los eventos sin entrada usan default (None = sin límite).
+    """
+
+    def __init__(self, limits, default=None, ip_factor=10, max_tracked_ips=10000, clock=time.monotonic):
+        self.limits = limits
+        self.default = default
+        self.ip_factor = ip_factor
+        self.max_tracked_ips = max_tracked_ips
+        self.clock = clock
+        self._sockets = {}  # sid: {evento: TokenBucket}
+        self._ips = {}  # ip: {evento: TokenBucket}
+        self._warned = set()  # sids avisados desde su último evento aceptado
+
+    def check(self, event, sid, ip):
+        """None si el evento se acepta; si no, 'socket' o 'ip' según el límite superado"""
+        limit = self.limits.get(event, self.default)
+        if limit is None:
+            return None
+        rate, burst = limit
+        now = self.clock()
+        if sid is not None and not self._take(self._sockets, sid, event, rate, burst, now):
+            return 'socket'
+        if ip is not None:
+            if ip not in self._ips and len(self._ips) >= self.max_tracked_ips:
+                self.prune(now)
+            if not self._take(self._ips, ip, event, rate * self.ip_factor, burst * self.ip_factor, now):
+                return 'ip'
+        self._warned.discard(sid)
+        return None
+
+    def should_notify(self, sid):
+        """True solo en el primer rechazo seguido de un socket (para no responder a cada uno)"""
+        if sid in self._warned:
+            return False
+        self._warned.add(sid)
+        return True
+
+    def forget(self, sid):
+        """Descarta los buckets de un socket desconectado"""
+        self._sockets.pop(sid, None)
+        self._warned.discard(sid)
+
+    def prune(self, now=None):
+        """Descarta las IPs cuyos buckets ya se han rellenado del todo"""
+        now = self.clock() if now is None else now
+        # Sin lock: se recorren copias (otros handlers añaden IPs y eventos a la vez)
+        idle = [ip for ip, buckets in list(self._ips.items())
+                if all(self._refilled(event, bucket, now) for event, bucket in list(buckets.items()))]
+        for ip in idle:
+            self._ips.pop(ip, None)
+        return len(idle)
+
+    def tracked_ips(self):
+        return len(self._ips)
+
+    def _refilled(self, event, bucket, now):
+        rate, burst = self.limits.get(event, self.default)
+        return bucket.tokens + (now - bucket.updated) * rate * self.ip_factor >= burst * self.ip_factor
+
+    @staticmethod
+    def _take(table, key, event, rate, burst, now):
+        buckets = table.get(key)
+        if buckets is None:
+            buckets = table[key] = {}
+        bucket = buckets.get(event)
+        if bucket is None:
+            bucket = buckets[event] = TokenBucket(burst, now)
+        return bucket.take(rate, burst, now)
+
+
+class SendQueueLimit:
+    """Máximo de paquetes pendientes de enviar por cliente (backpressure de salida)"""
+
+    def __init__(self, server, max_pending, namespace='/'):
+        self.server = server  # socketio.Server
+        self.max_pending = max_pending
+        self.namespace = namespace
+
+    def pending(self, sid):
+        """Paquetes en la cola de salida de Engine.IO del socket (0 si no es local)"""
+        eio_sid = self.server.manager.eio_sid_from_sid(sid, self.namespace)
+        socket = self.server.eio.sockets.get(eio_sid) if eio_sid is not None else None
+        return socket.queue.qsize() if socket is not None else 0
+
+    def over_limit(self, sids):
+        """Destinatarios cuya cola ya alcanzó el máximo"""
+        return [sid for sid in sids if self.pending(sid) >= self.max_pending]
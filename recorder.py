@@ -0,0 +1,116 @@
+"""Grabación del tráfico de una sesión para reproducirla como prueba de rendimiento.
+
+Opcional (WEREWOLF_RECORD=ruta). Se apunta cada evento Socket.IO entrante,
+cada transición programada ejecutada, cada código de sala repartido y la
+semilla de cada partida (setup_game baraja con ella), con el instante
+monotónico en que ocurrió. benchmarks/replay.py lo vuelve a inyectar en la
+app a velocidad original o lo más rápido posible.
+
+Formato: MAGIC y luego un flujo de valores de wire.pack (MessagePack con las
+claves y textos conocidos como enteros). El primero es la cabecera; cada
+registro es [tipo, microsegundos desde el anterior, campos...]. Los sids se
+escriben completos la primera vez y después como su número de aparición.
+"""
+import threading
+import time
+
+import wire
+
+MAGIC = b'WWREC1'
+
+# Tipos de registro y sus campos
+EVENT = 0  # sid, evento, código de sala o None, [args]
+TICK = 1  # nombre de la transición, [args] (el primero es el código de sala)
+ROOM = 2  # sid, código repartido
+SEED = 3  # código de sala, semilla de la partida
+
+KIND_NAMES = {EVENT: 'event', TICK: 'tick', ROOM: 'room', SEED: 'seed'}
+
+
+class Recorder:
+    """Escribe los registros de una sesión en un fichero binario (seguro entre hilos)"""
+
+    def __init__(self, file, header=None, clock=time.monotonic):
+        self._file = file
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._started = clock()
+        self._last_us = 0
+        self._sids = {}  # sid conectado: número de aparición
+        self._next_sid = 0
+        self.records = 0
+        # header: configuración que la reproducción debe reproducir (p. ej. plazos de fase)
+        file.write(MAGIC + wire.pack({'version': 1, 'started': time.time(), **(header or {})}))
+
+    @classmethod
+    def open(cls, path, header=None):
+        """Graba en path (lo sobrescribe)"""
+        return cls(open(path, 'wb'), header)
+
+    def event(self, sid, event, room_code, args):
+        with self._lock:
+            self._write(EVENT, self._sid(sid), event, room_code, list(args))
+            if event == 'disconnect':
+                self._sids.pop(sid, None)
+
+    def tick(self, name, args):
+        with self._lock:
+            self._write(TICK, name, list(args))
+
+    def room(self, sid, room_code):
+        with self._lock:
+            self._write(ROOM, self._sid(sid), room_code)
+
+    def seed(self, room_code, seed):
+        with self._lock:
+            self._write(SEED, room_code, seed)
+
+    def flush(self):
+        with self._lock:
+            self._file.flush()
+
+    def close(self):
+        with self._lock:
+            self._file.close()
+
+    def _sid(self, sid):
+        index = self._sids.get(sid)
+        if index is None:
+            self._sids[sid] = self._next_sid
+            self._next_sid += 1
+            return sid
+        return index
+
+    def _write(self, kind, *fields):
+        # El delta se calcula con el lock: los instantes del fichero nunca retroceden
+        now_us = int((self._clock() - self._started) * 1e6)
+        delta, self._last_us = max(0, now_us - self._last_us), max(now_us, self._last_us)
+        self._file.write(wire.pack([kind, delta, *fields]))
+        self.records += 1
+
+
+def read_log(path):
+    """Lee una grabación; devuelve (cabecera, [(segundos desde el inicio, tipo, campos)])"""
+    with open(path, 'rb') as file:
+        return parse_log(file.read())
+
+
+def parse_log(data):
+    """Como read_log, a partir de los bytes"""
+    if not data.startswith(MAGIC):
+        raise ValueError('No es una grabación de la app')
+    values = wire.iter_decode(data[len(MAGIC):])
+    header = next(values)
+    records = []
+    sids = []  # sids por número de aparición
+    elapsed_us = 0
+    for kind, delta, *fields in values:
+        elapsed_us += delta
+        if kind in (EVENT, ROOM):
+            sid = fields[0]
+            if isinstance(sid, int):
+                fields[0] = sids[sid]
+            else:
+                sids.append(sid)
+        records.append((elapsed_us / 1e6, kind, fields))
+    return header, records
@@ -0,0 +1,91 @@
+import collections
+import time
+
+
+class RoomStoreFull(Exception):
+    """Se alcanzó el máximo de salas y ninguna lleva inactiva lo suficiente para desalojarla"""
+
+
+class RoomStore(collections.OrderedDict):
+    """Diccionario código -> Room ordenado por última actividad (LRU primero).
+
+    touch() registra actividad y mueve la sala al final; así las inactivas se
+    encuentran recorriendo desde el principio, sin mirar todas las salas.
+    """
+
+    def __init__(self, ttls, default_ttl, max_rooms=None, min_idle=60.0, clock=time.monotonic):
+        super().__init__()
+        self.ttls = ttls  # game_state: segundos sin actividad antes de expirar
+        self.default_ttl = default_ttl
+        self.max_rooms = max_rooms
+        self.min_idle = min_idle
+        self.clock = clock
+        self.last_activity = {}  # código: instante de la última actividad
+
+    def __setitem__(self, code, room):
+        super().__setitem__(code, room)
+        self.move_to_end(code)
+        self.last_activity[code] = self.clock()
+
+    def __delitem__(self, code):
+        super().__delitem__(code)
+        self.last_activity.pop(code, None)
+
+    def pop(self, code, *default):
+        self.last_activity.pop(code, None)
+        return super().pop(code, *default)
+
+    def touch(self, code):
+        """Registra actividad en la sala"""
+        if code in self.last_activity:
+            self.last_activity[code] = self.clock()
+            self.move_to_end(code)
+
+    def idle_for(self, code, now=None):
+        """Segundos sin actividad, o None si la sala ya no existe"""
+        last = self.last_activity.get(code)
+        return None if last is None else (now if now is not None else self.clock()) - last
+
+    def expired(self, now=None):
+        """Códigos cuya inactividad supera el TTL de su estado"""
+        now = now if now is not None else self.clock()
+        shortest = min(self.ttls.values(), default=self.default_ttl)
+        codes = []
+        # Otro hilo puede eliminar salas mientras se recorre la copia: se saltan
+        for code, room in list(self.items()):
+            last = self.last_activity.get(code)
+            if last is None:
+                continue
+            idle = now - last
+            if idle < shortest:
+                break  # el resto tuvo actividad más reciente
+            if idle >= self.ttls.get(room.game_state, self.default_ttl):
+                codes.append(code)
+        return codes
+
+    def is_expired(self, code, now=None):
+        """True si la sala sigue superando el TTL de su estado"""
+        room = self.get(code)
+        last = self.last_activity.get(code)
+        if room is None or last is None:
+            return False
+        now = now if now is not None else self.clock()
+        return now - last >= self.ttls.get(room.game_state, self.default_ttl)
+
+    def victims_for_new_room(self):
+        """Salas LRU a desalojar para que quepa una más; RoomStoreFull si no se puede"""
+        if self.max_rooms is None or len(self) < self.max_rooms:
+            return []
+        excess = len(self) - self.max_rooms + 1
+        now = self.clock()
+        codes = []
+        for code in list(self):
+            last = self.last_activity.get(code)
+            if last is None:
+                continue
+            if now - last < self.min_idle:
+                break
+            codes.append(code)
+            if len(codes) == excess:
+                return codes
+        raise RoomStoreFull(f'{len(self)} salas activas (máximo {self.max_rooms})')
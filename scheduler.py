@@ -0,0 +1,204 @@
+import heapq
+import itertools
+import threading
+import time
+
+from logs import get_logger
+
+log = get_logger('scheduler')
+
+
+class ScheduledTask:
+    """Una transición pendiente de una sala"""
+    __slots__ = ('deadline', 'key', 'callback', 'args', 'cancelled', 'queued')
+
+    def __init__(self, deadline, key, callback, args):
+        self.deadline = deadline
+        self.key = key
+        self.callback = callback
+        self.args = args
+        self.cancelled = False
+        # Sigue en el heap (las canceladas dentro del heap se cuentan para compactar)
+        self.queued = True
+
+
+class PhaseScheduler:
+    """Planificador único por proceso para todos los plazos de las salas.
+
+    Guarda las tareas en un heap ordenado por fecha límite y las ejecuta desde
+    un solo hilo, en lugar de dejar un hilo dormido por cada sala.
+    """
+
+    def __init__(self, clock=time.monotonic, autostart=True, around=None, spawn=None):
+        self._clock = clock
+        # Con autostart=False nadie arranca el hilo: el dueño llama a run_pending()
+        self.autostart = autostart
+        # Envoltorio opcional de cada callback (p. ej. Outbox.batched)
+        self.around = around
+        # Arranque del bucle: por defecto un hilo daemon (p. ej. socketio.start_background_task)
+        self.spawn = spawn
+        self._heap = []  # (deadline, seq, task)
+        self._by_key = {}  # key: set(ScheduledTask)
+        self._seq = itertools.count()
+        self._cond = threading.Condition()
+        self._thread = None
+        self._cancelled_in_heap = 0
+
+        # Métricas
+        self.executed = 0
+        self.last_lag = 0.0
+        self.max_lag = 0.0
+
+    def call_later(self, key, delay, callback, *args):
+        """Programa callback(*args) dentro de delay segundos, agrupado por key (código de sala)"""
+        task = ScheduledTask(self._clock() + delay, key, callback, args)
+        with self._cond:
+            heapq.heappush(self._heap, (task.deadline, next(self._seq), task))
+            self._by_key.setdefault(key, set()).add(task)
+            self._ensure_started()
+            # Despertar al hilo solo si esta tarea es la más próxima
+            if self._heap[0][2] is task:
+                self._cond.notify()
+        return task
+
+    def cancel(self, task):
+        """Cancela una tarea concreta; devuelve True si seguía pendiente"""
+        with self._cond:
+            return self._cancel_locked(task)
+
+    def cancel_key(self, key):
+        """Cancela todas las tareas pendientes de una sala"""
+        with self._cond:
+            tasks = self._by_key.pop(key, ())
+            for task in tasks:
+                task.cancelled = True
+                self._cancelled_in_heap += task.queued
+            self._maybe_compact()
+            return len(tasks)
+
+    def pending(self, key=None):
+        """Número de tareas pendientes (de una sala o en total)"""
+        with self._cond:
+            if key is not None:
+                return len(self._by_key.get(key, ()))
+            return len(self._heap) - self._cancelled_in_heap
+
+    def tasks(self, key):
+        """Tareas pendientes de una sala como (segundos restantes, callback, args), por fecha límite"""
+        with self._cond:
+            tasks = sorted(self._by_key.get(key, ()), key=lambda task: task.deadline)
+        now = self._clock()
+        return [(max(0.0, task.deadline - now), task.callback, task.args) for task in tasks]
+
+    def stats(self):
+        """Profundidad de la cola y retraso de ejecución"""
+        with self._cond:
+            pending = len(self._heap) - self._cancelled_in_heap
+            next_in = self._heap[0][0] - self._clock() if self._heap else None
+        return {
+            'pending': pending,
+            'rooms_with_pending': len(self._by_key),
+            'executed': self.executed,
+            'next_due_in': next_in,
+            'last_lag_ms': self.last_lag * 1000,
+            'max_lag_ms': self.max_lag * 1000,
+        }
+
+    def run_pending(self, now=None):
+        """Ejecuta las tareas vencidas; devuelve cuántas se ejecutaron.
+
+        Se ejecutan las vencidas al empezar, por (fecha límite, orden de
+        llegada); las programadas durante la llamada esperan a la siguiente,
+        para que una tarea que se reprograma a sí misma no la deje en bucle.
+        Una tarea del lote cancelada por otra anterior ya no se ejecuta.
+        """
+        if now is None:
+            now = self._clock()
+        with self._cond:
+            due = []
+            while True:
+                task = self._pop_due_locked(now, forget=False)
+                if task is None:
+                    break
+                due.append(task)
+        ran = 0
+        for task in due:
+            with self._cond:
+                if task.cancelled:
+                    continue
+                self._forget_locked(task)
+            self._execute(task)
+            ran += 1
+        return ran
+
+    def _run(self):
+        """Bucle del hilo del planificador"""
+        while True:
+            with self._cond:
+                while True:
+                    now = self._clock()
+                    task = self._pop_due_locked(now)
+                    if task is not None:
+                        break
+                    timeout = self._heap[0][0] - now if self._heap else None
+                    self._cond.wait(timeout)
+            self._execute(task)
+
+    def _execute(self, task):
+        lag = max(0.0, self._clock() - task.deadline)
+        self.last_lag = lag
+        if lag > self.max_lag:
+            self.max_lag = lag
+        self.executed += 1
+        try:
+            callback = task.callback if self.around is None else self.around(task.callback)
+            callback(*task.args)
+        except Exception:
+            log.exception("Tarea programada para %s falló", task.key, extra={'room_code': task.key})
+
+    def _pop_due_locked(self, now, forget=True):
+        while self._heap:
+            deadline, seq, task = self._heap[0]
+            if task.cancelled:
+                heapq.heappop(self._heap)
+                self._cancelled_in_heap -= 1
+                continue
+            if deadline > now:
+                return None
+            heapq.heappop(self._heap)
+            task.queued = False
+            if forget:
+                self._forget_locked(task)
+            return task
+        return None
+
+    def _cancel_locked(self, task):
+        if task.cancelled or task not in self._by_key.get(task.key, ()):
+            return False
+        task.cancelled = True
+        self._forget_locked(task)
+        self._cancelled_in_heap += task.queued
+        self._maybe_compact()
+        return True
+
+    def _forget_locked(self, task):
+        tasks = self._by_key.get(task.key)
+        if tasks is not None:
+            tasks.discard(task)
+            if not tasks:
+                del self._by_key[task.key]
+
+    def _maybe_compact(self):
+        # Reconstruir el heap cuando la mitad son tareas canceladas
+        if self._cancelled_in_heap > 64 and self._cancelled_in_heap * 2 > len(self._heap):
+            self._heap = [entry for entry in self._heap if not entry[2].cancelled]
+            heapq.heapify(self._heap)
+            self._cancelled_in_heap = 0
+
+    def _ensure_started(self):
+        if self._thread is None and self.autostart:
+            if self.spawn is not None:
+                self._thread = self.spawn(self._run)
+            else:
+                self._thread = threading.Thread(target=self._run, name='phase-scheduler', daemon=True)
+                self._thread.start()
@@ -0,0 +1,190 @@
+"""Simulación headless de partidas para análisis de balance de los mazos.
+
+Uso: python simulation.py --players 5 --games 2000000 --workers 4
+
+Reparte y resuelve las noches por lotes con NumPy (sin GameLogic ni dicts de
+jugadores): permutaciones vectorizadas para barajar y los intercambios de
+ladrón, alborotadora y borracho aplicados a todo el lote a la vez, con
+objetivos aleatorios. Requiere NumPy; la app no lo importa.
+"""
+import argparse
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+
+import numpy as np
+
+from game_logic import ROLE_NAMES, deck_for
+from models import Role
+
+ROLES = list(Role)
+ROLE_CODES = {role: code for code, role in enumerate(ROLES)}
+NUM_ROLES = len(ROLES)
+
+WEREWOLF = ROLE_CODES[Role.WEREWOLF]
+ROBBER = ROLE_CODES[Role.ROBBER]
+TROUBLEMAKER = ROLE_CODES[Role.TROUBLEMAKER]
+DRUNK = ROLE_CODES[Role.DRUNK]
+
+
+@dataclass(slots=True)
+class SimulationStats:
+    """Contadores agregados de un conjunto de partidas simuladas"""
+    num_players: int
+    games: int
+    center_counts: np.ndarray  # [rol] veces que el rol quedó en el centro
+    lone_wolf_games: int
+    no_wolf_games: int
+    transitions: np.ndarray  # [rol original, rol final] por jugador
+
+    def merge(self, other):
+        return SimulationStats(
+            num_players=self.num_players,
+            games=self.games + other.games,
+            center_counts=self.center_counts + other.center_counts,
+            lone_wolf_games=self.lone_wolf_games + other.lone_wolf_games,
+            no_wolf_games=self.no_wolf_games + other.no_wolf_games,
+            transitions=self.transitions + other.transitions
+        )
+
+    def summary(self):
+        """Frecuencias por partida listas para mostrar o serializar"""
+        deck = deck_for(self.num_players)
+        in_deck = [role for role in ROLES if role in deck]
+        final_distribution = {}
+        for role in in_deck:
+            row = self.transitions[ROLE_CODES[role]]
+            total = row.sum()
+            if total:
+                final_distribution[role.value] = {
+                    ROLES[code].value: row[code] / total for code in np.nonzero(row)[0]
+                }
+        return {
+            'players': self.num_players,
+            'games': self.games,
+            'role_in_center': {
+                role.value: self.center_counts[ROLE_CODES[role]] / self.games for role in in_deck
+            },
+            'lone_wolf_rate': self.lone_wolf_games / self.games,
+            'no_wolf_rate': self.no_wolf_games / self.games,
+            'final_role_distribution': final_distribution
+        }
+
+
+def _positions(cards, role, num_players):
+    """Posición del jugador que tiene el rol (como mucho una copia) y máscara de partidas"""
+    holders = cards[:, :num_players] == role
+    return holders.argmax(axis=1), holders.any(axis=1)
+
+
+def _swap(cards, rows, a, b):
+    tmp = cards[rows, a].copy()
+    cards[rows, a] = cards[rows, b]
+    cards[rows, b] = tmp
+
+
+def simulate_batch(num_players, games, rng):
+    """Reparte y resuelve `games` noches; devuelve SimulationStats"""
+    deck = np.array([ROLE_CODES[role] for role in deck_for(num_players)], dtype=np.int8)
+    in_play = num_players + 3
+
+    # Barajar: una permutación por partida (argsort de claves aleatorias)
+    order = np.argsort(rng.random((games, len(deck))), axis=1)[:, :in_play]
+    cards = deck[order]  # columnas: jugadores y después las 3 del centro
+    original = cards[:, :num_players].copy()
+
+    wolves = (original == WEREWOLF).sum(axis=1)
+    others = rng.integers(1, num_players, size=(games, 2))
+
+    # Ladrón: cambia su carta con otro jugador
+    pos, has = _positions(original, ROBBER, num_players)
+    rows = np.nonzero(has)[0]
+    _swap(cards, rows, pos[rows], (pos[rows] + others[rows, 0]) % num_players)
+
+    # Alborotadora: intercambia las cartas de otros dos jugadores
+    if num_players >= 3:
+        pos, has = _positions(original, TROUBLEMAKER, num_players)
+        rows = np.nonzero(has)[0]
+        first = others[rows, 1]
+        second = rng.integers(1, num_players - 1, size=len(rows))
+        second += second >= first
+        _swap(cards, rows, (pos[rows] + first) % num_players, (pos[rows] + second) % num_players)
+
+    # Borracho: cambia su carta por una del centro
+    pos, has = _positions(original, DRUNK, num_players)
+    rows = np.nonzero(has)[0]
+    center = num_players + rng.integers(0, 3, size=len(rows))
+    _swap(cards, rows, pos[rows], center)
+
+    final = cards[:, :num_players]
+    transitions = np.bincount(
+        original.ravel().astype(np.int64) * NUM_ROLES + final.ravel(),
+        minlength=NUM_ROLES * NUM_ROLES
+    ).reshape(NUM_ROLES, NUM_ROLES)
+    center_counts = np.bincount(deck[order[:, num_players:]].ravel(), minlength=NUM_ROLES)
+
+    return SimulationStats(
+        num_players=num_players,
+        games=games,
+        center_counts=center_counts,
+        lone_wolf_games=int((wolves == 1).sum()),
+        no_wolf_games=int((wolves == 0).sum()),
+        transitions=transitions
+    )
+
+
+def _run_batch(args):
+    num_players, games, seed = args
+    return simulate_batch(num_players, games, np.random.default_rng(seed))
+
+
+def simulate(num_players, games, seed=0, workers=None, batch_size=250_000):
+    """Simula `games` partidas repartidas en lotes sobre un pool de procesos"""
+    batches = [batch_size] * (games // batch_size)
+    if games % batch_size:
+        batches.append(games % batch_size)
+    seeds = np.random.SeedSequence(seed).spawn(len(batches))
+    jobs = [(num_players, size, child) for size, child in zip(batches, seeds)]
+
+    if workers == 1:
+        results = map(_run_batch, jobs)
+        return _merge(results)
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return _merge(pool.map(_run_batch, jobs))
+
+
+def _merge(results):
+    total = None
+    for stats in results:
+        total = stats if total is None else total.merge(stats)
+    return total
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Simulación de balance de One Night Werewolf')
+    parser.add_argument('--players', type=int, default=5)
+    parser.add_argument('--games', type=int, default=1_000_000)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--batch-size', type=int, default=250_000)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    stats = simulate(args.players, args.games, args.seed, args.workers, args.batch_size)
+    elapsed = time.perf_counter() - start
+    summary = stats.summary()
+
+    print(f"{summary['games']:,} partidas de {args.players} jugadores en {elapsed:.2f} s "
+          f"({summary['games'] / elapsed * 60:,.0f} partidas/min)")
+    print(f"Lobo solitario: {summary['lone_wolf_rate']:.2%}  Sin lobos: {summary['no_wolf_rate']:.2%}")
+    print("Copias en el centro por partida:")
+    for role, freq in summary['role_in_center'].items():
+        print(f"  {ROLE_NAMES[Role(role)]:<14} {freq:.3f}")
+    print("Rol final según rol inicial:")
+    for role, distribution in summary['final_role_distribution'].items():
+        parts = ', '.join(f"{ROLE_NAMES[Role(r)]} {p:.1%}" for r, p in sorted(distribution.items(), key=lambda i: -i[1]))
+        print(f"  {ROLE_NAMES[Role(role)]:<14} {parts}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,68 @@
+import collections
+import threading
+import time
+
+
+class SpectatorFeed:
+    """Eventos de cada sala para sus espectadores, con retraso y agrupados.
+
+    publish() apunta el evento con el instante a partir del cual puede verse
+    (ahora + delay): así lo secreto de la noche no llega en directo a quien
+    retransmite la partida. Un único tick periódico recoge lo vencido (due) y
+    lo envía como una sola escritura por sala, codificada una vez para todos
+    sus espectadores.
+    """
+
+    def __init__(self, delay, clock=time.monotonic):
+        self.delay = delay
+        self.clock = clock
+        self.published = 0
+        self._queues = {}  # código de sala: deque[(instante visible, evento, datos)]
+        self._armed = False  # hay un tick programado
+        self._lock = threading.Lock()
+
+    def publish(self, room_code, event, data):
+        """Encola el evento; True si hay que programar el tick (no había ninguno)"""
+        with self._lock:
+            queue = self._queues.get(room_code)
+            if queue is None:
+                queue = self._queues[room_code] = collections.deque()
+            queue.append((self.clock() + self.delay, event, data))
+            self.published += 1
+            if self._armed:
+                return False
+            self._armed = True
+            return True
+
+    def due(self, now=None):
+        """[(código, [(evento, datos), ...])] ya visibles, en orden, quitándolos de la cola"""
+        now = now if now is not None else self.clock()
+        ready = []
+        with self._lock:
+            for room_code, queue in list(self._queues.items()):
+                events = []
+                while queue and queue[0][0] <= now:
+                    _, event, data = queue.popleft()
+                    events.append((event, data))
+                if not queue:
+                    del self._queues[room_code]
+                if events:
+                    ready.append((room_code, events))
+        return ready
+
+    def rearm(self, now=None):
+        """Tras un tick: segundos hasta el próximo evento visible, o None (y el tick se desarma)"""
+        now = now if now is not None else self.clock()
+        with self._lock:
+            if not self._queues:
+                self._armed = False
+                return None
+            return max(0.0, min(queue[0][0] for queue in self._queues.values()) - now)
+
+    def waiting(self, room_code):
+        """Eventos de la sala aún sin enviar"""
+        queue = self._queues.get(room_code)
+        return len(queue) if queue is not None else 0
+
+    def pending(self):
+        return sum(len(queue) for queue in list(self._queues.values()))
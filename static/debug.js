@@ -0,0 +1,138 @@
+const socket = io();
+let currentTestRoom = '';
+
+// Debug: Escuchar todos los eventos
+socket.onAny((eventName, ...args) => {
+    console.log(`DEBUG: ${eventName}`, args);
+    addMessage(`EVENT: ${eventName} - ${JSON.stringify(args)}`);
+});
+
+// Varios eventos agrupados por el servidor en una sola escritura
+socket.on('batch', function(data) {
+    data.events.forEach(([event, payload]) => {
+        socket.listeners(event).forEach(handler => handler(payload));
+    });
+});
+
+socket.on('connect', function() {
+    addMessage('✅ Conectado al servidor de testing');
+});
+
+socket.on('test_room_created', function(data) {
+    currentTestRoom = data.room_code;
+    document.getElementById('test-room-code').textContent = data.room_code;
+    document.getElementById('test-description').textContent = data.config.description;
+    document.getElementById('test-info').style.display = 'block';
+
+    addMessage(`🧪 Sala de testing creada: ${data.room_code}`);
+    addMessage(`📋 Escenario: ${data.config.description}`);
+    addMessage(`👥 Jugadores: ${data.config.players.join(', ')}`);
+    addMessage(`🎭 Roles: ${data.config.roles.join(', ')}`);
+});
+
+socket.on('game_started', function(data) {
+    addMessage('🎮 TEST: Juego iniciado - observa los eventos de lobos');
+});
+
+socket.on('your_role', function(data) {
+    addMessage(`🎭 Tu rol: ${data.role_name}`);
+});
+
+socket.on('werewolf_phase_info', function(data) {
+    if (data.is_lone_wolf) {
+        addMessage('✅ TEST PASSED: Lobo solitario detectado - deberían aparecer botones');
+    } else {
+        addMessage(`✅ TEST PASSED: Múltiples lobos detectados - otros: ${data.other_werewolves.map(w => w.username).join(', ')}`);
+    }
+});
+
+socket.on('night_phase_started', function(data) {
+    if (data.phase === 'werewolf') {
+        addMessage(`🌙 Fase de lobos iniciada`);
+    } else if (data.phase === 'seer') {
+        addMessage('✅ TEST: Fase avanzó correctamente a Pitonisa');
+    }
+});
+
+function createTestRoom(testType) {
+    addMessage(`🧪 Creando test: ${testType}`);
+    socket.emit('create_test_room', { test_type: testType });
+}
+
+function startTestGame() {
+    if (!currentTestRoom) {
+        addMessage('❌ Error: No hay sala de testing activa');
+        return;
+    }
+
+    addMessage('🚀 Iniciando juego de testing...');
+    socket.emit('start_game');
+}
+
+// Profiler: rutas /debug/profiler con el token de admin en la cabecera
+function profilerRequest(path, options = {}) {
+    const token = document.getElementById('admin-token').value;
+    return fetch(`/debug/profiler${path}`, {
+        ...options,
+        headers: {'X-Admin-Token': token, 'Content-Type': 'application/json'}
+    }).then(response => {
+        if (!response.ok) {
+            return response.json().then(data => { throw new Error(data.error || response.status); });
+        }
+        return response;
+    });
+}
+
+function showProfiler(data) {
+    const state = data.running ? '🔴 muestreando' : '⚪ parado';
+    document.getElementById('profiler-status').textContent =
+        `Profiler: ${state} · ${data.mode} cada ${(data.interval * 1000).toFixed(1)} ms · ` +
+        `${data.samples} ${data.unit} en ${data.seconds.toFixed(1)} s · coste ${(data.overhead * 100).toFixed(2)}%`;
+    if (data.top) {
+        document.getElementById('profiler-top').textContent = data.top
+            .map(f => `${f.self_pct.toFixed(1).padStart(6)}% ${f.total_pct.toFixed(1).padStart(6)}%  ${f.function}`)
+            .join('\n');
+    }
+}
+
+function startProfiler() {
+    const duration = parseFloat(document.getElementById('profiler-duration').value) || null;
+    profilerRequest('/start', {
+        method: 'POST',
+        body: JSON.stringify({
+            interval: parseFloat(document.getElementById('profiler-interval').value) / 1000,
+            duration: duration,
+            mode: document.getElementById('profiler-mode').value
+        })
+    }).then(response => response.json()).then(showProfiler)
+        .catch(error => addMessage(`❌ Profiler: ${error.message}`));
+}
+
+function stopProfiler() {
+    profilerRequest('/stop', {method: 'POST'}).then(() => refreshProfiler())
+        .catch(error => addMessage(`❌ Profiler: ${error.message}`));
+}
+
+function refreshProfiler() {
+    profilerRequest('?top=25').then(response => response.json()).then(showProfiler)
+        .catch(error => addMessage(`❌ Profiler: ${error.message}`));
+}
+
+function downloadFlamegraph() {
+    const group = document.getElementById('profiler-group').value;
+    profilerRequest(`/collapsed?group=${encodeURIComponent(group)}`).then(response => response.blob()).then(blob => {
+        const link = document.createElement('a');
+        link.href = URL.createObjectURL(blob);
+        link.download = `werewolf-${Date.now()}.folded`;
+        link.click();
+        URL.revokeObjectURL(link.href);
+    }).catch(error => addMessage(`❌ Profiler: ${error.message}`));
+}
+
+function addMessage(message) {
+    const messagesDiv = document.getElementById('messages');
+    const messageElement = document.createElement('div');
+    messageElement.textContent = `${new Date().toLocaleTimeString()}: ${message}`;
+    messagesDiv.appendChild(messageElement);
+    messagesDiv.scrollTop = messagesDiv.scrollHeight;
+}
@@ -0,0 +1,737 @@
+// Decodificador MessagePack con las claves, textos y plantillas de WIRE
+function wireDecode(buffer) {
+    const bytes = new Uint8Array(buffer);
+    const view = new DataView(bytes.buffer, bytes.byteOffset, bytes.byteLength);
+    const utf8 = new TextDecoder();
+    let pos = 0;
+
+    function str(size) {
+        const value = utf8.decode(bytes.subarray(pos, pos + size));
+        pos += size;
+        return value;
+    }
+    function array(size) {
+        const items = [];
+        for (let i = 0; i < size; i++) items.push(read());
+        return items;
+    }
+    function map(size) {
+        const obj = {};
+        for (let i = 0; i < size; i++) {
+            const key = read();
+            obj[typeof key === 'number' ? WIRE.keys[key] : key] = read();
+        }
+        return obj;
+    }
+    function ext(size) {
+        const type = view.getInt8(pos);
+        pos += 1;
+        const start = pos;
+        if (type === 1) {
+            // Texto conocido: índice en WIRE.strings
+            const index = size === 1 ? bytes[pos] : view.getUint16(pos);
+            pos = start + size;
+            return WIRE.strings[index];
+        }
+        if (type === 2) {
+            // Texto de plantilla: [plantilla, args]
+            const [template, args] = read();
+            pos = start + size;
+            return WIRE.templates[template].replace(/\{(\w+)\}/g, (_, name) => args[name]);
+        }
+        pos = start + size;
+        return null;
+    }
+    function read() {
+        const type = bytes[pos++];
+        let value;
+        if (type < 0x80) return type;
+        if (type < 0x90) return map(type & 0x0f);
+        if (type < 0xa0) return array(type & 0x0f);
+        if (type < 0xc0) return str(type & 0x1f);
+        if (type >= 0xe0) return type - 0x100;
+        switch (type) {
+            case 0xc0: return null;
+            case 0xc2: return false;
+            case 0xc3: return true;
+            case 0xc4: value = bytes.slice(pos + 1, pos + 1 + bytes[pos]); pos += 1 + value.length; return value;
+            case 0xc5: value = bytes.slice(pos + 2, pos + 2 + view.getUint16(pos)); pos += 2 + value.length; return value;
+            case 0xc6: value = bytes.slice(pos + 4, pos + 4 + view.getUint32(pos)); pos += 4 + value.length; return value;
+            case 0xc7: value = bytes[pos]; pos += 1; return ext(value);
+            case 0xc8: value = view.getUint16(pos); pos += 2; return ext(value);
+            case 0xc9: value = view.getUint32(pos); pos += 4; return ext(value);
+            case 0xca: value = view.getFloat32(pos); pos += 4; return value;
+            case 0xcb: value = view.getFloat64(pos); pos += 8; return value;
+            case 0xcc: return bytes[pos++];
+            case 0xcd: value = view.getUint16(pos); pos += 2; return value;
+            case 0xce: value = view.getUint32(pos); pos += 4; return value;
+            case 0xcf: value = Number(view.getBigUint64(pos)); pos += 8; return value;
+            case 0xd0: value = view.getInt8(pos); pos += 1; return value;
+            case 0xd1: value = view.getInt16(pos); pos += 2; return value;
+            case 0xd2: value = view.getInt32(pos); pos += 4; return value;
+            case 0xd3: value = Number(view.getBigInt64(pos)); pos += 8; return value;
+            case 0xd4: return ext(1);
+            case 0xd5: return ext(2);
+            case 0xd6: return ext(4);
+            case 0xd7: return ext(8);
+            case 0xd8: return ext(16);
+            case 0xd9: value = bytes[pos]; pos += 1; return str(value);
+            case 0xda: value = view.getUint16(pos); pos += 2; return str(value);
+            case 0xdb: value = view.getUint32(pos); pos += 4; return str(value);
+            case 0xdc: value = view.getUint16(pos); pos += 2; return array(value);
+            case 0xdd: value = view.getUint32(pos); pos += 4; return array(value);
+            case 0xde: value = view.getUint16(pos); pos += 2; return map(value);
+            case 0xdf: value = view.getUint32(pos); pos += 4; return map(value);
+        }
+        throw new Error(`wire: tipo 0x${type.toString(16)} no soportado`);
+    }
+    return read();
+}
+
+// Conectar al servidor WebSocket pidiendo el formato binario
+const socket = io({auth: {wire: WIRE.version}});
+
+// Variables globales
+let currentUsername = '';
+let currentRoomCode = '';
+let isHost = false;
+let isSpectator = false;
+let currentRole = '';
+let gameState = 'waiting'; // waiting, night, discussion, voting
+let roomVersion = -1;
+let roomPlayers = [];
+
+// Listado de salas abiertas (páginas cargadas + lobby_delta)
+const LOBBY_PAGE_SIZE = 20;
+let lobbyVersion = -1;
+let lobbyRooms = new Map(); // room_code: {room_code, host, players, free}
+let lobbyTotal = 0;
+
+// Elementos del DOM
+const startScreen = document.getElementById('start-screen');
+const roomScreen = document.getElementById('room-screen');
+const gameScreen = document.getElementById('game-screen');
+
+// Debug: Escuchar TODOS los eventos para ver qué llega
+socket.onAny((eventName, ...args) => {
+    console.log(`DEBUG: Evento recibido: ${eventName}`, args);
+});
+
+// Eventos del socket
+socket.on('connect', function() {
+    updateConnectionStatus('Conectado ✅');
+    addMessage('Conectado al servidor correctamente');
+    if (!currentRoomCode) {
+        requestLobby();
+    }
+});
+
+socket.on('disconnect', function() {
+    updateConnectionStatus('Desconectado ❌');
+    addMessage('Desconectado del servidor');
+    showStartScreen();
+});
+
+// Mensaje en formato binario: se decodifica y se entrega al handler del evento
+socket.on('wire', function(buffer) {
+    const [event, payload] = wireDecode(buffer);
+    socket.listeners(event).forEach(handler => handler(payload));
+});
+
+// Varios eventos agrupados por el servidor en una sola escritura
+socket.on('batch', function(data) {
+    data.events.forEach(([event, payload]) => {
+        socket.listeners(event).forEach(handler => handler(payload));
+    });
+});
+
+socket.on('status', function(data) {
+    addMessage('Servidor: ' + data.msg);
+});
+
+socket.on('room_created', function(data) {
+    isSpectator = false;
+    saveRejoinToken(data.room_code, data.rejoin_token);
+    addMessage(`¡Sala ${data.room_code} creada exitosamente!`);
+    currentUsername = data.username;
+    currentRoomCode = data.room_code;
+    isHost = data.is_host;
+    showRoomScreen();
+});
+
+socket.on('room_joined', function(data) {
+    isSpectator = false;
+    saveRejoinToken(data.room_code, data.rejoin_token);
+    addMessage(`¡Te uniste a la sala ${data.room_code}!`);
+    currentUsername = data.username;
+    currentRoomCode = data.room_code;
+    isHost = data.is_host;
+    showRoomScreen();
+});
+
+// Modo multi-proceso: la sala vive en otro worker, reconectar allí y volver a unirse
+socket.on('room_redirect', function(data) {
+    addMessage(`Redirigiendo a la sala ${data.room_code}...`);
+    const username = document.getElementById('username').value.trim();
+    socket.io.uri = data.url;
+    socket.disconnect();
+    socket.once('connect', function() {
+        if (data.spectate) {
+            socket.emit('spectate', {room_code: data.room_code});
+            return;
+        }
+        socket.emit('join_room', {
+            username: username,
+            room_code: data.room_code,
+            rejoin_token: rejoinToken(data.room_code)
+        });
+    });
+    socket.connect();
+});
+
+// Estado completo de la sala (al entrar o tras pedir un snapshot)
+socket.on('room_updated', function(data) {
+    roomVersion = data.version;
+    roomPlayers = data.players;
+    updateRoomPlayers(roomPlayers);
+});
+
+// Cambios agrupados; si falta alguna versión se pide el estado completo
+socket.on('room_delta', function(data) {
+    if (data.room_code !== currentRoomCode) return;
+    for (const change of data.changes) {
+        if (change.v <= roomVersion) continue;
+        if (change.v !== roomVersion + 1) {
+            socket.emit('request_room_snapshot');
+            return;
+        }
+        applyRoomChange(change);
+        roomVersion = change.v;
+    }
+    updateRoomPlayers(roomPlayers);
+});
+
+// Página del listado de salas; la primera reemplaza lo cargado
+socket.on('room_list', function(data) {
+    if (data.offset === 0) {
+        lobbyRooms = new Map();
+    } else if (data.version !== lobbyVersion) {
+        requestLobby(); // el listado cambió entre páginas
+        return;
+    }
+    lobbyVersion = data.version;
+    lobbyTotal = data.total;
+    data.rooms.forEach(room => lobbyRooms.set(room.room_code, room));
+    updateLobby(data.next_offset !== null);
+});
+
+// Cambios del listado; si falta alguna versión se pide de nuevo
+socket.on('lobby_delta', function(data) {
+    if (lobbyVersion < 0) return;
+    for (const change of data.changes) {
+        if (change.v <= lobbyVersion) continue;
+        if (change.v !== lobbyVersion + 1) {
+            requestLobby();
+            return;
+        }
+        if (change.op === 'listed') {
+            if (!lobbyRooms.has(change.room.room_code)) lobbyTotal++;
+            lobbyRooms.set(change.room.room_code, change.room);
+        } else if (change.op === 'unlisted' && lobbyRooms.delete(change.room_code)) {
+            lobbyTotal--;
+        }
+        lobbyVersion = change.v;
+    }
+    updateLobby(lobbyRooms.size < lobbyTotal);
+});
+
+socket.on('room_closed', function(data) {
+    if (data.room_code !== currentRoomCode) return;
+    const reasons = {ttl: 'por inactividad', cap: 'porque el servidor está lleno', empty: 'porque se quedó vacía'};
+    const reason = reasons[data.reason] || '';
+    alert(`La sala ${data.room_code} se cerró ${reason}`);
+    addMessage(`Sala ${data.room_code} cerrada ${reason}`);
+    currentRoomCode = '';
+    isHost = false;
+    isSpectator = false;
+    showStartScreen();
+});
+
+// Espectador: ve la partida sin jugar y con retraso
+socket.on('spectating', function(data) {
+    isSpectator = true;
+    currentRoomCode = data.room_code;
+    roomVersion = data.version;
+    roomPlayers = data.players;
+    showGameScreen();
+    document.getElementById('game-title').textContent = `👁️ Sala ${data.room_code}`;
+    document.getElementById('your-role').textContent = '👁️ Espectador';
+    document.getElementById('role-description').textContent = `Ves la partida con ${data.delay} s de retraso`;
+    addNightMessage(`Jugadores: ${data.players.map(p => p.username).join(', ')}`);
+});
+
+socket.on('spectator_roles', function(data) {
+    data.roles.forEach(r => addNightMessage(`🃏 ${r.username}: ${r.role}`));
+    addNightMessage(`🃏 Centro: ${data.center.join(', ')}`);
+});
+
+socket.on('spectator_action', function(data) {
+    const {success, ...result} = data.result;
+    addNightMessage(`🎬 ${data.username} (${data.action_type}): ${JSON.stringify(result)}`);
+});
+
+socket.on('error', function(data) {
+    alert('Error: ' + data.msg);
+    addMessage('Error: ' + data.msg);
+});
+
+socket.on('game_starting', function(data) {
+    addMessage('🎮 ' + data.msg);
+    alert('¡El juego está comenzando!');
+});
+
+socket.on('game_started', function(data) {
+    addMessage('🌙 ' + data.msg);
+    gameState = 'preparation'; // Cambiar a preparación primero
+    showGameScreen();
+    addNightMessage('El juego ha comenzado. Es de noche...');
+    // NO mostrar rol aún
+});
+
+// Tu rol asignado (ahora llega después de 5 segundos)
+socket.on('your_role', function(data) {
+    currentRole = data.role;
+    document.getElementById('your-role').textContent = data.role_name;
+    document.getElementById('role-description').textContent = data.description;
+    addNightMessage(`Tu rol es: ${data.role_name}`);
+    gameState = 'night'; // Ahora sí cambiar a noche
+});
+
+// Mensajes del narrador
+socket.on('narrator_message', function(data) {
+    addNightMessage(`🎭 NARRADOR: ${data.message}`);
+    if (data.phase === 'eyes_closed') {
+        document.getElementById('current-phase-description').textContent = 'Todos cierran los ojos...';
+    }
+});
+
+// Información automática para lobos (evento separado para múltiples lobos)
+socket.on('werewolf_multiple_info', function(data) {
+    console.log('DEBUG: Recibido werewolf_multiple_info:', data);
+    addNightMessage(`👁️ ${data.message}`);
+    addNightMessage('Como hay múltiples lobos, no puedes ver cartas del centro.');
+});
+
+// Es tu turno de actuar
+socket.on('your_turn', function(data) {
+    console.log('DEBUG: Recibido your_turn:', data);
+
+    if (data.can_act) {
+        // Si tiene información de lobo, mostrarla primero
+        if (data.werewolf_info) {
+            addNightMessage(`👁️ ${data.werewolf_info.message}`);
+        }
+
+        if (data.action_type === 'choose_center_card') {
+            // Solo para lobos solitarios: mostrar botones del centro
+            showCenterCardButtons();
+            addNightMessage(`🃏 Elige una carta del centro para ver:`);
+        } else if (data.phase !== 'werewolf') {
+            // Para otros roles (NO lobos)
+            showActionButtons(data);
+            addNightMessage(`¡Es tu turno! Puedes actuar como ${data.role_name}`);
+            if (data.message) {
+                addNightMessage(`🎯 ${data.message}`);
+            }
+        }
+        // Para lobos normales (múltiples), NO hacer nada porque es automático
+    }
+});
+
+// Información específica de la fase de lobos
+socket.on('werewolf_phase_info', function(data) {
+    console.log('DEBUG: Recibido werewolf_phase_info:', data);
+
+    if (data.is_lone_wolf) {
+        addNightMessage('👁️ Eres el único lobo. Puedes elegir UNA carta del centro para ver.');
+        showCenterCardButtons();
+        addNightMessage('🃏 Elige una carta del centro para ver:');
+    } else {
+        const otherWolves = data.other_werewolves.map(w => w.username).join(', ');
+        addNightMessage(`👁️ Otros lobos: ${otherWolves}`);
+        addNightMessage('Como hay múltiples lobos, no puedes ver cartas del centro.');
+    }
+});
+
+socket.on('night_phase_started', function(data) {
+    document.getElementById('game-title').textContent = `🌙 Noche - Fase: ${data.role_name}`;
+    document.getElementById('current-phase-description').textContent = 
+        `${data.role_name}: ${data.description}`;
+    addNightMessage(`--- Fase: ${data.role_name} ---`);
+});
+
+socket.on('phase_completed', function(data) {
+    addNightMessage(`Fase ${data.phase} completada.`);
+    hideActionButtons();
+});
+
+socket.on('phase_timeout', function(data) {
+    addNightMessage(`⏰ ${data.msg}`);
+    hideActionButtons();
+});
+
+socket.on('night_ended', function(data) {
+    gameState = 'discussion';
+    document.getElementById('game-title').textContent = '☀️ Día - Discusión';
+    document.getElementById('current-phase-description').textContent = 
+        'Es hora de discutir quién podría ser un lobo...';
+    addNightMessage('--- LA NOCHE HA TERMINADO ---');
+    hideActionButtons();
+});
+
+socket.on('action_result', function(data) {
+    if (data.success) {
+        if (data.center_card) {
+            addNightMessage(`🃏 Carta del centro ${data.center_card.index + 1}: ${data.center_card.role}`);
+            hideActionButtons(); // Ocultar después de ver carta del centro
+        }
+        if (data.seen) {
+            data.seen.forEach(card => {
+                const where = card.username ? card.username : `carta del centro ${card.index + 1}`;
+                addNightMessage(`👁️ ${where}: ${card.role}`);
+            });
+        }
+        if (data.new_role) {
+            addNightMessage(`🔄 Robaste la carta de ${data.target}. Ahora eres: ${data.new_role}`);
+        }
+        if (data.targets) {
+            addNightMessage(`🔀 Intercambiaste las cartas de ${data.targets.join(' y ')}`);
+        }
+        if (data.center_index !== undefined) {
+            addNightMessage(`🍺 Cambiaste tu carta por la carta del centro ${data.center_index + 1}`);
+        }
+        if (data.final_role) {
+            addNightMessage(`🌅 Tu carta ahora es: ${data.final_role}`);
+        }
+        if (!data.center_card && !data.is_lone_wolf) {
+            hideActionButtons();
+        }
+    } else if (data.error) {
+        addNightMessage(`❌ Error: ${data.error}`);
+    }
+});
+
+// Funciones principales
+function createRoom() {
+    const username = document.getElementById('username').value.trim();
+
+    if (!username) {
+        alert('Por favor ingresa un nombre');
+        return;
+    }
+
+    if (username.length > 20) {
+        alert('El nombre debe tener máximo 20 caracteres');
+        return;
+    }
+
+    socket.emit('create_room', {
+        username: username
+    });
+}
+
+function joinRoom() {
+    const username = document.getElementById('username').value.trim();
+    const roomCode = document.getElementById('room-code').value.trim().toUpperCase();
+
+    if (!username) {
+        alert('Por favor ingresa un nombre');
+        return;
+    }
+
+    if (!roomCode || roomCode.length !== 4) {
+        alert('Por favor ingresa un código de sala de 4 letras');
+        return;
+    }
+
+    socket.emit('join_room', {
+        username: username,
+        room_code: roomCode,
+        rejoin_token: rejoinToken(roomCode)
+    });
+}
+
+// Token de asiento por sala: sin él el servidor no devuelve el asiento tras una desconexión
+function saveRejoinToken(roomCode, token) {
+    if (token) sessionStorage.setItem('werewolf_rejoin_' + roomCode, token);
+}
+
+function rejoinToken(roomCode) {
+    return sessionStorage.getItem('werewolf_rejoin_' + roomCode);
+}
+
+function requestLobby() {
+    socket.emit('list_rooms', {limit: LOBBY_PAGE_SIZE, subscribe: true});
+}
+
+function loadMoreRooms() {
+    socket.emit('list_rooms', {offset: lobbyRooms.size, limit: LOBBY_PAGE_SIZE});
+}
+
+function joinListedRoom(roomCode) {
+    document.getElementById('room-code').value = roomCode;
+    joinRoom();
+}
+
+function spectateRoom(roomCode = null) {
+    roomCode = roomCode || document.getElementById('room-code').value.trim().toUpperCase();
+    if (!roomCode || roomCode.length !== 4) {
+        alert('Por favor ingresa un código de sala de 4 letras');
+        return;
+    }
+    socket.emit('spectate', {room_code: roomCode});
+}
+
+function startGame() {
+    if (!isHost) {
+        alert('Solo el host puede iniciar el juego');
+        return;
+    }
+
+    socket.emit('start_game');
+}
+
+function leaveRoom() {
+    location.reload();
+}
+
+// Funciones de interfaz
+function showStartScreen() {
+    startScreen.style.display = 'block';
+    roomScreen.style.display = 'none';
+    gameScreen.style.display = 'none';
+}
+
+function showRoomScreen() {
+    startScreen.style.display = 'none';
+    roomScreen.style.display = 'block';
+    gameScreen.style.display = 'none';
+
+    document.getElementById('room-title').textContent = `Sala: ${currentRoomCode}`;
+    document.getElementById('room-code-display').textContent = currentRoomCode;
+    document.getElementById('your-username').textContent = currentUsername;
+
+    const startBtn = document.getElementById('start-game-btn');
+    startBtn.style.display = isHost ? 'block' : 'none';
+}
+
+function showGameScreen() {
+    startScreen.style.display = 'none';
+    roomScreen.style.display = 'none';
+    gameScreen.style.display = 'block';
+}
+
+function applyRoomChange(change) {
+    if (change.op === 'player_added') {
+        roomPlayers.push(change.player);
+    } else if (change.op === 'player_removed') {
+        roomPlayers = roomPlayers.filter(p => p.username !== change.username);
+    } else if (change.op === 'host_changed') {
+        roomPlayers.forEach(p => { p.is_host = p.username === change.username; });
+        if (change.username === currentUsername) {
+            isHost = true;
+            document.getElementById('start-game-btn').style.display = 'block';
+            addMessage('Ahora eres el host de la sala');
+        }
+    }
+}
+
+function updateRoomPlayers(players) {
+    const playersDiv = document.getElementById('room-players');
+
+    if (players.length === 0) {
+        playersDiv.textContent = 'No hay jugadores';
+        return;
+    }
+
+    playersDiv.innerHTML = '';
+    players.forEach(player => {
+        const playerElement = document.createElement('div');
+        const hostLabel = player.is_host ? ' 👑 (Host)' : '';
+        playerElement.textContent = `👤 ${player.username}${hostLabel}`;
+        playersDiv.appendChild(playerElement);
+    });
+}
+
+function updateLobby(hasMore) {
+    const lobbyDiv = document.getElementById('lobby-rooms');
+    document.getElementById('lobby-total').textContent = lobbyTotal;
+    document.getElementById('lobby-more-btn').style.display = hasMore ? 'inline-block' : 'none';
+
+    if (lobbyRooms.size === 0) {
+        lobbyDiv.textContent = 'No hay salas abiertas';
+        return;
+    }
+
+    // Como en el servidor: primero las salas más llenas
+    const listed = [...lobbyRooms.values()].sort((a, b) => a.free - b.free);
+    lobbyDiv.innerHTML = '';
+    listed.forEach(room => {
+        const roomElement = document.createElement('div');
+        roomElement.textContent = `🏠 ${room.room_code} · ${room.host} · ${room.players} jugadores (${room.free} libres) `;
+        const joinButton = document.createElement('button');
+        joinButton.textContent = 'Unirse';
+        joinButton.onclick = () => joinListedRoom(room.room_code);
+        roomElement.appendChild(joinButton);
+        const spectateButton = document.createElement('button');
+        spectateButton.textContent = '👁️ Ver';
+        spectateButton.onclick = () => spectateRoom(room.room_code);
+        roomElement.appendChild(spectateButton);
+        lobbyDiv.appendChild(roomElement);
+    });
+}
+
+function addNightMessage(message) {
+    const messagesDiv = document.getElementById('night-messages');
+    const messageElement = document.createElement('p');
+    messageElement.textContent = `${new Date().toLocaleTimeString()}: ${message}`;
+    messagesDiv.appendChild(messageElement);
+    messagesDiv.scrollTop = messagesDiv.scrollHeight;
+}
+
+function showActionButtons(turn) {
+    const actionDiv = document.getElementById('action-buttons');
+    actionDiv.innerHTML = '';
+    actionDiv.style.display = 'block';
+    const targets = turn.targets || [];
+    const centerCount = turn.center_count || 0;
+
+    function addButton(text, onclick) {
+        const button = document.createElement('button');
+        button.textContent = text;
+        button.onclick = onclick;
+        actionDiv.appendChild(button);
+        return button;
+    }
+
+    // Botones según el rol (los lobos tienen manejo especial)
+    if (turn.phase === 'seer') {
+        targets.forEach(name => addButton(`👁️ Ver carta de ${name}`,
+            () => performRoleAction('seer', {target: name})));
+        for (let i = 0; i < centerCount; i++) {
+            for (let j = i + 1; j < centerCount; j++) {
+                addButton(`🃏 Ver centro ${i + 1} y ${j + 1}`,
+                    () => performRoleAction('seer', {center_indices: [i, j]}));
+            }
+        }
+    } else if (turn.phase === 'robber') {
+        targets.forEach(name => addButton(`🔄 Robar a ${name}`,
+            () => performRoleAction('robber', {target: name})));
+    } else if (turn.phase === 'troublemaker') {
+        // Elegir dos jugadores; al marcar el segundo se envía la acción
+        const chosen = [];
+        targets.forEach(name => {
+            const button = addButton(`🔀 ${name}`, () => {
+                if (chosen.includes(name)) {
+                    return;
+                }
+                chosen.push(name);
+                button.disabled = true;
+                if (chosen.length === 2) {
+                    performRoleAction('troublemaker', {targets: chosen});
+                }
+            });
+        });
+    } else if (turn.phase === 'drunk') {
+        for (let i = 0; i < centerCount; i++) {
+            addButton(`🍺 Tomar carta centro ${i + 1}`,
+                () => performRoleAction('drunk', {center_index: i}));
+        }
+    } else if (turn.phase !== 'werewolf') {
+        addButton(`🎯 Realizar acción de ${turn.role_name}`, () => performRoleAction(turn.phase));
+    }
+}
+
+function showCenterCardButtons() {
+    const actionDiv = document.getElementById('action-buttons');
+    actionDiv.innerHTML = '';
+    actionDiv.style.display = 'block';
+
+    // Botones para elegir carta del centro (solo para lobo solitario)
+    const centerBtn1 = document.createElement('button');
+    centerBtn1.textContent = '🃏 Ver carta centro 1';
+    centerBtn1.onclick = () => performWerewolfAction(0);
+    actionDiv.appendChild(centerBtn1);
+
+    const centerBtn2 = document.createElement('button');
+    centerBtn2.textContent = '🃏 Ver carta centro 2';
+    centerBtn2.onclick = () => performWerewolfAction(1);
+    actionDiv.appendChild(centerBtn2);
+
+    const centerBtn3 = document.createElement('button');
+    centerBtn3.textContent = '🃏 Ver carta centro 3';
+    centerBtn3.onclick = () => performWerewolfAction(2);
+    actionDiv.appendChild(centerBtn3);
+}
+
+function performRoleAction(phase, targets = {}) {
+    socket.emit('night_action', {
+        action_type: phase,
+        ...targets
+    });
+}
+
+function hideActionButtons() {
+    const actionDiv = document.getElementById('action-buttons');
+    actionDiv.style.display = 'none';
+    actionDiv.innerHTML = '';
+}
+
+function performWerewolfAction(centerIndex = null) {
+    // Solo permitir si se especifica un índice del centro
+    if (centerIndex === null) {
+        addNightMessage('❌ Los lobos se ven automáticamente. No necesitas hacer nada más.');
+        return;
+    }
+
+    const actionData = {
+        action_type: 'werewolf',
+        center_index: centerIndex
+    };
+
+    socket.emit('night_action', actionData);
+}
+
+function updateConnectionStatus(status) {
+    document.getElementById('connection-status').textContent = `Estado: ${status}`;
+}
+
+function addMessage(message) {
+    const messagesDiv = document.getElementById('messages');
+    const messageElement = document.createElement('div');
+    messageElement.textContent = `${new Date().toLocaleTimeString()}: ${message}`;
+    messagesDiv.appendChild(messageElement);
+    messagesDiv.scrollTop = messagesDiv.scrollHeight;
+}
+
+// Event listeners
+document.getElementById('username').addEventListener('keypress', function(e) {
+    if (e.key === 'Enter') {
+        createRoom();
+    }
+});
+
+document.addEventListener('DOMContentLoaded', function() {
+    const roomCodeInput = document.getElementById('room-code');
+    if (roomCodeInput) {
+        roomCodeInput.addEventListener('keypress', function(e) {
+            if (e.key === 'Enter') {
+                joinRoom();
+            }
+        });
+
+        roomCodeInput.addEventListener('input', function(e) {
+            e.target.value = e.target.value.toUpperCase();
+        });
+    }
+});
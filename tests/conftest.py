@@ -0,0 +1,5 @@
+import os
+import sys
+
+# Los módulos del juego están en la raíz del repo (igual que en benchmarks/)
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
@@ -0,0 +1,49 @@
+"""Actores de sala: un mensaje a la vez por sala, también mientras se podan."""
+import threading
+
+import pytest
+
+from actors import ActorRegistry, ActorRetired, RoomActor
+
+
+def test_retired_actor_rejects_messages_and_registry_uses_a_fresh_one():
+    registry = ActorRegistry()
+    stale = registry.actor('ABCD')  # obtenido justo antes de la poda
+    assert registry.prune(lambda key: False) == 1
+    with pytest.raises(ActorRetired):
+        stale.ask(len, 'x')
+    with pytest.raises(ActorRetired):
+        stale.tell(len, 'x')
+
+    assert registry.ask('ABCD', len, 'abc') == 3
+    fresh = registry.actor('ABCD')
+    assert fresh is not stale and fresh.processed == 1
+
+
+def test_prune_keeps_actors_with_a_turn_or_queued_messages():
+    registry = ActorRegistry()
+    inside, release = threading.Event(), threading.Event()
+    ran = []
+
+    def busy():
+        inside.set()
+        release.wait(5)
+
+    worker = threading.Thread(target=registry.ask, args=('BUSY', busy))
+    worker.start()
+    inside.wait(5)
+    registry.tell('BUSY', ran.append, 'queued')
+    registry.actor('IDLE')
+
+    assert registry.prune(lambda key: False) == 1
+    assert len(registry) == 1 and registry.backlog() == 1
+    release.set()
+    worker.join(5)
+    assert ran == ['queued']
+    assert registry.prune(lambda key: False) == 1 and len(registry) == 0
+
+
+def test_ask_is_reentrant_for_the_thread_with_the_turn():
+    actor = RoomActor('ABCD')
+    assert actor.ask(lambda: actor.ask(lambda: 'inner')) == 'inner'
+    assert actor.idle() and actor.processed == 2
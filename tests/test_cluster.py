@@ -0,0 +1,68 @@
+"""Modo multi-proceso: reparto de salas, bus y emits que no pertenecen a este worker."""
+import pytest
+
+from cluster import BusManager, HashRing, LocalBus, MessageBus
+from outbox import Outbox
+
+
+class FakeManager:
+    def __init__(self, rooms):
+        self.rooms = rooms  # sala: [sid]
+
+    def get_participants(self, namespace, room):
+        return [(sid, None) for sid in self.rooms.get(room, [])]
+
+
+class FakeSocketIO:
+    """Lo que el outbox usa de flask_socketio.SocketIO: emit y server.manager"""
+
+    def __init__(self, rooms):
+        self.sent = []
+        self.server = type('Server', (), {'manager': FakeManager(rooms)})()
+
+    def emit(self, event, data, **kwargs):
+        self.sent.append((event, data, kwargs.get('to')))
+
+
+def test_message_bus_is_abstract():
+    with pytest.raises(TypeError):
+        MessageBus()
+
+    class HalfBus(MessageBus):
+        def publish(self, channel, message):
+            pass
+
+    with pytest.raises(TypeError):
+        HalfBus()
+
+
+def test_hash_ring_is_stable_and_uses_every_worker():
+    ring = HashRing(range(3))
+    codes = [f'A{i:03d}' for i in range(300)]
+    assert [ring.node_for(code) for code in codes] == [HashRing(range(3)).node_for(code) for code in codes]
+    assert {ring.node_for(code) for code in codes} == {0, 1, 2}
+
+
+def test_bus_manager_is_local():
+    manager = BusManager(LocalBus(), is_local_room=lambda room: room == 'ABCD')
+    assert manager.is_local('ABCD')
+    assert not manager.is_local('WXYZ')
+    assert not manager.is_local(['ABCD', 'WXYZ'])
+
+
+def test_outbox_sends_remote_targets_straight_through():
+    socketio = FakeSocketIO({'ABCD': ['s1', 's2'], 'WXYZ': []})
+    outbox = Outbox()
+    outbox.install(socketio)
+    outbox.is_local = lambda room, namespace: room == 'ABCD'
+
+    @outbox.batched
+    def handler():
+        socketio.emit('one', {'n': 1}, to='ABCD')
+        socketio.emit('remote', {'n': 2}, to='WXYZ')  # sockets en otro worker
+        socketio.emit('two', {'n': 3}, to='ABCD')
+
+    handler()
+    # Lo encolado sale antes del emit directo para no desordenar los mensajes
+    assert socketio.sent == [('one', {'n': 1}, ['s1', 's2']), ('remote', {'n': 2}, 'WXYZ'),
+                             ('two', {'n': 3}, ['s1', 's2'])]
@@ -0,0 +1,111 @@
+"""Resolución de la noche: orden de las acciones e intercambios al amanecer."""
+import game_logic
+from game_logic import ROLE_NAMES, execute_night_action
+from models import Player, Role
+
+ROLES = {
+    'ana': Role.SEER,
+    'bea': Role.ROBBER,
+    'carla': Role.TROUBLEMAKER,
+    'dani': Role.DRUNK,
+    'eva': Role.INSOMNIAC,
+    'fede': Role.WEREWOLF,
+}
+
+
+def make_game():
+    """Partida con un jugador por rol; centro [aldeano, aldeano, alborotadora]"""
+    players = [Player(socket_id=f'sid-{name}', username=name, original_role=role, current_role=role)
+               for name, role in ROLES.items()]
+    game = game_logic.TestGameLogic(players, 'TEST001')
+    game.setup_test_game()
+    return game, {p.username: p for p in players}
+
+
+def act(game, player, data):
+    """Abre la fase del rol del jugador y ejecuta su acción"""
+    game.start_night_phase(player.original_role)
+    result = execute_night_action(game, player.socket_id, player.original_role, data)
+    assert result['success'], result
+    return result
+
+
+def current_roles(game):
+    return {p.username: p.current_role for p in game.players}
+
+
+def test_night_actions_see_cards_in_phase_order():
+    game, by_name = make_game()
+    assert game.phase_order == [Role.WEREWOLF, Role.SEER, Role.ROBBER, Role.TROUBLEMAKER,
+                                Role.DRUNK, Role.INSOMNIAC]
+
+    # La pitonisa mira antes de cualquier intercambio
+    seen = act(game, by_name['ana'], {'target': 'bea'})['seen']
+    assert seen == [{'username': 'bea', 'role': ROLE_NAMES[Role.ROBBER]}]
+
+    # El ladrón ve la carta que le va a quedar, aunque nada se aplica aún
+    robbed = act(game, by_name['bea'], {'target': 'fede'})
+    assert robbed['new_role'] == ROLE_NAMES[Role.WEREWOLF]
+    act(game, by_name['carla'], {'targets': ['bea', 'eva']})
+    act(game, by_name['dani'], {'center_index': 0})
+    assert current_roles(game) == ROLES
+    assert game.center_cards == [Role.VILLAGER, Role.VILLAGER, Role.TROUBLEMAKER]
+
+    # La insomne ve su carta tras todos los intercambios anteriores
+    final = act(game, by_name['eva'], {})
+    assert final['final_role'] == ROLE_NAMES[Role.WEREWOLF]
+
+    assert game.resolve_night() == 3
+    assert current_roles(game) == {
+        'ana': Role.SEER,
+        'bea': Role.INSOMNIAC,
+        'carla': Role.TROUBLEMAKER,
+        'dani': Role.VILLAGER,
+        'eva': Role.WEREWOLF,
+        'fede': Role.ROBBER,
+    }
+    assert game.center_cards == [Role.DRUNK, Role.VILLAGER, Role.TROUBLEMAKER]
+    # Los índices por rol siguen a las cartas
+    assert game.get_players_with_role(Role.WEREWOLF) == [by_name['eva']]
+    assert game.get_players_with_role(Role.ROBBER) == [by_name['fede']]
+    assert game.night_intents == []
+
+
+def test_resolve_night_applies_swaps_in_phase_order_not_arrival_order():
+    game, by_name = make_game()
+    # Registrados al revés: alborotadora antes que ladrón
+    game.record_swap(Role.TROUBLEMAKER, by_name['bea'], by_name['eva'])
+    game.record_swap(Role.ROBBER, by_name['bea'], by_name['fede'])
+
+    assert game.projected_cards()[by_name['eva']] == Role.WEREWOLF
+    assert game.resolve_night() == 2
+    roles = current_roles(game)
+    assert (roles['bea'], roles['eva'], roles['fede']) == (Role.INSOMNIAC, Role.WEREWOLF, Role.ROBBER)
+
+
+def test_resolve_night_without_swaps_changes_nothing():
+    game, _ = make_game()
+    assert game.resolve_night() == 0
+    assert current_roles(game) == ROLES
+
+
+class FixedDeck:
+    """Deja el mazo en el orden dado: sin pitonisa ni borracho repartidos"""
+
+    def __init__(self, cards):
+        self.cards = cards
+
+    def shuffle(self, cards):
+        cards[:] = self.cards
+
+
+def test_announced_phase_order_does_not_reveal_center_cards():
+    deck = [Role.WEREWOLF, Role.ROBBER, Role.TROUBLEMAKER, Role.WEREWOLF,
+            Role.VILLAGER, Role.SEER, Role.DRUNK, Role.VILLAGER]
+    for fake_phases in (False, True):
+        players = [Player(socket_id=f'sid-{i}', username=f'p{i}') for i in range(5)]
+        game = game_logic.GameLogic(players, 'ABCD')
+        announced = game.setup_game(fake_phases=fake_phases, rng=FixedDeck(list(deck)))['phase_order']
+        assert announced == [Role.WEREWOLF, Role.SEER, Role.ROBBER, Role.TROUBLEMAKER, Role.DRUNK]
+        assert game.center_cards == [Role.SEER, Role.DRUNK, Role.VILLAGER]
+        assert game.fake_phases == ({Role.SEER, Role.DRUNK} if fake_phases else set())
@@ -0,0 +1,58 @@
+"""Listado del lobby: qué salas aparecen, en qué orden y qué cambios se publican."""
+from lobby import LobbyIndex
+from models import Player, Room
+
+
+def make_room(code, players, **fields):
+    people = [Player(socket_id=f'{code}-{i}', username=f'{code.lower()}{i}') for i in range(players)]
+    return Room(code=code, host_id=people[0].socket_id, players=people, **fields)
+
+
+def test_lists_open_rooms_fullest_first_in_arrival_order():
+    lobby = LobbyIndex(max_players=4)
+    rooms = [make_room('AAAA', 1), make_room('BBBB', 3), make_room('CCCC', 1), make_room('DDDD', 2)]
+    for room in rooms:
+        lobby.update(room)
+    lobby.update(make_room('FULL', 4))
+    lobby.update(make_room('PLAY', 2, game_state='night'))
+    lobby.update(make_room('TEST', 2, is_test_room=True))
+
+    page = lobby.page()
+    assert [entry['room_code'] for entry in page['rooms']] == ['BBBB', 'DDDD', 'AAAA', 'CCCC']
+    assert page['rooms'][0] == {'room_code': 'BBBB', 'host': 'bbbb0', 'players': 3, 'free': 1}
+    assert [entry['room_code'] for entry in lobby.page(min_free=2)['rooms']] == ['DDDD', 'AAAA', 'CCCC']
+    assert len(lobby) == 4
+
+
+def test_pages_and_cache_until_next_change():
+    lobby = LobbyIndex(max_players=4)
+    for i in range(5):
+        lobby.update(make_room(f'R{i:03d}', 1))
+    first = lobby.page(limit=2)
+    assert (first['total'], first['next_offset']) == (5, 2)
+    assert lobby.page(limit=2) is first
+    last = lobby.page(offset=4, limit=2)
+    assert [entry['room_code'] for entry in last['rooms']] == ['R004'] and last['next_offset'] is None
+
+    lobby.discard('R000')
+    page = lobby.page(limit=2)
+    assert page is not first and page['version'] == first['version'] + 1
+    assert [entry['room_code'] for entry in page['rooms']] == ['R001', 'R002']
+
+
+def test_changes_are_versioned_and_only_real_changes_count():
+    lobby = LobbyIndex(max_players=4)
+    room = make_room('AAAA', 1)
+    assert lobby.update(room) is True  # primer cambio pendiente: hay que programar el envío
+    assert lobby.update(room) is False  # sin cambios
+    room.players.append(Player(socket_id='x', username='x'))
+    assert lobby.update(room) is False  # ya había uno pendiente
+    room.game_state = 'preparation'
+    lobby.update(room)
+    assert lobby.discard('AAAA') is False  # ya no estaba listada
+
+    changes = lobby.take_changes()
+    assert [(change['v'], change['op']) for change in changes] == [(1, 'listed'), (2, 'listed'), (3, 'unlisted')]
+    assert changes[1]['room']['free'] == 2
+    assert lobby.take_changes() == []
+    assert len(lobby) == 0
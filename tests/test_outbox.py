@@ -0,0 +1,90 @@
+"""Outbox: los emits de un handler salen en una escritura por destinatario."""
+from flask import Flask
+from flask_socketio import SocketIO, emit, join_room
+
+from metrics import Metrics
+from outbox import Outbox
+
+
+def make_server():
+    app = Flask(__name__)
+    socketio = SocketIO(app, async_mode='threading')
+    outbox = Outbox(Metrics())
+    outbox.install(socketio)
+
+    @socketio.on('join')
+    @outbox.batched
+    def on_join(room):
+        join_room(room)
+
+    @socketio.on('play')
+    @outbox.batched
+    def on_play(room):
+        socketio.emit('to_room', {'n': 1}, to=room)
+        emit('to_me', {'n': 2})
+        emit('to_others', {'n': 3}, to=room, include_self=False)
+        socketio.emit('to_room', {'n': 4}, to=room)
+
+    @socketio.on('nested')
+    @outbox.batched
+    def on_nested(room):
+        emit('outer', {}, to=room)
+        on_inner(room)
+
+    @outbox.batched
+    def on_inner(room):
+        emit('inner', {}, to=room)
+
+    return app, socketio, outbox
+
+
+def received(client):
+    return [(message['name'], message['args'][0]) for message in client.get_received()]
+
+
+def test_emits_are_grouped_per_recipient_in_order():
+    app, socketio, outbox = make_server()
+    me, other = socketio.test_client(app), socketio.test_client(app)
+    for client in (me, other):
+        client.emit('join', 'ROOM')
+        received(client)
+
+    me.emit('play', 'ROOM')
+    assert received(me) == [('batch', {'events': [['to_room', {'n': 1}], ['to_me', {'n': 2}],
+                                                  ['to_room', {'n': 4}]]})]
+    assert received(other) == [('batch', {'events': [['to_room', {'n': 1}], ['to_others', {'n': 3}],
+                                                     ['to_room', {'n': 4}]]})]
+    text = outbox.metrics.render()
+    assert 'werewolf_outbox_messages_total 4' in text and 'werewolf_outbox_writes_total 2' in text
+
+
+def test_single_message_keeps_its_event_and_nested_blocks_flush_once():
+    app, socketio, outbox = make_server()
+    me, other = socketio.test_client(app), socketio.test_client(app)
+    me.emit('join', 'ROOM')
+    received(me)
+
+    other.emit('nested', 'ROOM')  # other no está en la sala
+    assert received(other) == []
+    assert received(me) == [('batch', {'events': [['outer', {}], ['inner', {}]]})]
+
+    outbox.enabled = False
+    other.emit('nested', 'ROOM')
+    assert received(me) == [('outer', {}), ('inner', {})]
+
+
+def test_binary_clients_and_admit_filter():
+    app, socketio, outbox = make_server()
+    me, other = socketio.test_client(app), socketio.test_client(app)
+    for client in (me, other):
+        client.emit('join', 'ROOM')
+        received(client)
+    me_sid, other_sid = (sid for sid, _ in socketio.server.manager.get_participants('/', 'ROOM'))
+
+    outbox.encode = lambda event, data: event.encode()
+    outbox.binary_sids.add(other_sid)
+    outbox.admit = lambda sids: [sid for sid in sids if sid != me_sid]
+    socketio.emit('plain', {'n': 7}, to='ROOM')  # fuera de un handler: directo
+    me.emit('play', 'ROOM')
+    assert received(me) == [('plain', {'n': 7})]
+    assert received(other) == [('plain', {'n': 7}), ('wire', b'batch')]
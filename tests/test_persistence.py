@@ -0,0 +1,78 @@
+"""Diario de salas: una partida a medias sale del disco igual que entró."""
+from game_logic import GameLogic
+from models import Player, Role, Room
+from persistence import RoomJournal, decode_room, encode_room
+
+DEALT = [Role.SEER, Role.ROBBER, Role.TROUBLEMAKER, Role.DRUNK, Role.WEREWOLF]
+CENTER = [Role.VILLAGER, Role.INSOMNIAC, Role.WEREWOLF]
+
+
+class FixedDeck:
+    """Generador que deja el mazo en el orden dado (reparto determinista)"""
+
+    def shuffle(self, cards):
+        cards[:] = DEALT + CENTER
+
+
+def night_in_progress(code):
+    """Sala en plena noche con intercambios pendientes para el amanecer"""
+    players = [Player(socket_id=f'sid-{i}', username=f'p{i}', is_host=i == 0) for i in range(len(DEALT))]
+    room = Room(code=code, host_id='sid-0', players=players, game_state='night', roles_assigned=True)
+    game = room.game = GameLogic(list(players), code)
+    game.setup_game(rng=FixedDeck())
+    # Ya pasaron lobo, pitonisa y ladrón; la alborotadora acaba de actuar
+    game.phase_order = [Role.DRUNK]
+    game.start_night_phase(Role.TROUBLEMAKER)
+    game.record_swap(Role.TROUBLEMAKER, players[0], players[4])
+    game.record_swap(Role.ROBBER, players[1], players[0])
+    players[1].has_acted = players[2].has_acted = True
+    return room
+
+
+def outcome(room):
+    """Cartas de cada jugador y del centro tras resolver la noche"""
+    room.game.resolve_night()
+    return [(p.username, p.current_role) for p in room.players], room.game.center_cards
+
+
+def test_encode_decode_room_mid_night():
+    room = night_in_progress('ABCD')
+    restored, timers = decode_room(encode_room(room, [('phase_timeout', 12.0, ('ABCD', 3))]))
+
+    assert [(p.socket_id, p.username, p.is_host, p.original_role, p.has_acted) for p in restored.players] == \
+        [(p.socket_id, p.username, p.is_host, p.original_role, p.has_acted) for p in room.players]
+    assert [p.rejoin_token for p in restored.players] == [p.rejoin_token for p in room.players]
+    # Jugadores de la sala y de la partida siguen siendo los mismos objetos
+    assert restored.game.players[0] is restored.players[0]
+    game = restored.game
+    assert (game.current_phase, game.phase_order, game.phase_seq) == (Role.TROUBLEMAKER, [Role.DRUNK], 1)
+    assert game.get_player_by_socket_id('sid-4').original_role == Role.WEREWOLF
+    assert [(name, round(delay), args) for name, delay, args in timers] == [('phase_timeout', 12, ('ABCD', 3))]
+    assert outcome(restored) == outcome(room)
+
+
+def test_decode_record_without_rejoin_token():
+    record = encode_room(night_in_progress('ABCD'))
+    record['people'] = [fields[:6] for fields in record['people']]  # formato anterior al token
+    restored, _ = decode_room(record)
+    tokens = [p.rejoin_token for p in restored.players]
+    assert all(tokens) and len(set(tokens)) == len(tokens)
+
+
+def test_journal_round_trip_with_deletes_and_snapshot(tmp_path):
+    rooms = {code: night_in_progress(code) for code in ('AAAA', 'BBBB', 'CCCC')}
+    journal = RoomJournal(str(tmp_path), rooms, encode_room, compact_every=2, fsync=False)
+    journal.load()
+    journal.start()
+    for code in rooms:
+        journal.touch(code)
+    journal.flush()
+    del rooms['BBBB']
+    journal.touch('BBBB')
+    journal.stop()
+    assert journal.snapshots_written == 1
+
+    records = RoomJournal(str(tmp_path), {}, encode_room).load()
+    assert sorted(records) == ['AAAA', 'CCCC']
+    restored, _ = decode_room(records['AAAA'])
+    assert outcome(restored) == outcome(rooms['AAAA'])
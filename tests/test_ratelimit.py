@@ -0,0 +1,74 @@
+"""Límites de ritmo: token buckets por socket y por IP."""
+from ratelimit import RateLimiter, TokenBucket, parse_limits
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_parse_limits():
+    assert parse_limits(' create_room=0.2:3, night_action=off,chat=5 ,') == {
+        'create_room': (0.2, 3.0), 'night_action': None, 'chat': (5.0, 5.0)}
+
+
+def test_token_bucket_refills_up_to_burst():
+    bucket = TokenBucket(2.0, 0.0)
+    assert bucket.take(1.0, 2.0, 0.0) and bucket.take(1.0, 2.0, 0.0)
+    assert not bucket.take(1.0, 2.0, 0.5)
+    assert bucket.take(1.0, 2.0, 1.0)
+    bucket.take(1.0, 2.0, 100.0)
+    assert bucket.tokens == 1.0  # nunca más de la ráfaga
+
+
+def test_socket_limit_then_refill():
+    clock = FakeClock()
+    limiter = RateLimiter({'chat': (1.0, 2.0)}, clock=clock)
+    assert [limiter.check('chat', 's1', None) for _ in range(3)] == [None, None, 'socket']
+    assert limiter.check('chat', 's2', None) is None  # cada socket tiene sus fichas
+    assert limiter.check('other', 's1', None) is None  # evento sin límite
+    clock.now = 1.0
+    assert limiter.check('chat', 's1', None) is None
+
+
+def test_ip_limit_is_shared_by_its_sockets():
+    limiter = RateLimiter({'chat': (1.0, 1.0)}, ip_factor=3, clock=FakeClock())
+    results = [limiter.check('chat', f's{i}', '10.0.0.1') for i in range(4)]
+    assert results == [None, None, None, 'ip']
+    assert limiter.check('chat', 's9', '10.0.0.2') is None
+
+
+def test_notify_once_per_run_of_rejections():
+    clock = FakeClock()
+    limiter = RateLimiter({'chat': (1.0, 1.0)}, clock=clock)
+    limiter.check('chat', 's1', None)
+    assert limiter.check('chat', 's1', None) == 'socket'
+    assert limiter.should_notify('s1') and not limiter.should_notify('s1')
+    clock.now = 1.0
+    assert limiter.check('chat', 's1', None) is None
+    assert limiter.should_notify('s1')
+
+
+def test_prune_drops_only_refilled_ips_and_runs_when_table_is_full():
+    clock = FakeClock()
+    limiter = RateLimiter({'chat': (1.0, 1.0)}, ip_factor=1, max_tracked_ips=2, clock=clock)
+    limiter.check('chat', None, '10.0.0.1')
+    clock.now = 0.5
+    limiter.check('chat', None, '10.0.0.2')
+    clock.now = 1.0
+    assert limiter.prune() == 1  # 10.0.0.2 aún no ha recuperado su ficha
+    assert limiter.tracked_ips() == 1
+    clock.now = 2.0
+    limiter.check('chat', None, '10.0.0.3')
+    limiter.check('chat', None, '10.0.0.4')  # tabla llena: se podan las rellenadas antes de añadir
+    assert limiter.tracked_ips() == 2
+
+
+def test_forget_drops_socket_buckets():
+    limiter = RateLimiter({'chat': (1.0, 1.0)}, clock=FakeClock())
+    limiter.check('chat', 's1', None)
+    limiter.forget('s1')
+    assert limiter.check('chat', 's1', None) is None
@@ -0,0 +1,69 @@
+"""Recuperar el asiento en plena partida exige el token de ese asiento."""
+import os
+import time
+
+os.environ.setdefault('WEREWOLF_LOG_LEVEL', 'WARNING')
+
+import app as server  # noqa: E402
+
+
+def received(client):
+    """Eventos recibidos por un cliente de prueba, con los 'batch' desplegados"""
+    events = []
+    for message in client.get_received():
+        if message['name'] == 'batch':
+            events += [(event, data) for event, data in message['args'][0]['events']]
+        else:
+            events.append((message['name'], message['args'][0] if message['args'] else None))
+    return events
+
+
+def start_game():
+    """Sala de tres en plena noche; devuelve (código, clientes, tokens por nombre)"""
+    clients = [server.socketio.test_client(server.app) for _ in range(3)]
+    clients[0].emit('create_room', {'username': 'ana'})
+    created = next(data for event, data in received(clients[0]) if event == 'room_created')
+    code = created['room_code']
+    tokens = {'ana': created['rejoin_token']}
+    for name, client in zip(('bea', 'carla'), clients[1:]):
+        client.emit('join_room', {'username': name, 'room_code': code})
+        tokens[name] = next(data['rejoin_token'] for event, data in received(client) if event == 'room_joined')
+    clients[0].emit('start_game')
+    for _ in range(3):
+        server.scheduler.run_pending(now=time.monotonic() + 6)
+    return code, clients, tokens
+
+
+def test_disconnected_player_needs_token_to_take_seat_back():
+    code, clients, tokens = start_game()
+    room = server.rooms[code]
+    bea = next(p for p in room.players if p.username == 'bea')
+    role = bea.original_role
+    clients[1].disconnect()
+    assert bea in room.players
+
+    intruder = server.socketio.test_client(server.app)
+    received(intruder)
+    for attempt in ({}, {'rejoin_token': tokens['ana']}, {'rejoin_token': 'ñ' * 22}):
+        intruder.emit('join_room', {'username': 'BEA', 'room_code': code, **attempt})
+        assert [event for event, _ in received(intruder)] == ['error']
+    assert bea.socket_id not in server.players
+
+    owner = server.socketio.test_client(server.app)
+    owner.emit('join_room', {'username': 'bea', 'room_code': code, 'rejoin_token': tokens['bea']})
+    events = dict(received(owner))
+    assert events['room_joined']['rejoin_token'] == tokens['bea']
+    assert events['your_role']['role'] == role
+    assert server.players[bea.socket_id].room_code == code
+    assert room.game.get_player_by_socket_id(bea.socket_id) is bea
+
+    for client in (clients[0], clients[2], intruder, owner):
+        client.disconnect()
+    assert code not in server.rooms
+
+
+def test_each_seat_gets_its_own_token():
+    code, clients, tokens = start_game()
+    assert len(set(tokens.values())) == 3
+    for client in clients:
+        client.disconnect()
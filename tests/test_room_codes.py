@@ -0,0 +1,59 @@
+"""Reparto de códigos de sala: únicos, del worker dueño y con enfriamiento."""
+import string
+
+import pytest
+
+from room_codes import RoomCodeAllocator, RoomCodesExhausted
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_allocates_every_code_once_then_runs_out():
+    codes = RoomCodeAllocator(alphabet=string.digits, length=3, prefix='TEST', seed=1)
+    seen = [codes.allocate() for _ in range(1000)]
+    assert len(set(seen)) == 1000 and len(codes) == 1000
+    assert all(code.startswith('TEST') and code[4:].isdigit() for code in seen)
+    assert seen[:10] != sorted(seen[:10])  # no salen en orden
+    with pytest.raises(RoomCodesExhausted):
+        codes.allocate()
+
+
+def test_only_allocates_codes_this_worker_owns():
+    codes = RoomCodeAllocator(alphabet='AB', length=4, owns=lambda code: code[0] == 'A', seed=2)
+    seen = [codes.allocate() for _ in range(8)]
+    assert sorted(seen) == sorted('A' + ''.join(bits) for bits in
+                                  (a + b + c for a in 'AB' for b in 'AB' for c in 'AB'))
+    with pytest.raises(RoomCodesExhausted):
+        codes.allocate()
+
+
+def test_released_code_is_reused_only_after_cooldown():
+    clock = FakeClock()
+    codes = RoomCodeAllocator(alphabet='AB', length=2, cooldown=10.0, clock=clock, seed=3)
+    first = codes.allocate()
+    codes.release(first)
+    assert first not in codes
+    others = [codes.allocate() for _ in range(3)]
+    assert first not in others
+    with pytest.raises(RoomCodesExhausted):
+        codes.allocate()  # el único libre sigue en enfriamiento
+    clock.now = 10.0
+    assert codes.allocate() == first
+
+
+def test_reserved_code_is_never_handed_out():
+    codes = RoomCodeAllocator(alphabet='AB', length=2, seed=4)
+    codes.reserve('AB')
+    seen = {codes.allocate() for _ in range(3)}
+    assert seen == {'AA', 'BA', 'BB'}
+    # Liberar y volver a reservar (sala recuperada) no lo duplica en la lista libre
+    codes.release('AB')
+    codes.reserve('AB')
+    with pytest.raises(RoomCodesExhausted):
+        codes.allocate()
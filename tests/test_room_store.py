@@ -0,0 +1,72 @@
+"""Almacén de salas: orden LRU, TTL por estado y desalojo por capacidad."""
+import pytest
+
+from models import Room
+from room_store import RoomStore, RoomStoreFull
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def make_store(**options):
+    clock = FakeClock()
+    store = RoomStore({'waiting': 60.0, 'night': 300.0}, default_ttl=120.0, clock=clock, **options)
+    return store, clock
+
+
+def add(store, clock, code, state='waiting', at=None):
+    if at is not None:
+        clock.now = at
+    store[code] = Room(code=code, host_id='sid', game_state=state)
+
+
+def test_touch_moves_room_to_the_end():
+    store, clock = make_store()
+    for i, code in enumerate(('AAAA', 'BBBB', 'CCCC')):
+        add(store, clock, code, at=float(i))
+    clock.now = 10.0
+    store.touch('AAAA')
+    store.touch('ZZZZ')  # sala inexistente: no hace nada
+    assert list(store) == ['BBBB', 'CCCC', 'AAAA']
+    assert store.idle_for('BBBB') == 9.0 and store.idle_for('ZZZZ') is None
+
+
+def test_expired_uses_the_ttl_of_each_state():
+    store, clock = make_store()
+    add(store, clock, 'WAIT', 'waiting', at=0.0)
+    add(store, clock, 'NGHT', 'night', at=0.0)
+    add(store, clock, 'DONE', 'ended', at=0.0)
+    add(store, clock, 'NEWW', 'waiting', at=50.0)
+    assert store.expired(now=100.0) == ['WAIT']
+    assert store.expired(now=130.0) == ['WAIT', 'DONE', 'NEWW']
+    assert store.is_expired('NGHT', now=300.0) and not store.is_expired('NGHT', now=299.0)
+    assert not store.is_expired('ZZZZ', now=1000.0)
+
+
+def test_removed_rooms_forget_their_activity():
+    store, clock = make_store()
+    add(store, clock, 'AAAA')
+    add(store, clock, 'BBBB')
+    del store['AAAA']
+    assert store.pop('BBBB').code == 'BBBB'
+    assert store.pop('CCCC', None) is None
+    assert store.last_activity == {}
+    assert store.expired(now=1000.0) == []
+
+
+def test_capacity_evicts_only_rooms_idle_long_enough():
+    store, clock = make_store(max_rooms=3, min_idle=30.0)
+    add(store, clock, 'AAAA', at=0.0)
+    add(store, clock, 'BBBB', at=10.0)
+    assert store.victims_for_new_room() == []
+    add(store, clock, 'CCCC', at=20.0)
+    clock.now = 35.0
+    assert store.victims_for_new_room() == ['AAAA']
+    store.touch('AAAA')
+    with pytest.raises(RoomStoreFull):
+        store.victims_for_new_room()  # BBBB lleva 25 s, menos que min_idle
@@ -0,0 +1,91 @@
+"""Planificador de fases: orden de ejecución, cancelaciones y reprogramaciones."""
+from scheduler import PhaseScheduler
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def make_scheduler():
+    clock = FakeClock()
+    return PhaseScheduler(clock=clock, autostart=False), clock
+
+
+def test_runs_due_tasks_by_deadline_then_arrival():
+    scheduler, clock = make_scheduler()
+    ran = []
+    for name, delay in (('c', 3.0), ('a', 1.0), ('b1', 2.0), ('b2', 2.0), ('later', 9.0)):
+        scheduler.call_later('ROOM', delay, ran.append, name)
+    clock.now = 5.0
+    assert scheduler.run_pending() == 4
+    assert ran == ['a', 'b1', 'b2', 'c']
+    assert scheduler.pending() == scheduler.pending('ROOM') == 1
+
+
+def test_task_scheduled_during_a_pass_does_not_block_older_due_tasks():
+    scheduler, clock = make_scheduler()
+    ran = []
+
+    def first():
+        ran.append('first')
+        # Más nueva pero con fecha límite anterior a la de 'second'
+        scheduler.call_later('ROOM', 0.0, ran.append, 'new')
+
+    scheduler.call_later('ROOM', 1.0, first)
+    scheduler.call_later('ROOM', 5.0, ran.append, 'second')
+    assert scheduler.run_pending(now=10.0) == 2
+    assert ran == ['first', 'second']
+    assert scheduler.run_pending(now=10.0) == 1
+    assert ran == ['first', 'second', 'new']
+
+
+def test_self_rescheduling_task_runs_once_per_pass():
+    scheduler, clock = make_scheduler()
+    ticks = []
+
+    def tick():
+        ticks.append(clock.now)
+        scheduler.call_later('ROOM', 0.0, tick)
+
+    scheduler.call_later('ROOM', 0.0, tick)
+    assert scheduler.run_pending() == 1
+    assert scheduler.run_pending() == 1
+    assert len(ticks) == 2 and scheduler.pending('ROOM') == 1
+
+
+def test_task_cancelled_by_an_earlier_one_in_the_same_pass_does_not_run():
+    scheduler, clock = make_scheduler()
+    ran = []
+    victim = scheduler.call_later('B', 2.0, ran.append, 'victim')
+    scheduler.call_later('A', 1.0, lambda: ran.append(scheduler.cancel(victim)))
+    scheduler.call_later('C', 2.0, lambda: ran.append(scheduler.cancel_key('D')))
+    scheduler.call_later('D', 3.0, ran.append, 'room D')
+    clock.now = 5.0
+    assert scheduler.run_pending() == 2
+    assert ran == [True, 1]
+    assert scheduler.pending() == 0 and scheduler.stats()['rooms_with_pending'] == 0
+
+
+def test_cancelled_tasks_are_compacted_out_of_the_heap():
+    scheduler, clock = make_scheduler()
+    tasks = [scheduler.call_later(f'R{i}', 1.0, lambda: None) for i in range(200)]
+    for task in tasks[:150]:
+        scheduler.cancel(task)
+    assert scheduler.pending() == 50
+    assert len(scheduler._heap) < 200
+    clock.now = 2.0
+    assert scheduler.run_pending() == 50
+    assert scheduler.pending() == 0
+
+
+def test_failing_task_does_not_stop_the_pass():
+    scheduler, clock = make_scheduler()
+    ran = []
+    scheduler.call_later('ROOM', 1.0, lambda: 1 / 0)
+    scheduler.call_later('ROOM', 2.0, ran.append, 'ok')
+    assert scheduler.run_pending(now=3.0) == 2
+    assert ran == ['ok']
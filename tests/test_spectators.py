@@ -0,0 +1,82 @@
+"""Espectadores: retraso del feed y paso de espectador a jugador."""
+import os
+import time
+
+os.environ.setdefault('WEREWOLF_LOG_LEVEL', 'WARNING')
+
+import app as server  # noqa: E402
+from spectators import SpectatorFeed  # noqa: E402
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def received(client):
+    """Eventos recibidos por un cliente de prueba, con los 'batch' desplegados"""
+    events = []
+    for message in client.get_received():
+        if message['name'] == 'batch':
+            events += [(event, data) for event, data in message['args'][0]['events']]
+        else:
+            events.append((message['name'], message['args'][0] if message['args'] else None))
+    return events
+
+
+def run_scheduled(seconds):
+    """Ejecuta ya lo que el planificador tenga en los próximos `seconds` segundos"""
+    for _ in range(10):
+        server.scheduler.run_pending(now=time.monotonic() + seconds)
+
+
+def test_feed_holds_events_until_delay_and_groups_them():
+    clock = FakeClock()
+    feed = SpectatorFeed(delay=10.0, clock=clock)
+    assert feed.publish('ABCD', 'game_started', {'n': 1}) is True  # primer evento: hay que programar el tick
+    clock.now = 2.0
+    assert feed.publish('ABCD', 'night_phase_started', {'n': 2}) is False
+    feed.publish('WXYZ', 'game_started', {'n': 3})
+
+    assert feed.due(now=9.9) == []
+    assert feed.due(now=10.0) == [('ABCD', [('game_started', {'n': 1})])]
+    assert feed.rearm(now=10.0) == 2.0
+    assert sorted(feed.due(now=12.0)) == [('ABCD', [('night_phase_started', {'n': 2})]),
+                                          ('WXYZ', [('game_started', {'n': 3})])]
+    assert feed.pending() == 0
+    assert feed.rearm(now=12.0) is None
+    # Desarmado: el siguiente evento vuelve a pedir tick
+    assert feed.publish('ABCD', 'night_ended', {}) is True
+
+
+def test_spectator_who_joins_as_player_stops_receiving_spectator_events():
+    host, other, third, watcher = (server.socketio.test_client(server.app) for _ in range(4))
+    host.emit('create_room', {'username': 'ana'})
+    code = next(data['room_code'] for event, data in received(host) if event == 'room_created')
+    other.emit('join_room', {'username': 'bea', 'room_code': code})
+
+    watcher.emit('spectate', {'room_code': code})
+    assert any(event == 'spectating' for event, _ in received(watcher))
+    watcher_sid = next(iter(server.spectators))
+    assert server.spectator_counts[code] == 1
+
+    watcher.emit('join_room', {'username': 'eva', 'room_code': code})
+    third.emit('join_room', {'username': 'carla', 'room_code': code})
+    assert watcher_sid not in server.spectators
+    assert code not in server.spectator_counts
+    group = server.spectator_room(code)
+    assert watcher_sid not in [sid for sid, _ in server.socketio.server.manager.get_participants('/', group)]
+    received(watcher)
+
+    host.emit('start_game')
+    run_scheduled(server.SPECTATOR_DELAY + 30)
+    events = [event for event, _ in received(watcher)]
+    assert 'your_role' in events
+    assert 'spectator_roles' not in events and 'spectator_action' not in events
+    assert events.count('game_started') == 1
+
+    for client in (host, other, third, watcher):
+        client.disconnect()
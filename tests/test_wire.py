@@ -0,0 +1,63 @@
+"""Formato binario: encode/decode ida y vuelta y mismos bytes con y sin msgpack."""
+import pytest
+
+import wire
+from models import Role
+
+
+def sample_messages():
+    """Eventos reales y valores en los límites de cada cabecera de MessagePack"""
+    return [
+        ('status', {'msg': 'Conectado al servidor!'}),
+        ('your_role', {'role': Role.SEER, 'role_name': 'Pitonisa',
+                       'description': wire.text('your_role', role='Pitonisa')}),
+        ('room_delta', {'room_code': 'ABCD', 'version': 7, 'changes': [
+            {'v': 6, 'op': 'player_added', 'player': {'username': 'ana', 'is_host': False}},
+            {'v': 7, 'op': 'host_changed', 'username': 'ana'},
+        ]}),
+        ('batch', {'events': [
+            ['night_phase_started', {'phase': 'seer', 'role_name': 'Pitonisa',
+                                     'description': wire.text('phase_turn', role='Pitonisa')}],
+            ['phase_completed', {'phase': 'seer', 'msg': wire.text('phase_done', phase='seer')}],
+        ]}),
+        ('texto_desconocido', {
+            'ints': [0, 127, 128, 255, 256, 65535, 65536, 2 ** 32 - 1, 2 ** 32, 2 ** 63,
+                     -1, -32, -33, -128, -129, -32768, -32769, -2 ** 31, -2 ** 31 - 1, -2 ** 63],
+            'floats': [0.5, -1e300],
+            'flags': [True, False, None],
+            'strings': ['', 'x' * 31, 'x' * 32, 'ñ' * 200, 'y' * 70000],
+            'bytes': [b'', b'\x00' * 300, b'\x01' * 70000],
+            'big_list': list(range(20)),
+            'big_map': {f'k{i}': i for i in range(20)},
+        }),
+    ]
+
+
+@pytest.mark.parametrize('event,data', sample_messages())
+def test_encode_decode_round_trip(event, data):
+    assert wire.decode(wire.encode(event, data)) == [event, data]
+
+
+def test_templated_text_survives_round_trip():
+    decoded = wire.decode(wire.encode('your_role', {'description': wire.text('your_role', role='Ladrón')}))
+    description = decoded[1]['description']
+    assert description == 'Tu rol secreto es: Ladrón'
+    assert isinstance(description, wire.Text) and description.args == {'role': 'Ladrón'}
+
+
+def test_known_keys_and_strings_are_compacted():
+    message = ('room_updated', {'room_code': 'ABCD', 'players': []})
+    plain = b''.join(part.encode() for part in ('room_updated', 'room_code', 'ABCD', 'players'))
+    assert len(wire.encode(*message)) < len(plain)
+
+
+def test_iter_decode_reads_a_stream_of_packs():
+    values = [['a', 1], {'msg': 'hola'}, None, 'room_delta']
+    assert list(wire.iter_decode(b''.join(wire.pack(value) for value in values))) == values
+
+
+@pytest.mark.parametrize('event,data', sample_messages())
+def test_builtin_encoder_matches_msgpack(event, data):
+    msgpack = pytest.importorskip('msgpack')
+    expected = msgpack.packb(wire._compact([event, data]), use_bin_type=True)
+    assert wire.pack([event, data]) == expected
@@ -0,0 +1,348 @@
+"""Formato binario compacto para los eventos de Socket.IO (opcional, negociado).
+
+El cliente lo pide al conectar (auth: {wire: VERSION}). A partir de ahí el
+outbox le envía cada escritura como un único evento 'wire' cuyo argumento son
+los bytes MessagePack de [evento, datos], donde:
+  - las claves de dict conocidas van como enteros (KEYS),
+  - los textos conocidos (eventos, roles, frases fijas) van como ext 1 con su
+    índice en STRINGS,
+  - los textos de plantilla (text()) van como ext 2 con [plantilla, args] y el
+    cliente los compone con TEMPLATES.
+index.html recibe las tablas al renderizar la página (client_tables). Si está
+instalado el paquete msgpack se usa su packb; si no, el codificador de este
+módulo produce los mismos bytes. decode() hace el camino inverso en Python
+(lo usa recorder para leer sus registros).
+"""
+import struct
+
+from game_logic import ACTION_PROMPTS, ROLE_NAMES
+from models import Role
+
+try:
+    import msgpack
+except ImportError:  # pragma: no cover - dependencia opcional
+    msgpack = None
+
+VERSION = 1
+
+EXT_STRING = 1
+EXT_TEXT = 2
+
+# Claves de dict frecuentes en los payloads (índice = código)
+KEYS = (
+    'msg', 'message', 'room_code', 'version', 'players', 'username', 'is_host', 'socket_id',
+    'changes', 'v', 'op', 'events', 'phase', 'role', 'role_name', 'description', 'can_act',
+    'action_type', 'targets', 'center_count', 'werewolf_info', 'other_werewolves', 'is_lone_wolf',
+    'success', 'center_card', 'auto_reveal', 'index', 'seen', 'new_role', 'target',
+    'center_index', 'final_role', 'names', 'reason', 'room', 'host', 'free', 'offset', 'total',
+    'rooms', 'next_offset', 'spectate', 'delay', 'game_state', 'center', 'result',
+    'rejoin_token'
+)
+
+# Textos frecuentes: nombres de evento, roles y frases fijas de la narración
+STRINGS = tuple(dict.fromkeys((
+    'status', 'room_created', 'room_joined', 'room_updated', 'room_delta', 'room_closed',
+    'error', 'game_starting', 'game_started', 'your_role', 'narrator_message',
+    'werewolf_multiple_info', 'your_turn', 'night_phase_started', 'phase_completed',
+    'phase_timeout', 'night_ended', 'action_result', 'batch', 'host_changed',
+    'player_added', 'player_removed', 'discussion', 'eyes_closed', 'choose_center_card',
+    *(role.value for role in Role),
+    *ROLE_NAMES.values(),
+    *ACTION_PROMPTS.values(),
+    'Conectado al servidor!',
+    '🌙 ¡El juego comenzó! Es de noche...',
+    '🌙 Cerrad los ojos todos...',
+    'Eres el único lobo. Puedes elegir UNA carta del centro para ver.',
+    '☀️ ¡Amaneció! Es hora de discutir...',
+    'Se acabó el tiempo para actuar',
+    'room_list', 'lobby_delta', 'listed', 'unlisted',
+    'spectating', 'spectator_roles', 'spectator_action',
+)))
+
+# Plantillas de los textos con partes variables
+TEMPLATES = {
+    'your_role': 'Tu rol secreto es: {role}',
+    'phase_turn': 'Es el turno de {role}',
+    'other_wolf': 'El otro lobo es: {names}',
+    'other_wolves': 'Los otros lobos son: {names}',
+    'phase_done': 'Todos los {phase} terminaron. Continuando...',
+}
+
+# ext de tamaño fijo (fixext 1/2/4/8/16)
+_FIXEXT = {1: 0xd4, 2: 0xd5, 4: 0xd6, 8: 0xd7, 16: 0xd8}
+
+KEY_CODES = {key: code for code, key in enumerate(KEYS)}
+STRING_CODES = {text: code for code, text in enumerate(STRINGS)}
+TEMPLATE_CODES = {name: code for code, name in enumerate(TEMPLATES)}
+
+
+class Text(str):
+    """Texto generado con una plantilla: en JSON es el texto, en binario (plantilla, args)"""
+
+
+def text(template, **args):
+    """Compone un texto de TEMPLATES recordando la plantilla para el formato binario"""
+    value = Text(TEMPLATES[template].format(**args))
+    value.template = TEMPLATE_CODES[template]
+    value.args = args
+    return value
+
+
+def client_tables():
+    """Tablas que necesita el decodificador del cliente"""
+    return {
+        'version': VERSION,
+        'keys': KEYS,
+        'strings': STRINGS,
+        'templates': list(TEMPLATES.values()),
+    }
+
+
+def encode(event, data):
+    """Bytes del mensaje [evento, datos] en el formato binario"""
+    if msgpack is not None:
+        return msgpack.packb(_compact([event, data]), use_bin_type=True)
+    out = bytearray()
+    _pack([event, data], out)
+    return bytes(out)
+
+
+def pack(obj):
+    """Bytes de cualquier valor con la misma compactación (p. ej. los registros de recorder)"""
+    out = bytearray()
+    _pack(obj, out)
+    return bytes(out)
+
+
+def decode(data):
+    """Inverso de encode/pack: claves, textos conocidos y plantillas expandidos"""
+    return _unpack(memoryview(data), 0)[0]
+
+
+def iter_decode(data):
+    """Valores seguidos en data (un flujo de pack), uno a uno"""
+    view = memoryview(data)
+    offset = 0
+    while offset < len(view):
+        value, offset = _unpack(view, offset)
+        yield value
+
+
+def _compact(obj):
+    """Sustituye claves y textos conocidos por sus códigos (camino con msgpack)"""
+    if isinstance(obj, str):
+        if isinstance(obj, Text):
+            return msgpack.ExtType(EXT_TEXT, _text_body(obj))
+        code = STRING_CODES.get(obj)
+        if code is not None:
+            return msgpack.ExtType(EXT_STRING, _index_bytes(code))
+        return str(obj)
+    if isinstance(obj, dict):
+        return {KEY_CODES.get(key, key): _compact(value) for key, value in obj.items()}
+    if isinstance(obj, (list, tuple)):
+        return [_compact(value) for value in obj]
+    return obj
+
+
+def _text_body(value):
+    """Cuerpo del ext de un Text: [código de plantilla, args]"""
+    body = bytearray()
+    _pack([value.template, value.args], body)
+    return bytes(body)
+
+
+def _index_bytes(code):
+    return bytes((code,)) if code < 0x100 else struct.pack('>H', code)
+
+
+def _pack(obj, out):
+    """Codificador MessagePack mínimo con la misma compactación que _compact"""
+    if obj is None:
+        out.append(0xc0)
+    elif obj is True:
+        out.append(0xc3)
+    elif obj is False:
+        out.append(0xc2)
+    elif isinstance(obj, int):
+        _pack_int(obj, out)
+    elif isinstance(obj, float):
+        out.append(0xcb)
+        out += struct.pack('>d', obj)
+    elif isinstance(obj, str):
+        if isinstance(obj, Text):
+            _pack_ext(EXT_TEXT, _text_body(obj), out)
+            return
+        code = STRING_CODES.get(obj)
+        if code is not None:
+            _pack_ext(EXT_STRING, _index_bytes(code), out)
+            return
+        raw = obj.encode('utf-8')
+        size = len(raw)
+        if size < 32:
+            out.append(0xa0 | size)
+        elif size < 0x100:
+            out += bytes((0xd9, size))
+        elif size < 0x10000:
+            out.append(0xda)
+            out += struct.pack('>H', size)
+        else:
+            out.append(0xdb)
+            out += struct.pack('>I', size)
+        out += raw
+    elif isinstance(obj, dict):
+        _pack_header(len(obj), 0x80, 0xde, out)
+        for key, value in obj.items():
+            _pack(KEY_CODES.get(key, key), out)
+            _pack(value, out)
+    elif isinstance(obj, (list, tuple)):
+        _pack_header(len(obj), 0x90, 0xdc, out)
+        for value in obj:
+            _pack(value, out)
+    elif isinstance(obj, (bytes, bytearray)):
+        size = len(obj)
+        if size < 0x100:
+            out += bytes((0xc4, size))
+        elif size < 0x10000:
+            out.append(0xc5)
+            out += struct.pack('>H', size)
+        else:
+            out.append(0xc6)
+            out += struct.pack('>I', size)
+        out += obj
+    else:
+        raise TypeError(f'Tipo no serializable en el formato binario: {type(obj).__name__}')
+
+
+def _pack_int(value, out):
+    if 0 <= value < 0x80:
+        out.append(value)
+    elif -32 <= value < 0:
+        out.append(value & 0xff)
+    elif 0 <= value < 0x100:
+        out += bytes((0xcc, value))
+    elif 0 <= value < 0x10000:
+        out.append(0xcd)
+        out += struct.pack('>H', value)
+    elif 0 <= value < 0x100000000:
+        out.append(0xce)
+        out += struct.pack('>I', value)
+    elif value >= 0:
+        out.append(0xcf)
+        out += struct.pack('>Q', value)
+    elif value >= -0x80:
+        out.append(0xd0)
+        out += struct.pack('>b', value)
+    elif value >= -0x8000:
+        out.append(0xd1)
+        out += struct.pack('>h', value)
+    elif value >= -0x80000000:
+        out.append(0xd2)
+        out += struct.pack('>i', value)
+    else:
+        out.append(0xd3)
+        out += struct.pack('>q', value)
+
+
+def _pack_header(size, fix, wide, out):
+    # fixmap/fixarray hasta 15 elementos; si no, map16/array16 o map32/array32
+    if size < 16:
+        out.append(fix | size)
+    elif size < 0x10000:
+        out.append(wide)
+        out += struct.pack('>H', size)
+    else:
+        out.append(wide + 1)
+        out += struct.pack('>I', size)
+
+
+def _pack_ext(code, data, out):
+    size = len(data)
+    fixed = _FIXEXT.get(size)
+    if fixed is not None:
+        out += bytes((fixed, code))
+    elif size < 0x100:
+        out += bytes((0xc7, size, code))
+    elif size < 0x10000:
+        out.append(0xc8)
+        out += struct.pack('>HB', size, code)
+    else:
+        out.append(0xc9)
+        out += struct.pack('>IB', size, code)
+    out += data
+
+
+# Formatos de tamaño fijo: byte -> (formato de struct, bytes)
+_FIXED = {
+    0xca: ('>f', 4), 0xcb: ('>d', 8),
+    0xcc: ('>B', 1), 0xcd: ('>H', 2), 0xce: ('>I', 4), 0xcf: ('>Q', 8),
+    0xd0: ('>b', 1), 0xd1: ('>h', 2), 0xd2: ('>i', 4), 0xd3: ('>q', 8),
+}
+# Cabeceras con longitud: byte -> (tipo, formato de la longitud, bytes)
+_SIZED = {
+    0xc4: ('bin', '>B', 1), 0xc5: ('bin', '>H', 2), 0xc6: ('bin', '>I', 4),
+    0xc7: ('ext', '>B', 1), 0xc8: ('ext', '>H', 2), 0xc9: ('ext', '>I', 4),
+    0xd9: ('str', '>B', 1), 0xda: ('str', '>H', 2), 0xdb: ('str', '>I', 4),
+    0xdc: ('array', '>H', 2), 0xdd: ('array', '>I', 4),
+    0xde: ('map', '>H', 2), 0xdf: ('map', '>I', 4),
+}
+_FIXEXT_SIZES = {byte: size for size, byte in _FIXEXT.items()}
+
+
+def _unpack(view, offset):
+    """Decodifica un valor en view[offset:]; devuelve (valor, siguiente offset)"""
+    byte = view[offset]
+    offset += 1
+    if byte < 0x80:
+        return byte, offset
+    if byte >= 0xe0:
+        return byte - 0x100, offset
+    if byte == 0xc0:
+        return None, offset
+    if byte in (0xc2, 0xc3):
+        return byte == 0xc3, offset
+    if byte in _FIXED:
+        fmt, size = _FIXED[byte]
+        return struct.unpack_from(fmt, view, offset)[0], offset + size
+    if byte in _FIXEXT_SIZES:
+        return _ext(view[offset], view[offset + 1:offset + 1 + _FIXEXT_SIZES[byte]]), \
+            offset + 1 + _FIXEXT_SIZES[byte]
+    if 0xa0 <= byte < 0xc0:
+        kind, size = 'str', byte & 0x1f
+    elif 0x90 <= byte < 0xa0:
+        kind, size = 'array', byte & 0x0f
+    elif 0x80 <= byte < 0x90:
+        kind, size = 'map', byte & 0x0f
+    elif byte in _SIZED:
+        kind, fmt, width = _SIZED[byte]
+        size = struct.unpack_from(fmt, view, offset)[0]
+        offset += width
+    else:
+        raise ValueError(f'Byte no válido en el formato binario: {byte:#x}')
+    if kind == 'str':
+        return str(view[offset:offset + size], 'utf-8'), offset + size
+    if kind == 'bin':
+        return bytes(view[offset:offset + size]), offset + size
+    if kind == 'ext':
+        code = view[offset]
+        return _ext(code, view[offset + 1:offset + 1 + size]), offset + 1 + size
+    if kind == 'array':
+        items = []
+        for _ in range(size):
+            value, offset = _unpack(view, offset)
+            items.append(value)
+        return items, offset
+    result = {}
+    for _ in range(size):
+        key, offset = _unpack(view, offset)
+        value, offset = _unpack(view, offset)
+        result[KEYS[key] if isinstance(key, int) and 0 <= key < len(KEYS) else key] = value
+    return result, offset
+
+
+def _ext(code, data):
+    if code == EXT_STRING:
+        return STRINGS[int.from_bytes(data, 'big')]
+    if code == EXT_TEXT:
+        template, args = _unpack(data, 0)[0]
+        return text(list(TEMPLATES)[template], **args)
+    raise ValueError(f'Tipo ext desconocido en el formato binario: {code}')